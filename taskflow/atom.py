@@ -248,6 +248,16 @@ class Atom(object):
     submission order).
     """
 
+    resources = ()
+    """A collection of resource class names (tags such as ``'db'`` or
+    ``'api-quota'``) that instances of this class use when running. When an
+    engine is provided limits for any of these (via its ``resource_limits``
+    option) it will defer (instead of submitting) this atom while that many
+    other atoms that use the same resource class are already running (or
+    reverting). By default atoms use no resource classes (and are therefore
+    never deferred).
+    """
+
     default_provides = None
 
     def __init__(self, name=None, provides=None, requires=None,
@@ -32,10 +32,14 @@ class BlockingConductor(impl_executor.ExecutorConductor):
     def __init__(self, name, jobboard,
                  persistence=None, engine=None,
                  engine_options=None, wait_timeout=None,
-                 log=None, max_simultaneous_jobs=MAX_SIMULTANEOUS_JOBS):
+                 log=None, max_simultaneous_jobs=MAX_SIMULTANEOUS_JOBS,
+                 task_executor=None, max_task_workers=None,
+                 max_job_tasks=None):
         super(BlockingConductor, self).__init__(
             name, jobboard,
             persistence=persistence, engine=engine,
             engine_options=engine_options,
             wait_timeout=wait_timeout, log=log,
-            max_simultaneous_jobs=max_simultaneous_jobs)
+            max_simultaneous_jobs=max_simultaneous_jobs,
+            task_executor=task_executor, max_task_workers=max_task_workers,
+            max_job_tasks=max_job_tasks)
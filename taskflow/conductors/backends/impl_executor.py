@@ -23,15 +23,18 @@ except ImportError:
     from contextlib2 import ExitStack  # noqa
 
 from debtcollector import removals
+import futurist
 from oslo_utils import excutils
 from oslo_utils import timeutils
 import six
 
 from taskflow.conductors import base
+from taskflow.engines.action_engine import executor as ae_executor
 from taskflow import exceptions as excp
 from taskflow.listeners import logging as logging_listener
 from taskflow import logging
 from taskflow import states
+from taskflow.types import notifier
 from taskflow.types import timing as tt
 from taskflow.utils import iter_utils
 from taskflow.utils import misc
@@ -57,6 +60,20 @@ class ExecutorConductor(base.Conductor):
     transient issues that can be worked around by later execution). If a job
     after completing can not be consumed or abandoned the conductor relies
     upon the jobboard capabilities to automatically abandon these jobs.
+
+    When a ``task_executor`` is provided (one of the kinds in
+    :py:attr:`.TASK_EXECUTOR_KINDS`, or an executor object) the engines of all
+    dispatched jobs submit their tasks into that one (shared) executor
+    instead of each of them creating (and destroying) their own. When a kind
+    is provided the executor is created (with ``max_task_workers`` workers,
+    bounding how many tasks run at the same time across all jobs) when
+    :py:meth:`.run` starts and is shut down when it returns (executor objects
+    are used as is and are **not** shut down). When ``max_job_tasks`` is
+    provided, it bounds how many tasks of a single job may be submitted to
+    that executor at the same time. The number of tasks each dispatched job
+    currently has running (and has finished running) is available from
+    :py:attr:`.task_statistics` (and is also provided in the details of the
+    events this emits, as the ``tasks`` key).
     """
 
     LOG = None
@@ -86,6 +103,22 @@ class ExecutorConductor(base.Conductor):
     https://bugs.python.org/issue22737 is ever implemented and released.
     """
 
+    TASK_EXECUTOR_KINDS = {
+        'threads': futurist.ThreadPoolExecutor,
+        'processes': futurist.ProcessPoolExecutor,
+        'greenthreads': futurist.GreenThreadPoolExecutor,
+        'priority': ae_executor.PriorityThreadPoolExecutor,
+    }
+    """
+    Kinds of (shared) task executors that can be created (and the callables
+    that create them given a maximum number of workers).
+    """
+
+    #: Task states that imply a task is (or is no longer) running.
+    _TASK_START_STATES = frozenset([states.RUNNING, states.REVERTING])
+    _TASK_FINISH_STATES = frozenset([states.SUCCESS, states.FAILURE,
+                                     states.REVERTED, states.REVERT_FAILURE])
+
     #: Exceptions that will **not** cause consumption to occur.
     NO_CONSUME_EXCEPTIONS = tuple([
         excp.ExecutionFailure,
@@ -110,10 +143,30 @@ class ExecutorConductor(base.Conductor):
     def __init__(self, name, jobboard,
                  persistence=None, engine=None,
                  engine_options=None, wait_timeout=None,
-                 log=None, max_simultaneous_jobs=MAX_SIMULTANEOUS_JOBS):
+                 log=None, max_simultaneous_jobs=MAX_SIMULTANEOUS_JOBS,
+                 task_executor=None, max_task_workers=None,
+                 max_job_tasks=None):
+        if isinstance(task_executor, six.string_types):
+            if task_executor not in self.TASK_EXECUTOR_KINDS:
+                raise ValueError("Unknown task executor kind '%s' expected"
+                                 " one of %s"
+                                 % (task_executor,
+                                    sorted(self.TASK_EXECUTOR_KINDS)))
+        if max_job_tasks is not None and max_job_tasks <= 0:
+            raise ValueError("Max job tasks must be greater than zero")
+        if task_executor is not None and engine is None:
+            # Only parallel engines can make use of it...
+            engine = 'parallel'
         super(ExecutorConductor, self).__init__(
             name, jobboard, persistence=persistence,
             engine=engine, engine_options=engine_options)
+        self._task_executor = task_executor
+        self._max_task_workers = max_task_workers
+        self._max_job_tasks = max_job_tasks
+        # Only set while running (when a kind is provided)...
+        self._shared_task_executor = None
+        self._task_stats = {}
+        self._task_stats_lock = threading.Lock()
         self._wait_timeout = tt.convert_to_timeout(
             value=wait_timeout, default_value=self.WAIT_TIMEOUT,
             event_factory=self._event_factory)
@@ -146,6 +199,53 @@ class ExecutorConductor(base.Conductor):
         """Whether or not the dispatching loop is still dispatching."""
         return not self._dead.is_set()
 
+    @property
+    def task_statistics(self):
+        """Task counts (running and finished) of currently dispatched jobs.
+
+        :returns: dictionary of job uuids to dictionaries that contain
+                  ``running`` and ``finished`` task counts
+        """
+        with self._task_stats_lock:
+            return dict((job_uuid, dict(stats))
+                        for job_uuid, stats in six.iteritems(self._task_stats))
+
+    def _engine_options_from_job(self, job):
+        engine_options = super(ExecutorConductor,
+                               self)._engine_options_from_job(job)
+        if self._shared_task_executor is not None:
+            engine_options.setdefault('executor', self._shared_task_executor)
+            if self._max_job_tasks is not None:
+                engine_options.setdefault('max_workers', self._max_job_tasks)
+        return engine_options
+
+    def _account_tasks(self, job, engine):
+        stats = {'running': 0, 'finished': 0}
+
+        def on_atom_state(state, details):
+            if 'task_name' not in details:
+                return
+            with self._task_stats_lock:
+                if state in self._TASK_START_STATES:
+                    stats['running'] += 1
+                elif state in self._TASK_FINISH_STATES:
+                    stats['running'] = max(0, stats['running'] - 1)
+                    stats['finished'] += 1
+
+        engine.atom_notifier.register(notifier.Notifier.ANY, on_atom_state)
+        with self._task_stats_lock:
+            self._task_stats[job.uuid] = stats
+        return stats
+
+    def _task_executor_factory(self):
+        if self._task_executor is None:
+            return None
+        if isinstance(self._task_executor, six.string_types):
+            executor_factory = self.TASK_EXECUTOR_KINDS[self._task_executor]
+            return executor_factory(max_workers=self._max_task_workers)
+        else:
+            return self._task_executor
+
     def _listeners_from_job(self, job, engine):
         listeners = super(ExecutorConductor, self)._listeners_from_job(
             job, engine)
@@ -165,7 +265,9 @@ class ExecutorConductor(base.Conductor):
                 'job': job,
                 'engine': engine,
                 'conductor': self,
+                'tasks': self._account_tasks(job, engine),
             }
+            stack.callback(self._forget_tasks, job)
 
             def _run_engine():
                 has_suspended = False
@@ -217,6 +319,10 @@ class ExecutorConductor(base.Conductor):
                     self._log.info("Job completed successfully: %s", job)
             return consume
 
+    def _forget_tasks(self, job):
+        with self._task_stats_lock:
+            self._task_stats.pop(job.uuid, None)
+
     def _try_finish_job(self, job, consume):
         try:
             if consume:
@@ -328,9 +434,16 @@ class ExecutorConductor(base.Conductor):
         self._dispatched.clear()
         try:
             self._jobboard.register_entity(self.conductor)
-            with self._executor_factory() as executor:
-                self._run_until_dead(executor,
-                                     max_dispatches=max_dispatches)
+            task_executor = self._task_executor_factory()
+            self._shared_task_executor = task_executor
+            try:
+                with self._executor_factory() as executor:
+                    self._run_until_dead(executor,
+                                         max_dispatches=max_dispatches)
+            finally:
+                self._shared_task_executor = None
+                if isinstance(self._task_executor, six.string_types):
+                    task_executor.shutdown(wait=True)
         except StopIteration:
             pass
         except KeyboardInterrupt:
@@ -54,12 +54,15 @@ class NonBlockingConductor(impl_executor.ExecutorConductor):
                  persistence=None, engine=None,
                  engine_options=None, wait_timeout=None,
                  log=None, max_simultaneous_jobs=MAX_SIMULTANEOUS_JOBS,
-                 executor_factory=None):
+                 executor_factory=None, task_executor=None,
+                 max_task_workers=None, max_job_tasks=None):
         super(NonBlockingConductor, self).__init__(
             name, jobboard,
             persistence=persistence, engine=engine,
             engine_options=engine_options, wait_timeout=wait_timeout,
-            log=log, max_simultaneous_jobs=max_simultaneous_jobs)
+            log=log, max_simultaneous_jobs=max_simultaneous_jobs,
+            task_executor=task_executor, max_task_workers=max_task_workers,
+            max_job_tasks=max_job_tasks)
         if executor_factory is None:
             self._executor_factory = self._default_executor_factory
         else:
@@ -20,6 +20,7 @@ import fasteners
 import six
 
 from taskflow import engines
+from taskflow.engines.action_engine import compiler
 from taskflow import exceptions as excp
 from taskflow.types import entity
 from taskflow.types import notifier
@@ -50,6 +51,10 @@ class Conductor(object):
         self._persistence = persistence
         self._lock = threading.RLock()
         self._notifier = notifier.Notifier()
+        # Jobs are typically created from the same few flow factories, so
+        # let the engines this conductor creates reuse prior compilations
+        # of equivalently structured flows (unless told not to).
+        self._compilation_cache = compiler.CompilationCache()
 
     @misc.cachedproperty
     def conductor(self):
@@ -109,6 +114,13 @@ class Conductor(object):
                                            " choices) in jobs book" % choices)
         return flow_detail
 
+    def _engine_options_from_job(self, job):
+        """Returns the options the engine for a job will be loaded with."""
+        engine_options = self._engine_options.copy()
+        engine_options.setdefault('compilation_cache',
+                                  self._compilation_cache)
+        return engine_options
+
     def _engine_from_job(self, job):
         """Extracts an engine from a job (via some manner)."""
         flow_detail = self._flow_detail_from_job(job)
@@ -120,10 +132,11 @@ class Conductor(object):
         if job.details and 'store' in job.details:
             store.update(job.details["store"])
 
+        engine_options = self._engine_options_from_job(job)
         engine = engines.load_from_detail(flow_detail, store=store,
                                           engine=self._engine,
                                           backend=self._persistence,
-                                          **self._engine_options)
+                                          **engine_options)
         return engine
 
     def _listeners_from_job(self, job, engine):
@@ -15,6 +15,9 @@
 #    under the License.
 
 import functools
+import threading
+
+from oslo_utils import timeutils
 
 from taskflow.engines.action_engine.actions import base
 from taskflow import logging
@@ -25,12 +28,50 @@ from taskflow.types import failure
 LOG = logging.getLogger(__name__)
 
 
+class _ProgressThrottle(object):
+    """Coalesces the progress updates of a single task (last value wins)."""
+
+    def __init__(self, min_interval, min_delta):
+        self._min_delta = min_delta
+        self._watch = timeutils.StopWatch(duration=min_interval)
+        self._last_saved = None
+        self.pending = None
+
+    def offer(self, progress, details):
+        """Returns if the given progress should be saved (or held back)."""
+        if (self._last_saved is None or progress >= 1.0 or
+                (self._watch.expired() and
+                 abs(progress - self._last_saved) >= self._min_delta)):
+            self._last_saved = progress
+            self._watch.restart()
+            self.pending = None
+            return True
+        else:
+            self.pending = (progress, details)
+            return False
+
+
 class TaskAction(base.Action):
-    """An action that handles scheduling, state changes, ... of task atoms."""
+    """An action that handles scheduling, state changes, ... of task atoms.
+
+    When a minimum progress interval (in seconds) and/or a minimum progress
+    delta is provided then progress updates that tasks emit will be
+    coalesced (before being saved into storage) so that a task emitting
+    many progress updates does not cause an equal number of storage writes;
+    the last held back progress update of a task is always saved before that
+    task is completed.
+    """
 
-    def __init__(self, storage, notifier, task_executor):
+    def __init__(self, storage, notifier, task_executor,
+                 min_progress_interval=0.0, min_progress_delta=0.0):
         super(TaskAction, self).__init__(storage, notifier)
         self._task_executor = task_executor
+        self._min_progress_interval = min_progress_interval
+        self._min_progress_delta = min_progress_delta
+        self._progress_throttled = bool(min_progress_interval > 0 or
+                                        min_progress_delta > 0)
+        self._progress_throttles = {}
+        self._progress_lock = threading.Lock()
 
     def _is_identity_transition(self, old_state, state, task, progress=None):
         if state in self.SAVE_RESULT_STATES:
@@ -79,6 +120,16 @@ class TaskAction(base.Action):
         if progress is not None:
             task.update_progress(progress)
 
+    def _save_progress(self, task, progress, details):
+        try:
+            self._storage.set_task_progress(task.name, progress,
+                                            details=details)
+        except Exception:
+            # Update progress callbacks should never fail, so capture and
+            # log the emitted exception instead of raising it.
+            LOG.exception("Failed setting task progress for %s to %0.3f",
+                          task, progress)
+
     def _on_update_progress(self, task, event_type, details):
         """Should be called when task updates its progress."""
         try:
@@ -86,22 +137,44 @@ class TaskAction(base.Action):
         except KeyError:
             pass
         else:
-            try:
-                self._storage.set_task_progress(task.name, progress,
-                                                details=details)
-            except Exception:
-                # Update progress callbacks should never fail, so capture and
-                # log the emitted exception instead of raising it.
-                LOG.exception("Failed setting task progress for %s to %0.3f",
-                              task, progress)
+            if not self._progress_throttled:
+                self._save_progress(task, progress, details)
+            else:
+                # The save happens while holding the lock so
+                # that a older progress update can never be saved after (and
+                # replace) a newer one...
+                with self._progress_lock:
+                    try:
+                        throttle = self._progress_throttles[task.name]
+                    except KeyError:
+                        throttle = _ProgressThrottle(
+                            self._min_progress_interval,
+                            self._min_progress_delta)
+                        self._progress_throttles[task.name] = throttle
+                    if throttle.offer(progress, details):
+                        self._save_progress(task, progress, details)
+
+    def _flush_progress(self, task):
+        """Saves (and forgets) any held back progress of the given task."""
+        if not self._progress_throttled:
+            return
+        with self._progress_lock:
+            throttle = self._progress_throttles.pop(task.name, None)
+            if throttle is not None and throttle.pending is not None:
+                progress, details = throttle.pending
+                self._save_progress(task, progress, details)
 
     def schedule_execution(self, task):
+        self._flush_progress(task)
         self.change_state(task, states.RUNNING, progress=0.0)
         arguments = self._storage.fetch_mapped_args(
             task.rebind,
             atom_name=task.name,
             optional_args=task.optional
         )
+        if isinstance(task, task_atom.StreamingReduceTask):
+            reduction = self._storage.get_reduction(task.name)
+            arguments[task_atom.EXECUTE_REDUCTION] = reduction
         if task.notifier.can_be_registered(task_atom.EVENT_UPDATE_PROGRESS):
             progress_callback = functools.partial(self._on_update_progress,
                                                   task)
@@ -113,6 +186,7 @@ class TaskAction(base.Action):
             progress_callback=progress_callback)
 
     def complete_execution(self, task, result):
+        self._flush_progress(task)
         if isinstance(result, failure.Failure):
             self.change_state(task, states.FAILURE, result=result)
         else:
@@ -120,6 +194,7 @@ class TaskAction(base.Action):
                               result=result, progress=1.0)
 
     def schedule_reversion(self, task):
+        self._flush_progress(task)
         self.change_state(task, states.REVERTING, progress=0.0)
         arguments = self._storage.fetch_mapped_args(
             task.revert_rebind,
@@ -139,6 +214,7 @@ class TaskAction(base.Action):
             progress_callback=progress_callback)
 
     def complete_reversion(self, task, result):
+        self._flush_progress(task)
         if isinstance(result, failure.Failure):
             self.change_state(task, states.REVERT_FAILURE, result=result)
         else:
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import futurist
+from oslo_utils import importutils
+
+from taskflow.engines.action_engine import executor as base
+from taskflow import task as ta
+from taskflow.types import failure
+from taskflow.utils import threading_utils
+
+asyncio = importutils.try_import('asyncio')
+
+ASYNCIO_AVAILABLE = bool(asyncio)
+
+#: Event loop types that can be provided to this executor.
+LOOP_TYPES = (asyncio.AbstractEventLoop,) if ASYNCIO_AVAILABLE else ()
+
+if ASYNCIO_AVAILABLE:
+    # Named 'async' in older versions (which is now a reserved keyword)...
+    _ensure_future = getattr(asyncio, 'ensure_future', None)
+    if _ensure_future is None:
+        _ensure_future = getattr(asyncio, 'async')
+else:
+    _ensure_future = None
+
+
+def _run_loop(loop):
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        asyncio.set_event_loop(None)
+
+
+class AsyncioTaskExecutor(base.TaskExecutor):
+    """Executes tasks using an asyncio event loop.
+
+    Tasks whose ``execute`` (or ``revert``) method is a coroutine function are
+    started (and then awaited) on a single event loop, so that many of them
+    (typically ones that are waiting on I/O) can be running at the same time
+    without each of them requiring its own thread. Tasks whose methods are
+    **not** coroutine functions are ran using a thread pool executor
+    (of ``max_workers`` size) instead (so that they do not block that
+    event loop).
+
+    If an event loop is provided it must already be running (in some other
+    thread) and will be used instead of one that this executor creates (and
+    runs in a thread it creates).
+    """
+
+    constructor_options = [
+        ('max_workers', lambda v: v if v is None else int(v)),
+    ]
+    """
+    Optional constructor keyword arguments this executor supports. These will
+    typically be passed via engine options (by a engine user) and converted
+    into the correct type before being sent into this
+    classes ``__init__`` method.
+    """
+
+    def __init__(self, executor=None, max_workers=None):
+        if not ASYNCIO_AVAILABLE:
+            raise RuntimeError("Asyncio is not currently available")
+        self._loop = executor
+        self._own_loop = executor is None
+        self._max_workers = max_workers
+        # Only created after starting...
+        self._executor = None
+        self._worker = None
+
+    def start(self):
+        if threading_utils.is_alive(self._worker):
+            raise RuntimeError("Event loop thread must be stopped via stop()"
+                               " before starting/restarting")
+        if self._own_loop:
+            self._loop = asyncio.new_event_loop()
+            self._worker = threading_utils.daemon_thread(_run_loop,
+                                                         self._loop)
+            self._worker.start()
+        self._executor = futurist.ThreadPoolExecutor(
+            max_workers=self._max_workers)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._own_loop and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if threading_utils.is_alive(self._worker):
+                self._worker.join()
+            self._worker = None
+            self._loop.close()
+            self._loop = None
+
+    def _submit_coroutine(self, task, outcome, pre_func, func, post_func,
+                          arguments, progress_callback=None):
+        fut = futurist.Future()
+        fut.atom = task
+
+        def finish(result):
+            try:
+                post_func()
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                if progress_callback is not None:
+                    task.notifier.deregister(ta.EVENT_UPDATE_PROGRESS,
+                                             progress_callback)
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result((outcome, result))
+
+        def on_done(coro_fut):
+            if coro_fut.cancelled():
+                finish(failure.Failure.from_exception(
+                    asyncio.CancelledError()))
+                return
+            exc = coro_fut.exception()
+            if exc is not None:
+                finish(failure.Failure.from_exception(exc))
+            else:
+                finish(coro_fut.result())
+
+        def begin():
+            # This runs on the event loop (in the thread
+            # that runs it); it only starts the task, what the task returns
+            # is then awaited by that loop (which calls back into the above
+            # when it has finished).
+            if not fut.set_running_or_notify_cancel():
+                return
+            if progress_callback is not None:
+                task.notifier.register(ta.EVENT_UPDATE_PROGRESS,
+                                       progress_callback)
+            try:
+                pre_func()
+                coro_fut = _ensure_future(func(**arguments), loop=self._loop)
+            except Exception:
+                finish(failure.Failure())
+            else:
+                coro_fut.add_done_callback(on_done)
+
+        self._loop.call_soon_threadsafe(begin)
+        return fut
+
+    def _submit_task(self, func, task, *args, **kwargs):
+        fut = self._executor.submit(func, task, *args, **kwargs)
+        fut.atom = task
+        return fut
+
+    def execute_task(self, task, task_uuid, arguments, progress_callback=None):
+        if not asyncio.iscoroutinefunction(task.execute):
+            return self._submit_task(base._execute_task, task, arguments,
+                                     progress_callback=progress_callback)
+        return self._submit_coroutine(task, base.EXECUTED,
+                                      task.pre_execute, task.execute,
+                                      task.post_execute, arguments,
+                                      progress_callback=progress_callback)
+
+    def revert_task(self, task, task_uuid, arguments, result, failures,
+                    progress_callback=None):
+        if not asyncio.iscoroutinefunction(task.revert):
+            return self._submit_task(base._revert_task, task, arguments,
+                                     result, failures,
+                                     progress_callback=progress_callback)
+        arguments = arguments.copy()
+        arguments[ta.REVERT_RESULT] = result
+        arguments[ta.REVERT_FLOW_FAILURES] = failures
+        return self._submit_coroutine(task, base.REVERTED,
+                                      task.pre_revert, task.revert,
+                                      task.post_revert, arguments,
+                                      progress_callback=progress_callback)
@@ -166,6 +166,13 @@ class MachineBuilder(object):
             # attempt, which may be empty if never ran before) and any nodes
             # that are now ready to be ran.
             with self._storage.lock.write_lock():
+                # Atom states may have been changed since the last time the
+                # selector was used (or this may be a totally new resumption
+                # from some prior storage), so have it rebuild what it knows
+                # about atom readiness...
+                self._selector.reset()
+                # Nothing is running (or reverting) yet...
+                self._scheduler.reset()
                 memory.next_up.update(
                     iter_utils.unique_seen((self._completer.resume(),
                                             iter_next_atoms())))
@@ -210,7 +217,10 @@ class MachineBuilder(object):
                         memory.not_done.update(not_done)
                     if failures:
                         memory.failures.extend(failures)
-                    memory.next_up.intersection_update(not_done)
+                    # Anything not scheduled (for example because it was
+                    # deferred due to resource limits) stays up next...
+                    memory.next_up.difference_update(
+                        fut.atom for fut in not_done)
                 elif current_flow_state == st.SUSPENDING and memory.not_done:
                     # Try to force anything not cancelled to now be cancelled
                     # so that the executor that gets it does not continue to
@@ -265,6 +275,10 @@ class MachineBuilder(object):
                 return SUCCESSFULLY_COMPLETED
 
         def wait(old_state, new_state, event):
+            # A analyze/schedule cycle has just finished, so let storage know
+            # that (before blocking) so that it can write out any retained
+            # atom detail changes (if its flush policy asks for that).
+            self._storage.checkpoint()
             # TODO(harlowja): maybe we should start doing 'yield from' this
             # call sometime in the future, or equivalent that will work in
             # py2 and py3.
@@ -284,6 +298,7 @@ class MachineBuilder(object):
             with self._storage.lock.write_lock():
                 while memory.done:
                     fut = memory.done.pop()
+                    self._scheduler.release(fut.atom)
                     # Force it to be completed so that we can ensure that
                     # before we iterate over any successors or predecessors
                     # that we know it has been completed and saved and so on...
@@ -301,11 +316,28 @@ class MachineBuilder(object):
                         else:
                             next_up.update(more_work)
             current_flow_state = self._storage.get_flow_state()
-            if (current_flow_state == st.RUNNING
-                    and next_up and not memory.failures):
+            if current_flow_state == st.RUNNING and not memory.failures:
+                if memory.next_up:
+                    # Anything already up next was previously deferred (due
+                    # to resource limits); what just completed may have
+                    # altered those atoms (or what they are connected to) so
+                    # that they are no longer ready (for example a failure
+                    # may have changed their intention to revert while they
+                    # have never ran) so drop any that are not...
+                    with self._storage.lock.read_lock():
+                        no_longer_ready = [
+                            atom for atom in memory.next_up
+                            if atom not in next_up
+                            and not self._selector.is_ready(atom)]
+                    if no_longer_ready:
+                        LOG.trace("Dropping %s deferred atoms that are no"
+                                  " longer ready to be scheduled",
+                                  len(no_longer_ready))
+                        memory.next_up.difference_update(no_longer_ready)
                 memory.next_up.update(next_up)
-                return SCHEDULE
-            elif memory.not_done:
+                if memory.next_up:
+                    return SCHEDULE
+            if memory.not_done:
                 if current_flow_state == st.SUSPENDING:
                     memory.cancel_futures()
                 return WAIT
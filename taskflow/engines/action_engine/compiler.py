@@ -16,12 +16,14 @@
 
 import threading
 
+import cachetools
 import fasteners
 from oslo_utils import excutils
 import six
 
 from taskflow import flow
 from taskflow import logging
+from taskflow import retry
 from taskflow import task
 from taskflow.types import graph as gr
 from taskflow.types import tree as tr
@@ -90,9 +92,12 @@ class Compilation(object):
     used in tree hierarchy).
     """
 
-    def __init__(self, execution_graph, hierarchy):
+    def __init__(self, execution_graph, hierarchy, scope_tables=None):
         self._execution_graph = execution_graph
         self._hierarchy = hierarchy
+        if scope_tables is None:
+            scope_tables = {}
+        self._scope_tables = scope_tables
 
     @property
     def execution_graph(self):
@@ -104,6 +109,16 @@ class Compilation(object):
         """The hierarchy of patterns (as a tree structure)."""
         return self._hierarchy
 
+    @property
+    def scope_tables(self):
+        """Atom name to flattened visible scopes (filled on first usage).
+
+        These are derived only from the (frozen) execution
+        graph and hierarchy, so once computed for an atom they can be
+        reused by anything else using this same compilation.
+        """
+        return self._scope_tables
+
 
 def _overlap_occurrence_detector(to_graph, from_graph):
     """Returns how many nodes in 'from' graph are in 'to' graph (if any)."""
@@ -397,3 +412,162 @@ class PatternCompiler(object):
                     node.freeze()
                 self._compilation = Compilation(graph, node)
         return self._compilation
+
+
+def _freeze_link_metadata(metadata):
+    frozen_metadata = []
+    for key in sorted(metadata):
+        value = metadata[key]
+        if isinstance(value, (set, frozenset)):
+            value = frozenset(value)
+        frozen_metadata.append((key, value))
+    return tuple(frozen_metadata)
+
+
+def _fingerprint(root):
+    """Fingerprints the structure of a flow (or task) that will be compiled.
+
+    Returns a ``(fingerprint, items)`` tuple where the items are all the
+    flows and atoms encountered (in a deterministic pre-order) and the
+    fingerprint is a hashable summary of everything that compilation depends
+    on (types, names, requirements, provides, retries, nesting and links
+    between items). If some part is not able to be fingerprinted (for
+    example unhashable link metadata or a duplicate item) then the returned
+    fingerprint will be none.
+    """
+    items = []
+    positions = {}
+    parts = []
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if item in positions:
+            # Compilation will fail on this (let it do that).
+            return (None, items)
+        positions[item] = len(items)
+        items.append(item)
+        if isinstance(item, flow.Flow):
+            children = list(item)
+            parts.append((FLOW, type(item), item.name,
+                          item.retry is not None, len(children)))
+            # Links reference the children (which may not yet be
+            # positioned) so this is delayed until all have been positioned.
+            parts.append(item)
+            for child in reversed(children):
+                stack.append(child)
+            if item.retry is not None:
+                stack.append(item.retry)
+        elif isinstance(item, (task.Task, retry.Retry)):
+            if isinstance(item, task.Task):
+                kind = TASK
+            else:
+                kind = RETRY
+            parts.append((kind, type(item), item.name,
+                          tuple(item.requires), tuple(item.provides)))
+        else:
+            return (None, items)
+    for i, part in enumerate(parts):
+        if isinstance(part, flow.Flow):
+            parts[i] = tuple((positions[u], positions[v],
+                              _freeze_link_metadata(metadata))
+                             for u, v, metadata in part.iter_links())
+    fingerprint = tuple(parts)
+    try:
+        hash(fingerprint)
+    except TypeError:
+        return (None, items)
+    return (fingerprint, items)
+
+
+def _rebind(compilation, mapping):
+    """Rebinds a compilation to a new (equivalently structured) set of items.
+
+    Link metadata is not replaced (it is part of the
+    fingerprint used to find the compilation being rebound, so it is
+    already equivalent).
+    """
+    terminators = {}
+
+    def rebind_node(node):
+        if isinstance(node, Terminator):
+            try:
+                return terminators[node]
+            except KeyError:
+                terminator = Terminator(mapping[node.flow])
+                terminators[node] = terminator
+                return terminator
+        return mapping[node]
+
+    def rebind_tree_node(tree_node):
+        new_tree_node = tr.Node(mapping[tree_node.item], **tree_node.metadata)
+        for child in tree_node:
+            new_tree_node.add(rebind_tree_node(child))
+        return new_tree_node
+
+    source_graph = compilation.execution_graph
+    graph = gr.DiGraph(name=source_graph.name)
+    for node, node_attrs in source_graph.nodes_iter(data=True):
+        node_attrs = dict(node_attrs)
+        if RETRY in node_attrs:
+            node_attrs[RETRY] = mapping[node_attrs[RETRY]]
+        graph.add_node(rebind_node(node), **node_attrs)
+    for u, v, u_v_attrs in source_graph.edges_iter(data=True):
+        graph.add_edge(rebind_node(u), rebind_node(v),
+                       attr_dict=dict(u_v_attrs))
+    graph.freeze()
+    hierarchy = rebind_tree_node(compilation.hierarchy)
+    hierarchy.freeze()
+    # Scope tables only contain atom names (which are part of the
+    # fingerprint) so they can be shared as is...
+    return Compilation(graph, hierarchy,
+                       scope_tables=compilation.scope_tables)
+
+
+class CompilationCache(object):
+    """Bounded LRU cache of compilations (keyed by flow structure).
+
+    Useful when the same flow (typically produced by the same flow factory)
+    is compiled many times over (for example by a conductor running many
+    jobs); instead of fully compiling each flow again, a prior (frozen)
+    compilation of an equivalently structured flow is rebound to the items
+    of the newly provided flow (which avoids the recursive decomposition and
+    merging of graphs that compilation otherwise has to perform).
+    """
+
+    #: Default maximum number of compilations retained.
+    DEFAULT_MAX_SIZE = 64
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self._cache = cachetools.LRUCache(max_size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def clear(self):
+        """Removes all retained compilations."""
+        with self._lock:
+            self._cache.clear()
+
+    def compile(self, root):
+        """Compiles (or fetches an equivalent compilation of) the item."""
+        fingerprint, items = _fingerprint(root)
+        if fingerprint is None:
+            return PatternCompiler(root).compile()
+        with self._lock:
+            try:
+                source_compilation, source_items = self._cache[fingerprint]
+            except KeyError:
+                source_compilation, source_items = None, None
+        if source_compilation is None:
+            compilation = PatternCompiler(root).compile()
+            with self._lock:
+                self._cache[fingerprint] = (compilation, items)
+            return compilation
+        if all(a is b for a, b in six.moves.zip(source_items, items)):
+            return source_compilation
+        LOG.trace("Rebinding compilation of '%s' (from equivalently"
+                  " structured items)", root)
+        return _rebind(source_compilation,
+                       dict(six.moves.zip(source_items, items)))
@@ -26,6 +26,8 @@ from taskflow.engines.action_engine import executor as ex
 from taskflow import logging
 from taskflow import retry as retry_atom
 from taskflow import states as st
+from taskflow import task as task_atom
+from taskflow.types import failure
 
 LOG = logging.getLogger(__name__)
 
@@ -161,13 +163,45 @@ class Completer(object):
             # retain the failure...
             return True
 
+    def _reduce(self, node, result):
+        """Reduces the nodes result (returns what is left to be saved)."""
+        reducers = self._runtime.fetch_reducers(node)
+        for reducer, names in reducers:
+            values = []
+            for name in names:
+                index = node.save_as[name]
+                if index is None:
+                    values.append((name, result))
+                else:
+                    values.append((name, result[index]))
+            reduction = reducer.reduce(
+                self._storage.get_reduction(reducer.name), values)
+            self._storage.save_reduction(reducer.name, reduction)
+        if reducers and self._runtime.can_release_reduced(node):
+            # Everything it provides has been reduced (and saved) and
+            # nothing else requires any of it, so there is no need to
+            # retain its result anymore...
+            return None
+        return result
+
+    def _forget_reductions(self, node):
+        """Forgets reductions the (now reverted) node was involved in."""
+        if isinstance(node, task_atom.StreamingReduceTask):
+            self._storage.cleanup_reduction(node.name)
+        for reducer, _names in self._runtime.fetch_reducers(node):
+            self._storage.cleanup_reduction(reducer.name)
+
     def complete(self, node, outcome, result):
         """Performs post-execution completion of a node result."""
         handler = self._runtime.fetch_action(node)
         if outcome == ex.EXECUTED:
+            if not isinstance(result, failure.Failure):
+                result = self._reduce(node, result)
             handler.complete_execution(node, result)
         else:
             handler.complete_reversion(node, result)
+            self._forget_reductions(node)
+        self._runtime.selector.refresh([node])
 
     def _determine_resolution(self, atom, failure):
         """Determines which resolution strategy to activate/apply."""
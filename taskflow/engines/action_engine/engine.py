@@ -28,6 +28,7 @@ from oslo_utils import strutils
 from oslo_utils import timeutils
 import six
 
+from taskflow.engines.action_engine import asyncio_executor
 from taskflow.engines.action_engine import builder
 from taskflow.engines.action_engine import compiler
 from taskflow.engines.action_engine import executor
@@ -141,6 +142,69 @@ class ActionEngine(base.Engine):
     |                      | (and saved in a non-  |      |            |
     |                      | transient manner).    |      |            |
     +----------------------+-----------------------+------+------------+
+    | ``compilation_cache``| When provided (a      | obj  | ``None``   |
+    |                      | compilation cache     |      |            |
+    |                      | object) compilation   |      |            |
+    |                      | of the flow will be   |      |            |
+    |                      | skipped if an         |      |            |
+    |                      | equivalently          |      |            |
+    |                      | structured flow was   |      |            |
+    |                      | previously compiled   |      |            |
+    |                      | (and retained) by     |      |            |
+    |                      | that cache.           |      |            |
+    +----------------------+-----------------------+------+------------+
+    | ``flush_policy``     | When atom detail      | str  | ``None``   |
+    |                      | changes get written   |      |            |
+    |                      | to the persistence    |      |            |
+    |                      | backend (one of the   |      |            |
+    |                      | storage modules flush |      |            |
+    |                      | policies); when not   |      |            |
+    |                      | provided they are     |      |            |
+    |                      | written immediately,  |      |            |
+    |                      | other policies retain |      |            |
+    |                      | them and write them   |      |            |
+    |                      | later in bulk (less   |      |            |
+    |                      | durable but with less |      |            |
+    |                      | backend round trips). |      |            |
+    +----------------------+-----------------------+------+------------+
+    | ``flush_interval``   | How often (in         | float| ``0.1``    |
+    |                      | seconds) retained     |      |            |
+    |                      | atom detail changes   |      |            |
+    |                      | are written when the  |      |            |
+    |                      | ``'per_interval'``    |      |            |
+    |                      | flush policy is used. |      |            |
+    +----------------------+-----------------------+------+------------+
+    | ``progress_interval``| Minimum time (in      | float| ``0.0``    |
+    |                      | seconds) between the  |      |            |
+    |                      | saving of a tasks     |      |            |
+    |                      | progress updates (any |      |            |
+    |                      | updates that happen   |      |            |
+    |                      | in-between are held   |      |            |
+    |                      | back and only the     |      |            |
+    |                      | last one is later     |      |            |
+    |                      | saved).               |      |            |
+    +----------------------+-----------------------+------+------------+
+    | ``progress_delta``   | Minimum change in a   | float| ``0.0``    |
+    |                      | tasks progress that   |      |            |
+    |                      | must happen before an |      |            |
+    |                      | update is saved (the  |      |            |
+    |                      | final progress update |      |            |
+    |                      | is always saved).     |      |            |
+    +----------------------+-----------------------+------+------------+
+    | ``resource_limits``  | Maximum number of     | dict | ``None``   |
+    |                      | atoms (keyed by the   |      |            |
+    |                      | resource classes that |      |            |
+    |                      | atoms declare in      |      |            |
+    |                      | their ``resources``   |      |            |
+    |                      | attribute) that can   |      |            |
+    |                      | run at the same time; |      |            |
+    |                      | ready atoms that would|      |            |
+    |                      | exceed a limit are    |      |            |
+    |                      | deferred (until some  |      |            |
+    |                      | other atom using that |      |            |
+    |                      | resource class has    |      |            |
+    |                      | completed).           |      |            |
+    +----------------------+-----------------------+------+------------+
     """
 
     NO_RERAISING_STATES = frozenset([states.SUSPENDED, states.SUCCESS])
@@ -181,6 +245,21 @@ class ActionEngine(base.Engine):
             self._options.get('inject_transient', True))
         self._gather_statistics = strutils.bool_from_string(
             self._options.get('gather_statistics', True))
+        self._compilation_cache = self._options.get('compilation_cache')
+        if not (self._compilation_cache is None or
+                isinstance(self._compilation_cache,
+                           compiler.CompilationCache)):
+            raise TypeError("Unknown compilation cache '%s' (%s) expected"
+                            " an instance of %s"
+                            % (self._compilation_cache,
+                               type(self._compilation_cache),
+                               compiler.CompilationCache))
+        self._flush_policy = self._options.get('flush_policy')
+        if self._flush_policy is None:
+            self._flush_policy = storage.FLUSH_IMMEDIATELY
+        self._flush_interval = self._options.get('flush_interval')
+        if self._flush_interval is not None:
+            self._flush_interval = float(self._flush_interval)
         self._statistics = {}
 
     @_pre_check(check_compiled=True,
@@ -231,7 +310,9 @@ class ActionEngine(base.Engine):
                 return None
         return storage.Storage(self._flow_detail,
                                backend=self._backend,
-                               scope_fetcher=_scope_fetcher)
+                               scope_fetcher=_scope_fetcher,
+                               flush_policy=self._flush_policy,
+                               flush_interval=self._flush_interval)
 
     def run(self, timeout=None):
         """Runs the engine (or die trying).
@@ -271,6 +352,8 @@ class ActionEngine(base.Engine):
         self.compile()
         self.prepare()
         self.validate()
+        self._task_executor.preload(
+            self._runtime.iterate_nodes((compiler.TASK,)))
         # Keep track of the last X state changes, which if a failure happens
         # are quite useful to log (and the performance of tracking this
         # should be negligible).
@@ -327,6 +410,10 @@ class ActionEngine(base.Engine):
                                   list(last_transitions))
                     self._change_state(states.FAILURE)
             else:
+                # Ensure anything retained by storage gets written out before
+                # the final state is (so that the final state is never ahead
+                # of what was actually saved).
+                self.storage.flush()
                 if last_transitions:
                     _prior_state, new_state = last_transitions[-1]
                     if new_state not in self.IGNORABLE_STATES:
@@ -460,7 +547,11 @@ class ActionEngine(base.Engine):
     def compile(self):
         if self._compiled:
             return
-        self._compilation = self._check_compilation(self._compiler.compile())
+        if self._compilation_cache is not None:
+            compilation = self._compilation_cache.compile(self._flow)
+        else:
+            compilation = self._compiler.compile()
+        self._compilation = self._check_compilation(compilation)
         self._runtime = runtime.Runtime(self._compilation,
                                         self.storage,
                                         self.atom_notifier,
@@ -506,8 +597,10 @@ class ParallelActionEngine(ActionEngine):
 Type provided              Executor used
 =========================  ===============================================
 |cft|.ThreadPoolExecutor   :class:`~.executor.ParallelThreadTaskExecutor`
+|ptp|                      :class:`~.executor.ParallelThreadTaskExecutor`
 |cfp|.ProcessPoolExecutor  :class:`~.|pe|.ParallelProcessTaskExecutor`
 |cf|._base.Executor        :class:`~.executor.ParallelThreadTaskExecutor`
+asyncio.AbstractEventLoop  :class:`~.|ae|.AsyncioTaskExecutor`
 =========================  ===============================================
 
     * ``executor``: a string that will be used to select a :pep:`3148`
@@ -518,6 +611,9 @@ Type provided              Executor used
 ===========================  ===============================================
 String (case insensitive)    Executor used
 ===========================  ===============================================
+``asyncio``                  :class:`~.|ae|.AsyncioTaskExecutor`
+``priority``                 |ppe|
+``prioritized``              |ppe|
 ``process``                  :class:`~.|pe|.ParallelProcessTaskExecutor`
 ``processes``                :class:`~.|pe|.ParallelProcessTaskExecutor`
 ``thread``                   :class:`~.executor.ParallelThreadTaskExecutor`
@@ -533,7 +629,24 @@ String (case insensitive)    Executor used
 
     * ``max_workers``: a integer that will affect the number of parallel
       workers that are used to dispatch tasks into (this number is bounded
-      by the maximum parallelization your workflow can support).
+      by the maximum parallelization your workflow can support). When an
+      executor object is provided above (which may be shared with other
+      engines) this instead bounds how many tasks this engine will have
+      submitted to it at the same time.
+
+    * ``worker_idle_timeout``: a float (in seconds) that will affect the
+      parallel thread (and prioritized thread) task executor (and therefore
+      is **only** applicable when the executor is created by the engine).
+      When provided, the engines thread pool autoscales; threads are added
+      (up to ``max_workers`` of them) when tasks are waiting to run and no
+      thread is idle, and threads that have been idle for this long exit
+      (see |ptp|).
+
+    * ``min_workers``: a integer that will affect the parallel thread (and
+      prioritized thread) task executor (and is **only** applicable when
+      the above ``worker_idle_timeout`` is also provided). This is the
+      number of threads an autoscaling thread pool will not shrink below;
+      defaults to zero.
 
     * ``wait_timeout``: a float (in seconds) that will affect the
       parallel process task executor (and therefore is **only** applicable when
@@ -544,7 +657,46 @@ String (case insensitive)    Executor used
       polling while a higher number will involve less polling but a slower time
       for an engine to notice a task has completed.
 
+    * ``share_threshold``: a integer (in bytes) that will affect the
+      parallel process task executor (and therefore is **only** applicable when
+      the executor provided above is of the process variant). When provided,
+      task arguments and results that are at least this large (and that are
+      ``bytes``, ``bytearray``, ``memoryview`` or numpy array values) are
+      passed to and from child processes using memory-mapped files instead of
+      being pickled (see :class:`~.|pe|.SharedBuffer`).
+
+    * ``share_directory``: a string that will affect the parallel process
+      task executor (and is **only** applicable when the above
+      ``share_threshold`` is also provided). This is the directory the
+      memory-mapped files are created in (if not provided the default
+      temporary directory is used).
+
+    * ``sign_messages``: a boolean that will affect the parallel process
+      task executor (and therefore is **only** applicable when the executor
+      provided above is of the process variant). When false, the events that
+      tasks emit in child processes are sent back without each of them being
+      hmac signed (the connections they are sent over are still
+      authenticated); defaults to true.
+
+    * ``batch_delay``: a float (in seconds) that will affect the parallel
+      process task executor (and therefore is **only** applicable when the
+      executor provided above is of the process variant). This is the
+      maximum amount of time events that tasks emit in child processes are
+      buffered for (so that they can be sent back in batches) before being
+      sent; zero disables batching (see :class:`~.|pe|.Channel`).
+
+    * ``preload_tasks``: a boolean that will affect the parallel process
+      task executor (and therefore is **only** applicable when the executor
+      provided above is of the process variant and is created by the
+      engine). When true, the worker processes are pre-forked (when the
+      engine starts running) with copies of the flows tasks already
+      loaded, so that only a reference to a task (and not a pickled copy
+      of it) is sent each time it is executed or reverted.
+
     .. |pe|  replace:: process_executor
+    .. |ae|  replace:: asyncio_executor
+    .. |ptp| replace:: :class:`~.executor.PriorityThreadPoolExecutor`
+    .. |ppe| replace:: :class:`~.executor.ParallelPriorityThreadTaskExecutor`
     .. |cfp| replace:: concurrent.futures.process
     .. |cft| replace:: concurrent.futures.thread
     .. |cf| replace:: concurrent.futures
@@ -563,6 +715,8 @@ String (case insensitive)    Executor used
                            process_executor.ParallelProcessTaskExecutor),
         _ExecutorTypeMatch((futures.Executor,),
                            executor.ParallelThreadTaskExecutor),
+        _ExecutorTypeMatch(asyncio_executor.LOOP_TYPES,
+                           asyncio_executor.AsyncioTaskExecutor),
     ]
 
     # One of these should match when a string/text is provided for the
@@ -576,6 +730,10 @@ String (case insensitive)    Executor used
         _ExecutorTextMatch(frozenset(['greenthread', 'greenthreads',
                                       'greenthreaded']),
                            executor.ParallelGreenThreadTaskExecutor),
+        _ExecutorTextMatch(frozenset(['asyncio']),
+                           asyncio_executor.AsyncioTaskExecutor),
+        _ExecutorTextMatch(frozenset(['priority', 'prioritized']),
+                           executor.ParallelPriorityThreadTaskExecutor),
     ]
 
     # Used when no executor is provided (either a string or object)...
@@ -15,19 +15,46 @@
 #    under the License.
 
 import abc
-
+import collections
+import functools
+import heapq
+import itertools
+import sys
+import threading
+import weakref
+
+from concurrent import futures
 import futurist
+from oslo_utils import excutils
+from oslo_utils import importutils
+from oslo_utils import timeutils
 import six
 
 from taskflow import task as ta
 from taskflow.types import failure
 from taskflow.types import notifier
+from taskflow.utils import threading_utils as tu
+
+asyncio = importutils.try_import('asyncio')
 
 # Execution and reversion outcomes.
 EXECUTED = 'executed'
 REVERTED = 'reverted'
 
 
+def _maybe_wait(result):
+    # Tasks methods may be coroutine functions (that return a coroutine to
+    # run); when not being ran by a executor that awaits them, they are ran
+    # to completion (in the calling thread) using a new event loop.
+    if asyncio is None or not asyncio.iscoroutine(result):
+        return result
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(result)
+    finally:
+        loop.close()
+
+
 def _execute_retry(retry, arguments):
     try:
         result = retry.execute(**arguments)
@@ -50,7 +77,7 @@ def _execute_task(task, arguments, progress_callback=None):
                                       callback=progress_callback):
         try:
             task.pre_execute()
-            result = task.execute(**arguments)
+            result = _maybe_wait(task.execute(**arguments))
         except Exception:
             # NOTE(imelnikov): wrap current exception with Failure
             # object and return it.
@@ -69,7 +96,7 @@ def _revert_task(task, arguments, result, failures, progress_callback=None):
                                       callback=progress_callback):
         try:
             task.pre_revert()
-            result = task.revert(**arguments)
+            result = _maybe_wait(task.revert(**arguments))
         except Exception:
             # NOTE(imelnikov): wrap current exception with Failure
             # object and return it.
@@ -79,6 +106,247 @@ def _revert_task(task, arguments, result, failures, progress_callback=None):
     return (REVERTED, result)
 
 
+class _Owner(object):
+    """Owner of submissions made without one (weakly referenceable)."""
+
+
+class PriorityThreadPoolExecutor(futures.Executor):
+    """Thread pool executor that runs what is submitted by priority.
+
+    Submissions made with :py:meth:`.submit_prioritized` are ran in order of
+    their priority (highest first) no matter when they were submitted (or by
+    whom); submissions of the same priority are ran fairly between the
+    owners that made them (owners take turns, so that a owner that submits
+    many things can not starve a owner that submits few of them). Plain
+    :py:meth:`.submit` calls use the default priority (zero) and a shared
+    (default) owner.
+
+    This is useful when a single pool is shared by many engines (for example
+    the engines that a conductor runs), since each engine submits as its
+    own owner and the atom priorities are respected across all of them.
+
+    Worker threads are only created when work is submitted and there are not
+    enough idle workers to take everything that is queued (up to
+    ``max_workers`` of them); when an ``idle_timeout``
+    (in seconds) is provided workers that have been idle for that long exit
+    (until only ``min_workers`` of them remain), so that the pool grows
+    when work backs up and shrinks back when it no longer does.
+    """
+
+    def __init__(self, max_workers=None, min_workers=0, idle_timeout=None):
+        if max_workers is None:
+            max_workers = tu.get_optimal_thread_count()
+        if max_workers <= 0:
+            raise ValueError("Max workers must be greater than zero")
+        if min_workers < 0 or min_workers > max_workers:
+            raise ValueError("Min workers must be greater than or equal to"
+                             " zero and less than or equal to max workers")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("Idle timeout must be greater than zero")
+        self._max_workers = max_workers
+        self._min_workers = min_workers
+        self._idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        self._queue = []
+        self._workers = []
+        self._idle = 0
+        self._shutdown = False
+        self._counter = itertools.count()
+        # Next turn of each owner (and the turn of what was last started).
+        self._turns = weakref.WeakKeyDictionary()
+        self._turn = 0
+        self._default_owner = _Owner()
+
+    @property
+    def alive(self):
+        """Accessor to determine if the executor is alive/active."""
+        return not self._shutdown
+
+    @property
+    def statistics(self):
+        """Current number of workers, idle workers and queued submissions."""
+        with self._cond:
+            return {
+                'workers': len(self._workers),
+                'idle': self._idle,
+                'queued': len(self._queue),
+            }
+
+    def submit(self, fn, *args, **kwargs):
+        return self.submit_prioritized(0, None, fn, *args, **kwargs)
+
+    def submit_prioritized(self, priority, owner, fn, *args, **kwargs):
+        """Submit some work to be ran (with a priority, on behalf of owner).
+
+        :param priority: numeric priority (higher priorities run first)
+        :param owner: weakly referenceable object that is submitting (or
+                      none to submit as the default owner)
+        """
+        if owner is None:
+            owner = self._default_owner
+        fut = futurist.Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('Can not schedule new futures'
+                                   ' after being shutdown')
+            # A owner that has not submitted anything in a while gets the
+            # current turn (not its old one, which would let it jump ahead
+            # of everyone else for a while).
+            turn = max(self._turns.get(owner, 0), self._turn)
+            self._turns[owner] = turn + 1
+            heapq.heappush(self._queue, (-priority, turn,
+                                         six.next(self._counter),
+                                         fut, fn, args, kwargs))
+            # Idle workers that were notified (but have not yet woken up to
+            # take something) are still counted as idle, so only rely on
+            # them when there are enough of them for everything queued...
+            if (len(self._queue) > self._idle and
+                    len(self._workers) < self._max_workers):
+                worker = tu.daemon_thread(self._run)
+                self._workers.append(worker)
+                worker.start()
+            else:
+                self._cond.notify()
+        return fut
+
+    def _should_retire(self, idle_since):
+        if self._idle_timeout is None:
+            return False
+        if len(self._workers) <= self._min_workers:
+            return False
+        return timeutils.now() - idle_since >= self._idle_timeout
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._idle += 1
+                idle_since = timeutils.now()
+                while not self._queue and not self._shutdown:
+                    self._cond.wait(self._idle_timeout)
+                    if not self._queue and self._should_retire(idle_since):
+                        self._idle -= 1
+                        self._workers.remove(threading.current_thread())
+                        return
+                self._idle -= 1
+                if not self._queue:
+                    return
+                (_priority, turn, _count,
+                 fut, fn, args, kwargs) = heapq.heappop(self._queue)
+                self._turn = max(self._turn, turn)
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                exc_type, exc_value, exc_tb = sys.exc_info()
+                try:
+                    if six.PY2:
+                        fut.set_exception_info(exc_value, exc_tb)
+                    else:
+                        fut.set_exception(exc_value)
+                finally:
+                    del exc_type, exc_value, exc_tb
+            else:
+                fut.set_result(result)
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+
+class BoundedSubmitter(object):
+    """Bounds how many submissions (to some executor) run at the same time.
+
+    Submissions made when the maximum number are already running wait (in
+    the order they were made) until enough of the running ones have finished
+    and only then are submitted to the executor; this allows a user of a
+    shared executor to bound how much of that executor it may occupy.
+    """
+
+    def __init__(self, max_running):
+        if max_running <= 0:
+            raise ValueError("Max running must be greater than zero")
+        self._max_running = max_running
+        self._lock = threading.Lock()
+        self._waiting = collections.deque()
+        self._running = 0
+        self._submitted = 0
+
+    @property
+    def running(self):
+        """How many submissions are currently submitted to the executor."""
+        return self._running
+
+    @property
+    def waiting(self):
+        """How many submissions are waiting to be submitted."""
+        return len(self._waiting)
+
+    @property
+    def submitted(self):
+        """How many submissions have been made (in total)."""
+        return self._submitted
+
+    def submit(self, submit_func, fn, *args, **kwargs):
+        """Submits (or delays submitting) using the given submit function.
+
+        :returns: a future (that will be finished when the future the
+                  submit function returns has been)
+        """
+        fut = futurist.Future()
+        with self._lock:
+            self._submitted += 1
+            if self._running >= self._max_running:
+                self._waiting.append((fut, submit_func, fn, args, kwargs))
+                return fut
+            self._running += 1
+        fut.set_running_or_notify_cancel()
+        try:
+            self._chain(fut, submit_func(fn, *args, **kwargs))
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._start_next()
+        return fut
+
+    def _chain(self, fut, inner_fut):
+        inner_fut.add_done_callback(functools.partial(self._on_done, fut))
+
+    def _start_next(self):
+        while True:
+            with self._lock:
+                try:
+                    fut, submit_func, fn, args, kwargs = (
+                        self._waiting.popleft())
+                except IndexError:
+                    self._running -= 1
+                    return
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                inner_fut = submit_func(fn, *args, **kwargs)
+            except Exception as e:
+                fut.set_exception(e)
+            else:
+                self._chain(fut, inner_fut)
+                return
+
+    def _on_done(self, fut, inner_fut):
+        # Keep the executor busy (if anything is waiting) before letting
+        # the submitter know this has finished...
+        self._start_next()
+        try:
+            result = inner_fut.result()
+        except Exception as e:
+            fut.set_exception(e)
+        else:
+            fut.set_result(result)
+
+
 class SerialRetryExecutor(object):
     """Executes and reverts retries."""
 
@@ -125,6 +393,9 @@ class TaskExecutor(object):
                     progress_callback=None):
         """Schedules task reversion."""
 
+    def preload(self, tasks):
+        """Called (before starting) with the tasks that may be submitted."""
+
     def start(self):
         """Prepare to execute tasks."""
 
@@ -181,13 +452,31 @@ class ParallelTaskExecutor(TaskExecutor):
         self._executor = executor
         self._max_workers = max_workers
         self._own_executor = executor is None
+        if not self._own_executor and max_workers is not None:
+            # The provided executor may be shared with others, so bound
+            # how much of it the tasks submitted by this can occupy...
+            self._submitter = BoundedSubmitter(max_workers)
+        else:
+            self._submitter = None
 
     @abc.abstractmethod
     def _create_executor(self, max_workers=None):
         """Called when an executor has not been provided to make one."""
 
+    def _submit_to_executor(self, priority, fn, *args, **kwargs):
+        if isinstance(self._executor, PriorityThreadPoolExecutor):
+            submit_func = functools.partial(
+                self._executor.submit_prioritized, priority, self)
+        else:
+            submit_func = self._executor.submit
+        if self._submitter is not None:
+            return self._submitter.submit(submit_func, fn, *args, **kwargs)
+        else:
+            return submit_func(fn, *args, **kwargs)
+
     def _submit_task(self, func, task, *args, **kwargs):
-        fut = self._executor.submit(func, task, *args, **kwargs)
+        fut = self._submit_to_executor(task.priority, func, task,
+                                       *args, **kwargs)
         fut.atom = task
         return fut
 
@@ -212,12 +501,46 @@ class ParallelTaskExecutor(TaskExecutor):
 
 
 class ParallelThreadTaskExecutor(ParallelTaskExecutor):
-    """Executes tasks in parallel using a thread pool executor."""
+    """Executes tasks in parallel using a thread pool executor.
+
+    When a ``worker_idle_timeout`` is provided the thread pool that is
+    created autoscales (see :py:class:`.PriorityThreadPoolExecutor`) between
+    ``min_workers`` and ``max_workers`` threads.
+    """
+
+    constructor_options = ParallelTaskExecutor.constructor_options + [
+        ('min_workers', lambda v: v if v is None else int(v)),
+        ('worker_idle_timeout', lambda v: v if v is None else float(v)),
+    ]
+
+    def __init__(self, executor=None, max_workers=None,
+                 min_workers=None, worker_idle_timeout=None):
+        super(ParallelThreadTaskExecutor, self).__init__(
+            executor=executor, max_workers=max_workers)
+        self._min_workers = min_workers
+        self._worker_idle_timeout = worker_idle_timeout
+
+    def _create_autoscaling_executor(self, max_workers=None):
+        return PriorityThreadPoolExecutor(
+            max_workers=max_workers, min_workers=self._min_workers or 0,
+            idle_timeout=self._worker_idle_timeout)
 
     def _create_executor(self, max_workers=None):
+        if self._worker_idle_timeout is not None:
+            return self._create_autoscaling_executor(max_workers=max_workers)
         return futurist.ThreadPoolExecutor(max_workers=max_workers)
 
 
+class ParallelPriorityThreadTaskExecutor(ParallelThreadTaskExecutor):
+    """Executes tasks in parallel using a priority thread pool executor.
+
+    See :py:class:`.PriorityThreadPoolExecutor` for how tasks are ran.
+    """
+
+    def _create_executor(self, max_workers=None):
+        return self._create_autoscaling_executor(max_workers=max_workers)
+
+
 class ParallelGreenThreadTaskExecutor(ParallelThreadTaskExecutor):
     """Executes tasks in parallel using a greenthread pool executor."""
 
@@ -230,6 +553,8 @@ class ParallelGreenThreadTaskExecutor(ParallelThreadTaskExecutor):
     does).
     """
 
+    constructor_options = ParallelTaskExecutor.constructor_options
+
     def _create_executor(self, max_workers=None):
         if max_workers is None:
             max_workers = self.DEFAULT_WORKERS
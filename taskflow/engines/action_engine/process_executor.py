@@ -21,14 +21,21 @@ import errno
 import functools
 import hmac
 import math
+import mmap
+import multiprocessing
 import os
 import pickle
 import socket
 import struct
+import tempfile
+import threading
 import time
 
 import futurist
 from oslo_utils import excutils
+from oslo_utils import importutils
+from oslo_utils import reflection
+from oslo_utils import strutils
 import six
 
 from taskflow.engines.action_engine import executor as base
@@ -42,11 +49,15 @@ from taskflow.utils import threading_utils
 
 LOG = logging.getLogger(__name__)
 
+# Optional dependency (array-like values are only shared when it exists)...
+np = importutils.try_import('numpy')
+
 # Internal parent <-> child process protocol schema, message constants...
 MAGIC_HEADER = 0xDECAF
 CHALLENGE = 'identify_yourself'
 CHALLENGE_RESPONSE = 'worker_reporting_in'
 ACK = 'ack'
+BARRIER = 'barrier'
 EVENT = 'event'
 SCHEMAS = {
     # Basic jsonschemas for verifying that the data we get back and
@@ -64,6 +75,10 @@ SCHEMAS = {
         "type": "string",
         "minLength": 1,
     },
+    BARRIER: {
+        "type": "string",
+        "minLength": 1,
+    },
     EVENT: {
         "type": "object",
         "properties": {
@@ -114,7 +129,7 @@ class Reader(object):
 
         <magic-header> (4 bytes)
         <mac-header-length> (4 bytes)
-        <mac> (1 or more variable bytes)
+        <mac> (0 or more variable bytes, 0 when the message is not signed)
         <identity-header-length> (4 bytes)
         <identity> (1 or more variable bytes)
         <msg-header-length> (4 bytes)
@@ -163,7 +178,8 @@ class Reader(object):
                                   self._save_and_validate_magic),
             'mac_header_left': (self._read_field_data,
                                 functools.partial(self._save_pos_integer,
-                                                  'mac_left')),
+                                                  'mac_left',
+                                                  allow_zero=True)),
             'mac_left': (functools.partial(self._read_data, 'mac'),
                          functools.partial(self._save_data, 'mac')),
             'identity_header_left': (self._read_field_data,
@@ -180,9 +196,9 @@ class Reader(object):
         # Force transition into first state...
         self._transition()
 
-    def _save_pos_integer(self, key_name, data):
+    def _save_pos_integer(self, key_name, data, allow_zero=False):
         key_val = struct.unpack("!i", data)[0]
-        if key_val <= 0:
+        if key_val < 0 or (key_val == 0 and not allow_zero):
             raise IOError("Invalid %s length received for key '%s', expected"
                           " greater than zero length" % (key_val, key_name))
         self._memory[key_name] = key_val
@@ -213,6 +229,11 @@ class Reader(object):
         except KeyError:
             pass
         self._handle_func, self._post_handle_func = self._handlers[self._state]
+        if self._memory.get(self._state) == 0:
+            # Empty fields (for example the mac of a message that was not
+            # signed) have nothing to read, so complete them right away...
+            self._post_handle_func(b'')
+            self._transition()
 
     def _save_and_validate_magic(self, data):
         magic_header = struct.unpack("!i", data)[0]
@@ -271,9 +292,12 @@ def _calculate_hmac(auth_key, body):
     return mac
 
 
-def _encode_message(auth_key, message, identity, reverse=False):
+def _encode_message(auth_key, message, identity, reverse=False, sign=True):
     message = pickle.dumps(message, 2)
-    message_mac = _calculate_hmac(auth_key, message)
+    if sign:
+        message_mac = _calculate_hmac(auth_key, message)
+    else:
+        message_mac = b''
     pieces = [
         struct.pack("!i", MAGIC_HEADER),
         struct.pack("!i", len(message_mac)),
@@ -288,32 +312,113 @@ def _encode_message(auth_key, message, identity, reverse=False):
     return tuple(pieces)
 
 
-def _decode_message(auth_key, message, message_mac):
-    tmp_message_mac = _calculate_hmac(auth_key, message)
-    if tmp_message_mac != message_mac:
+def _decode_message(auth_key, message, message_mac, require_mac=True):
+    if not message_mac:
+        if require_mac:
+            raise BadHmacValueError('Missing message hmac')
+    elif _calculate_hmac(auth_key, message) != message_mac:
         raise BadHmacValueError('Invalid message hmac')
     return pickle.loads(message)
 
 
+# Channels that have been unpickled (in child worker processes), keyed by
+# process id, port and identity, so that all the tasks a worker process runs
+# share a single connection (and batch) back to the process that created
+# them...
+_CHANNELS = {}
+_CHANNELS_LOCK = threading.Lock()
+
+
+def _fetch_channel(port, identity, auth_key, sign_messages=True,
+                   batch_delay=None, batch_size=None):
+    key = (os.getpid(), port, identity)
+    with _CHANNELS_LOCK:
+        try:
+            channel = _CHANNELS[key]
+        except KeyError:
+            channel = Channel(port, identity, auth_key,
+                              sign_messages=sign_messages,
+                              batch_delay=batch_delay,
+                              batch_size=batch_size)
+            _CHANNELS[key] = channel
+        return channel
+
+
 class Channel(object):
-    """Object that workers use to communicate back to their creator."""
+    """Object that workers use to communicate back to their creator.
+
+    Messages sent are framed (see :py:class:`.Reader` for the format),
+    buffered and then written in batches over a single connection; they
+    are **not** individually acknowledged. Buffered messages are written
+    once ``batch_size`` bytes of them have been buffered or ``batch_delay``
+    seconds after the first of them was buffered (whichever happens first).
+    When a sender needs to know that what it has sent has been dispatched
+    it should call :py:meth:`.flush` (which writes whatever is buffered
+    followed by a barrier that the receiver acknowledges once it has
+    dispatched everything before it).
+
+    When pickled (to be sent to a child worker process) a channel is
+    recreated (on unpickling) as a per-process shared channel, so that all
+    tasks that run in the same worker process reuse the same connection.
+    """
 
-    def __init__(self, port, identity, auth_key):
+    #: Default number of seconds that messages may stay buffered for.
+    BATCH_DELAY = 0.05
+
+    #: Default number of buffered bytes that causes them to be written.
+    BATCH_SIZE = 65536
+
+    def __init__(self, port, identity, auth_key, sign_messages=True,
+                 batch_delay=None, batch_size=None):
         self.identity = identity
         self.port = port
         self.auth_key = auth_key
+        self.sign_messages = sign_messages
+        if batch_delay is None:
+            batch_delay = self.BATCH_DELAY
+        self.batch_delay = batch_delay
+        if batch_size is None:
+            batch_size = self.BATCH_SIZE
+        self.batch_size = batch_size
         self.dead = False
         self._sent = self._received = 0
         self._socket = None
         self._read_pipe = None
         self._write_pipe = None
+        self._lock = threading.Lock()
+        self._buffered = []
+        self._buffered_size = 0
+        # Messages sent since the last acknowledged barrier...
+        self._unconfirmed = 0
+        self._flush_wanted = threading.Event()
+        self._flusher = None
+
+    def __reduce__(self):
+        return (_fetch_channel, (self.port, self.identity, self.auth_key,
+                                 self.sign_messages, self.batch_delay,
+                                 self.batch_size))
 
     def close(self):
+        with self._lock:
+            if self._socket is not None and self._buffered:
+                try:
+                    self._do_write()
+                except (IOError, socket.error):
+                    LOG.warning("Failed writing %s buffered messages before"
+                                " closing", self._unconfirmed, exc_info=True)
+            self._close()
+        # Let the flusher (if any) notice that it should stop...
+        self._flush_wanted.set()
+
+    def _close(self):
         if self._socket is not None:
             self._socket.close()
             self._socket = None
             self._read_pipe = None
             self._write_pipe = None
+        self._buffered = []
+        self._buffered_size = 0
+        self._unconfirmed = 0
 
     def _ensure_connected(self):
         if self._socket is None:
@@ -349,6 +454,32 @@ class Channel(object):
                 self._read_pipe = read_pipe
                 self._write_pipe = write_pipe
 
+    def _ensure_flusher(self):
+        if not threading_utils.is_alive(self._flusher):
+            self._flusher = threading_utils.daemon_thread(self._flush_later)
+            self._flusher.start()
+
+    def _flush_later(self):
+        while True:
+            self._flush_wanted.wait()
+            # Give other messages a chance to join this batch...
+            time.sleep(self.batch_delay)
+            with self._lock:
+                self._flush_wanted.clear()
+                if self._socket is None:
+                    # Closed (or died) while waiting, nothing to do...
+                    return
+                if not self._buffered:
+                    continue
+                try:
+                    self._do_write()
+                except (IOError, socket.error):
+                    LOG.warning("Failed writing %s buffered messages",
+                                len(self._buffered), exc_info=True)
+                    self.dead = True
+                    self._close()
+                    return
+
     def recv(self):
         self._ensure_connected()
         return self._do_recv()
@@ -380,8 +511,7 @@ class Channel(object):
     def _do_send(self, pieces, write_pipe=None):
         if write_pipe is None:
             write_pipe = self._write_pipe
-        for piece in pieces:
-            write_pipe.write(piece)
+        write_pipe.write(b"".join(pieces))
         write_pipe.flush()
 
     def _do_send_and_ack(self, pieces, write_pipe=None, read_pipe=None):
@@ -391,19 +521,59 @@ class Channel(object):
         su.schema_validate(msg, SCHEMAS[ACK])
         if msg != ACK:
             raise IOError("Failed receiving ack for sent"
-                          " message %s" % self._metrics['sent'])
+                          " message %s" % self._sent)
 
-    def send(self, message):
-        self._ensure_connected()
-        self._do_send_and_ack(_encode_message(self.auth_key, message,
-                                              self.identity))
+    def _do_write(self):
+        pieces = self._buffered
+        self._buffered = []
+        self._buffered_size = 0
+        self._do_send(pieces)
+
+    def send(self, message, identity=None):
+        """Buffers a message (to be written in a later batch).
+
+        :param identity: identity the message is sent as (the identity of
+                         this channel is used if not provided)
+        """
+        if identity is None:
+            identity = self.identity
+        pieces = _encode_message(self.auth_key, message, identity,
+                                 sign=self.sign_messages)
+        with self._lock:
+            self._ensure_connected()
+            self._buffered.extend(pieces)
+            self._buffered_size += sum(len(piece) for piece in pieces)
+            self._sent += 1
+            self._unconfirmed += 1
+            if (self._buffered_size >= self.batch_size
+                    or self.batch_delay <= 0):
+                self._do_write()
+            else:
+                self._ensure_flusher()
+                self._flush_wanted.set()
+
+    def flush(self):
+        """Writes buffered messages and waits until they are dispatched."""
+        with self._lock:
+            if self._socket is None or not self._unconfirmed:
+                return
+            self._buffered.extend(_encode_message(self.auth_key, BARRIER,
+                                                  self.identity))
+            self._do_write()
+            msg = self._do_recv()
+            su.schema_validate(msg, SCHEMAS[ACK])
+            if msg != ACK:
+                raise IOError("Failed receiving ack for barrier sent after"
+                              " %s messages" % self._unconfirmed)
+            self._unconfirmed = 0
 
 
 class EventSender(object):
     """Sends event information from a child worker process to its creator."""
 
-    def __init__(self, channel):
+    def __init__(self, channel, identity=None):
         self._channel = channel
+        self._identity = identity
         self._pid = None
 
     def __call__(self, event_type, details):
@@ -416,14 +586,248 @@ class EventSender(object):
                 'sent_on': time.time(),
             }
             LOG.trace("Sending %s (from child %s)", message, self._pid)
-            self._channel.send(message)
+            self._channel.send(message, identity=self._identity)
+
+
+def _run_and_flush(func, channel, task, *args, **kwargs):
+    # This runs in the child process, where it makes sure
+    # that the events the task sent have been dispatched (to the listeners
+    # of the task in the parent process) before the task is considered to
+    # have finished (after which the parent stops dispatching them).
+    try:
+        return func(task, *args, **kwargs)
+    finally:
+        if not channel.dead:
+            try:
+                channel.flush()
+            except (IOError, EOFError, socket.error, su.ValidationError):
+                LOG.warning("Failed flushing events sent by task '%s'",
+                            task.name, exc_info=True)
+
+
+# Tasks loaded (by the parent process, before it forks its worker processes)
+# keyed by pool identity and then by task key, worker processes inherit this
+# and then use what is in it (instead of each submission sending a task)...
+_PRELOADED = {}
+
+
+def _preload_key(task):
+    return (reflection.get_class_name(task), task.name, task.version)
+
+
+def _fetch_preloaded(pool_identity, key):
+    return _PRELOADED[pool_identity][key]
+
+
+def _count_preloaded(pool_identity):
+    return len(_PRELOADED.get(pool_identity, ()))
+
+
+class PreloadedTask(object):
+    """Reference to a task that worker processes have preloaded.
+
+    When pickled (to be sent to a child worker process) this is recreated
+    (on unpickling) as the task that the worker process preloaded (which
+    will be reused for all executions and reversions of that task that
+    worker process does).
+    """
+
+    def __init__(self, pool_identity, key):
+        self.pool_identity = pool_identity
+        self.key = key
+
+    def __reduce__(self):
+        return (_fetch_preloaded, (self.pool_identity, self.key))
+
+
+def _run_bound(func, event_types, listener, task, *args, **kwargs):
+    # This runs in the child process, where it binds the
+    # listener to the (preloaded and reused) task only for as long as it
+    # is running.
+    for event_type in event_types:
+        task.notifier.register(event_type, listener)
+    try:
+        return func(task, *args, **kwargs)
+    finally:
+        for event_type in event_types:
+            task.notifier.deregister(event_type, listener)
+
+
+class SharedBuffer(object):
+    """Handle to a value placed in a memory-mapped (temporary) file.
+
+    Instead of a (large) value being pickled and sent to (or from) a child
+    worker process it is written (once) into a temporary file and only this
+    handle is pickled and sent; the receiver then memory-maps that file
+    (using a private copy-on-write mapping, so the receiver may alter what
+    it is given without affecting the file) and rebuilds the value from
+    that mapping.
+
+    The following kinds of values can be shared:
+
+    * ``bytes`` (rebuilt as ``bytes``, which copies the mapped data once).
+    * ``bytearray`` (rebuilt as ``bytearray``, which copies the mapped
+      data once).
+    * ``memoryview`` (rebuilt as a ``memoryview`` over the mapped data).
+    * ``numpy.ndarray`` (rebuilt as an array over the mapped data, only
+      when numpy is importable).
+    """
+
+    #: Prefix of the temporary files that are created.
+    PREFIX = 'taskflow-shared-'
+
+    def __init__(self, path, kind, size, meta=None):
+        self.path = path
+        self.kind = kind
+        self.size = size
+        self.meta = meta
+
+    @staticmethod
+    def _classify(value):
+        if isinstance(value, six.binary_type):
+            return ('bytes', len(value), None)
+        if isinstance(value, bytearray):
+            return ('bytearray', len(value), None)
+        if isinstance(value, memoryview):
+            if getattr(value, 'c_contiguous', False):
+                return ('memoryview', value.nbytes,
+                        (value.format, value.shape))
+            return (None, 0, None)
+        if (np is not None and isinstance(value, np.ndarray)
+                and value.flags.c_contiguous and not value.dtype.hasobject):
+            return ('ndarray', value.nbytes, (value.dtype.str, value.shape))
+        return (None, 0, None)
+
+    @classmethod
+    def maybe_create(cls, value, threshold, directory=None):
+        """Shares the given value (if it can and should be shared).
+
+        :returns: a new handle (or ``None`` if the value is not of a kind
+                  that can be shared or is smaller than the threshold)
+        """
+        kind, size, meta = cls._classify(value)
+        if kind is None or size < threshold:
+            return None
+        fd, path = tempfile.mkstemp(prefix=cls.PREFIX, dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                if kind == 'ndarray':
+                    fh.write(value.data)
+                else:
+                    fh.write(value)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                _remove_file(path)
+        return cls(path, kind, size, meta=meta)
+
+    def open(self):
+        """Rebuilds the shared value from a mapping of the shared file."""
+        with open(self.path, 'rb') as fh:
+            mapped = mmap.mmap(fh.fileno(), self.size,
+                               access=mmap.ACCESS_COPY)
+        if self.kind == 'bytes':
+            return mapped[:]
+        if self.kind == 'bytearray':
+            return bytearray(mapped)
+        if self.kind == 'memoryview':
+            view = memoryview(mapped)
+            view_format, view_shape = self.meta
+            if view_format != 'B' or len(view_shape) != 1:
+                view = view.cast(view_format, view_shape)
+            return view
+        dtype, shape = self.meta
+        return np.frombuffer(mapped, dtype=np.dtype(dtype)).reshape(shape)
+
+    def destroy(self):
+        """Removes the shared file (existing mappings remain usable)."""
+        _remove_file(self.path)
+
+
+def _remove_file(path):
+    try:
+        os.unlink(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            LOG.warning("Failed removing shared file '%s'", path,
+                        exc_info=True)
+
+
+def _open_shared(value, destroy=False):
+    if not isinstance(value, SharedBuffer):
+        return value
+    try:
+        return value.open()
+    finally:
+        if destroy:
+            value.destroy()
+
+
+def _run_shared(func, share_threshold, share_directory,
+                task, arguments, *args, **kwargs):
+    # This runs in the child process, where it rebuilds the
+    # values that the parent shared, runs the desired function and then
+    # shares its result (if it can and should be shared) with the parent.
+    arguments = dict((k, _open_shared(v))
+                     for k, v in six.iteritems(arguments))
+    args = [_open_shared(arg) for arg in args]
+    outcome, result = func(task, arguments, *args, **kwargs)
+    try:
+        shared = SharedBuffer.maybe_create(result, share_threshold,
+                                           directory=share_directory)
+    except (IOError, OSError):
+        LOG.warning("Failed sharing result of task '%s' (it will be"
+                    " sent normally instead)", task.name, exc_info=True)
+    else:
+        if shared is not None:
+            result = shared
+    return (outcome, result)
+
+
+class _SharedResultFuture(futurist.Future):
+    """Future that rebuilds (and cleans up) shared values on completion."""
+
+    def __init__(self, fut, shared):
+        super(_SharedResultFuture, self).__init__()
+        self._fut = fut
+        self._shared = shared
+        fut.add_done_callback(self._on_done)
+
+    def cancel(self):
+        # Our own state is cancelled (or not) by the done callback that
+        # the wrapped future triggers (if it can be cancelled).
+        self._fut.cancel()
+        return self.cancelled()
+
+    def _on_done(self, fut):
+        for shared in self._shared:
+            shared.destroy()
+        if fut.cancelled():
+            super(_SharedResultFuture, self).cancel()
+            return
+        exc = fut.exception()
+        if exc is not None:
+            self.set_exception(exc)
+        else:
+            outcome, result = fut.result()
+            try:
+                result = _open_shared(result, destroy=True)
+            except Exception as e:
+                self.set_exception(e)
+            else:
+                self.set_result((outcome, result))
 
 
 class DispatcherHandler(asyncore.dispatcher):
-    """Dispatches from a single connection into a target."""
+    """Dispatches from a single connection into targets.
+
+    A connection (once it has passed the challenge sequence) may carry
+    messages for many targets (each message identifies which target it is
+    for), it is typically shared by all the tasks a single child worker
+    process runs.
+    """
 
     #: Read/write chunk size.
-    CHUNK_SIZE = 8192
+    CHUNK_SIZE = 65536
 
     def __init__(self, sock, addr, dispatcher):
         if six.PY2:
@@ -434,6 +838,7 @@ class DispatcherHandler(asyncore.dispatcher):
         self.blobs_to_write = list(dispatcher.challenge_pieces)
         self.reader = Reader(dispatcher.auth_key, self._dispatch)
         self.targets = dispatcher.targets
+        self.require_mac = dispatcher.sign_messages
         self.tied_to = None
         self.challenge_responded = False
         self.ack_pieces = _encode_message(dispatcher.auth_key, ACK,
@@ -475,27 +880,31 @@ class DispatcherHandler(asyncore.dispatcher):
                 self.tied_to = from_who
                 self._send_ack()
         else:
-            if self.tied_to != from_who:
-                raise UnknownSender("Sender %s previously identified as %s"
-                                    " changed there identity to %s after"
-                                    " challenge sequence" % (self.addr,
-                                                             self.tied_to,
-                                                             from_who))
+            msg = msg_decoder_func(require_mac=self.require_mac)
+            if msg == BARRIER:
+                # Everything sent before this has now been dispatched, so
+                # let the sender know that...
+                if from_who != self.tied_to:
+                    raise UnknownSender("Sender %s previously identified as"
+                                        " %s sent a barrier as %s after"
+                                        " challenge sequence"
+                                        % (self.addr, self.tied_to,
+                                           from_who))
+                self._send_ack()
+                return
+            su.schema_validate(msg, SCHEMAS[EVENT])
             try:
                 task = self.targets[from_who]
             except KeyError:
-                raise UnknownSender("Unknown message from %s (%s) not matched"
-                                    " to any known target" % (self.addr,
-                                                              from_who))
-            msg = msg_decoder_func()
-            su.schema_validate(msg, SCHEMAS[EVENT])
+                LOG.warning("Discarding message from %s (%s) not matched to"
+                            " any known target", self.addr, from_who)
+                return
             if LOG.isEnabledFor(logging.TRACE):
                 msg_delay = max(0, time.time() - msg['sent_on'])
                 LOG.trace("Dispatching message from %s (%s) (it took %0.3f"
                           " seconds for it to arrive for processing after"
                           " being sent)", self.addr, from_who, msg_delay)
             task.notifier.notify(msg['event_type'], msg.get('details'))
-            self._send_ack()
 
     def handle_read(self):
         data = self.recv(self.CHUNK_SIZE)
@@ -524,12 +933,13 @@ class Dispatcher(asyncore.dispatcher):
     #: See https://docs.python.org/2/library/socket.html#socket.socket.listen
     MAX_BACKLOG = 5
 
-    def __init__(self, map, auth_key, identity):
+    def __init__(self, map, auth_key, identity, sign_messages=True):
         if six.PY2:
             asyncore.dispatcher.__init__(self, map=map)
         else:
             super(Dispatcher, self).__init__(map=map)
         self.identity = identity
+        self.sign_messages = sign_messages
         self.challenge_pieces = _encode_message(auth_key, CHALLENGE,
                                                 identity, reverse=True)
         self.auth_key = auth_key
@@ -579,6 +989,37 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
     particular) are proxied correctly from that external process to the one
     that is alive in the parent process to ensure that callbacks registered in
     the parent are executed on events in the child.
+
+    When a ``share_threshold`` (in bytes) is provided task arguments (and
+    a reverting tasks prior result) and task results whose size is at least
+    that threshold will be placed into memory-mapped temporary files (in
+    the ``share_directory`` directory, or the default temporary directory
+    if not provided) with only a handle to them being pickled (see
+    :py:class:`.SharedBuffer` for what kinds of values are shared and how
+    they are given back). The files of shared arguments are removed once the
+    task has finished; the files of shared results are removed once they
+    have been mapped by this process (so the memory stays alive only as long
+    as the result produced from it is, typically as long as storage retains
+    it). Only top-level values (**not** values contained in other values)
+    are shared.
+
+    Events that tasks emit (in child worker processes) are sent back over a
+    single connection per worker process (see :py:class:`.Channel`) in
+    batches (that are written at most ``batch_delay`` seconds after being
+    sent); each message is signed unless ``sign_messages`` is false (the
+    connection itself is always authenticated). Before a task is considered
+    finished, the events it emitted are waited on to have been dispatched.
+
+    When ``preload_tasks`` is true (and this executor creates its own process
+    pool) the tasks given to :py:meth:`.preload` are copied (once) and the
+    worker processes are pre-forked when starting, so that they inherit
+    those copies; submissions of those tasks then only send a
+    :py:class:`.PreloadedTask` reference (and the tasks arguments) instead
+    of a pickled copy of the task. Each worker process reuses its copy of
+    a task for all executions (and reversions) of it, so tasks should not
+    rely on per-execution instance state. This requires that worker
+    processes are forked (if it is detected that they were not, tasks are
+    sent with each submission instead).
     """
 
     #: Default timeout used by asyncore io loop (and eventually select/poll).
@@ -587,6 +1028,11 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
     constructor_options = [
         ('max_workers', lambda v: v if v is None else int(v)),
         ('wait_timeout', lambda v: v if v is None else float(v)),
+        ('share_threshold', lambda v: v if v is None else int(v)),
+        ('share_directory', lambda v: v),
+        ('sign_messages', strutils.bool_from_string),
+        ('batch_delay', lambda v: v if v is None else float(v)),
+        ('preload_tasks', strutils.bool_from_string),
     ]
     """
     Optional constructor keyword arguments this executor supports. These will
@@ -596,12 +1042,36 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
     """
 
     def __init__(self, executor=None,
-                 max_workers=None, wait_timeout=None):
+                 max_workers=None, wait_timeout=None,
+                 share_threshold=None, share_directory=None,
+                 sign_messages=True, batch_delay=None,
+                 preload_tasks=False):
         super(ParallelProcessTaskExecutor, self).__init__(
             executor=executor, max_workers=max_workers)
+        if share_threshold is not None and share_threshold <= 0:
+            raise ValueError("Provided share threshold must be greater"
+                             " than zero and not '%s'" % share_threshold)
+        if batch_delay is not None and batch_delay < 0:
+            raise ValueError("Provided batch delay must be greater"
+                             " than or equal to zero and not '%s'"
+                             % batch_delay)
+        self._share_threshold = share_threshold
+        self._share_directory = share_directory
+        self._sign_messages = sign_messages
+        self._batch_delay = batch_delay
         self._auth_key = _create_random_string(32)
         self._dispatcher = Dispatcher({}, self._auth_key,
-                                      _create_random_string(32))
+                                      _create_random_string(32),
+                                      sign_messages=sign_messages)
+        # Identity of the channel (and connection) that each child worker
+        # process will send its tasks events over...
+        self._channel_identity = _create_random_string(32)
+        self._preload_tasks = preload_tasks
+        self._pool_identity = _create_random_string(32)
+        # Copies of tasks to preload (on start) and the ones that have
+        # been preloaded (after starting)...
+        self._preloadable = {}
+        self._preloaded = {}
         if wait_timeout is None:
             self._wait_timeout = self.WAIT_TIMEOUT
         else:
@@ -619,7 +1089,15 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
         if threading_utils.is_alive(self._worker):
             raise RuntimeError("Worker thread must be stopped via stop()"
                                " before starting/restarting")
+        preloading = (self._preload_tasks and self._own_executor
+                      and self._preloadable)
+        if preloading:
+            # This must exist before worker processes are forked (which
+            # happens once tasks are first submitted to the pool)...
+            _PRELOADED[self._pool_identity] = self._preloadable
         super(ParallelProcessTaskExecutor, self).start()
+        if preloading:
+            self._prefork()
         self._dispatcher.setup()
         self._worker = threading_utils.daemon_thread(
             asyncore.loop, map=self._dispatcher.map,
@@ -628,11 +1106,67 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
 
     def stop(self):
         super(ParallelProcessTaskExecutor, self).stop()
+        self._preloaded = {}
+        _PRELOADED.pop(self._pool_identity, None)
         self._dispatcher.close()
         if threading_utils.is_alive(self._worker):
             self._worker.join()
             self._worker = None
 
+    def preload(self, tasks):
+        if self._preload_tasks:
+            self._preloadable = dict(
+                (_preload_key(task), task.copy(retain_listeners=False))
+                for task in tasks)
+
+    def _prefork(self):
+        max_workers = self._max_workers
+        if max_workers is None:
+            try:
+                max_workers = multiprocessing.cpu_count()
+            except NotImplementedError:
+                max_workers = 1
+        futs = [self._executor.submit(_count_preloaded, self._pool_identity)
+                for _i in six.moves.range(0, max_workers)]
+        if all(fut.result() == len(self._preloadable) for fut in futs):
+            self._preloaded = self._preloadable
+        else:
+            LOG.warning("Worker processes did not inherit the %s preloaded"
+                        " tasks (they are likely not being forked), tasks"
+                        " will be sent with each submission instead",
+                        len(self._preloadable))
+            _PRELOADED.pop(self._pool_identity, None)
+
+    def _share(self, value, shared):
+        try:
+            maybe_shared = SharedBuffer.maybe_create(
+                value, self._share_threshold,
+                directory=self._share_directory)
+        except (IOError, OSError):
+            LOG.warning("Failed sharing value (it will be sent normally"
+                        " instead)", exc_info=True)
+            return value
+        if maybe_shared is None:
+            return value
+        shared.append(maybe_shared)
+        return maybe_shared
+
+    def _submit_shared(self, priority, func, task, arguments,
+                       *args, **kwargs):
+        shared = []
+        arguments = dict((k, self._share(v, shared))
+                         for k, v in six.iteritems(arguments))
+        args = [self._share(arg, shared) for arg in args]
+        try:
+            fut = self._submit_to_executor(
+                priority, _run_shared, func, self._share_threshold,
+                self._share_directory, task, arguments, *args, **kwargs)
+        except RuntimeError:
+            with excutils.save_and_reraise_exception():
+                for maybe_shared in shared:
+                    maybe_shared.destroy()
+        return _SharedResultFuture(fut, shared)
+
     def _submit_task(self, func, task, *args, **kwargs):
         """Submit a function to run the given task (with given args/kwargs).
 
@@ -657,25 +1191,35 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
         now instead of calling the desired listeners just place messages
         for this process (a dispatcher thread that is created in this class)
         to dispatch to the original task (using a common accepting socket and
-        per task sender socket that is used and associated to know
-        which task to proxy back too, since it is possible that there many
-        be *many* subprocess running at the same time).
-
-        Once the subprocess task has finished execution, the executor will
-        then trigger a callback that will remove the task + target from the
-        dispatcher (which will stop any further proxying back to the original
-        task).
+        a per worker process sender socket, with each message sent over it
+        being tagged with a per task identity that is used to know which task
+        to proxy back too, since it is possible that there many be *many*
+        subprocess running at the same time).
+
+        Before the subprocess task finishes execution it waits for the
+        events it sent to have been dispatched; once it has finished, the
+        executor will then trigger a callback that will remove the task +
+        target from the dispatcher (which will stop any further proxying
+        back to the original task).
         """
         progress_callback = kwargs.pop('progress_callback', None)
-        clone = task.copy(retain_listeners=False)
+        key = _preload_key(task)
+        if key in self._preloaded:
+            clone = PreloadedTask(self._pool_identity, key)
+        else:
+            clone = task.copy(retain_listeners=False)
         identity = _create_random_string(32)
-        channel = Channel(self._dispatcher.port, identity, self._auth_key)
+        channel = Channel(self._dispatcher.port, self._channel_identity,
+                          self._auth_key, sign_messages=self._sign_messages,
+                          batch_delay=self._batch_delay)
 
         def rebind_task():
             # Creates and binds proxies for all events the task could receive
             # so that when the clone runs in another process that this task
             # can receive the same notifications (thus making it look like the
             # the notifications are transparently happening in this process).
+            # Returns the function to submit (or none if nothing needs to be
+            # proxied).
             proxy_event_types = set()
             for (event_type, listeners) in task.notifier.listeners_iter():
                 if listeners:
@@ -704,10 +1248,17 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
                 # the needed task and it will do the work of using the
                 # channel object to send back messages to this process for
                 # dispatch into the local task.
-                sender = EventSender(channel)
+                sender = EventSender(channel, identity=identity)
+                if isinstance(clone, PreloadedTask):
+                    # The preloaded task will be bound to it (and unbound
+                    # from it) by the worker process that runs it...
+                    return functools.partial(_run_bound, func,
+                                             tuple(proxy_event_types),
+                                             sender)
                 for event_type in proxy_event_types:
                     clone.notifier.register(event_type, sender)
-            return bool(proxy_event_types)
+                return func
+            return None
 
         def register():
             if progress_callback is not None:
@@ -721,11 +1272,18 @@ class ParallelProcessTaskExecutor(base.ParallelTaskExecutor):
                                          progress_callback)
             self._dispatcher.targets.pop(identity, None)
 
-        should_register = rebind_task()
+        bound_func = rebind_task()
+        should_register = bound_func is not None
         if should_register:
             register()
+            func = functools.partial(_run_and_flush, bound_func, channel)
         try:
-            fut = self._executor.submit(func, clone, *args, **kwargs)
+            if self._share_threshold:
+                fut = self._submit_shared(task.priority, func, clone,
+                                          *args, **kwargs)
+            else:
+                fut = self._submit_to_executor(task.priority, func, clone,
+                                               *args, **kwargs)
         except RuntimeError:
             with excutils.save_and_reraise_exception():
                 if should_register:
@@ -16,8 +16,10 @@
 
 import collections
 import functools
+import itertools
 
 from futurist import waiters
+import six
 
 from taskflow import deciders as de
 from taskflow.engines.action_engine.actions import retry as ra
@@ -32,6 +34,7 @@ from taskflow.engines.action_engine import traversal as tr
 from taskflow import exceptions as exc
 from taskflow import logging
 from taskflow import states as st
+from taskflow import task as task_atom
 from taskflow.utils import misc
 
 from taskflow.flow import (LINK_DECIDER, LINK_DECIDER_DEPTH)  # noqa
@@ -62,6 +65,55 @@ class Runtime(object):
         self._atom_cache = {}
         self._options = misc.safe_copy_dict(options)
 
+    def _find_reducers(self, graph):
+        """Finds which atoms produce values reducers reduce.
+
+        Only the atom that storage would fetch a reduced value from (the
+        nearest one in the scope of the reducer) is considered to produce
+        that value. Returns the reducers (and names) each producing atoms
+        result is reduced by and the names of the producing atoms whose
+        results nothing but those reducers requires (these results can be
+        released once they have been reduced).
+        """
+        consumers = collections.defaultdict(set)
+        for node, node_data in graph.nodes_iter(data=True):
+            if node_data['kind'] not in com.ATOMS:
+                continue
+            for name in itertools.chain(node.requires, node.optional,
+                                        node.revert_optional):
+                consumers[name].add(node)
+        reducers = collections.defaultdict(list)
+        for node in graph.nodes_iter():
+            if not isinstance(node, task_atom.StreamingReduceTask):
+                continue
+            producers = collections.defaultdict(list)
+            remaining = set(node.requires)
+            for atom_names in self.fetch_scopes_for(node.name):
+                for atom_name in atom_names:
+                    atom = self._atom_cache[atom_name]['atom']
+                    provided_names = remaining.intersection(atom.provides)
+                    if not provided_names:
+                        continue
+                    remaining.difference_update(provided_names)
+                    if graph.node[atom]['kind'] == com.TASK:
+                        producers[atom_name].extend(provided_names)
+                if not remaining:
+                    break
+            for atom_name, names in six.iteritems(producers):
+                reducers[atom_name].append((node, sorted(names)))
+        releasable = set()
+        for atom_name, atom_reducers in six.iteritems(reducers):
+            atom = self._atom_cache[atom_name]['atom']
+            reduced_by = collections.defaultdict(set)
+            for reducer, names in atom_reducers:
+                for name in names:
+                    reduced_by[name].add(reducer)
+            if all(name in reduced_by and
+                   consumers[name].issubset(reduced_by[name])
+                   for name in atom.provides):
+                releasable.add(atom_name)
+        return reducers, releasable
+
     def _walk_edge_deciders(self, graph, atom):
         """Iterates through all nodes, deciders that alter atoms execution."""
         # This is basically a reverse breadth first exploration, with
@@ -100,7 +152,7 @@ class Runtime(object):
         Build out a cache of commonly used item that are associated
         with the contained atoms (by name), and are useful to have for
         quick lookup on (for example, the change state handler function for
-        each atom, the scope walker object for each atom, the task or retry
+        each atom, the atom object itself for each atom name, the task or retry
         specific scheduler and so-on).
         """
         change_state_handlers = {
@@ -135,16 +187,24 @@ class Runtime(object):
                                              " encountered" % node_kind)
             metadata = {}
             deciders_it = self._walk_edge_deciders(graph, node)
-            walker = sc.ScopeWalker(self.compilation, node, names_only=True)
-            metadata['scope_walker'] = walker
+            metadata['atom'] = node
             metadata['check_transition_handler'] = check_transition_handler
             metadata['change_state_handler'] = change_state_handler
             metadata['scheduler'] = scheduler
             metadata['edge_deciders'] = tuple(deciders_it)
             metadata['action'] = action
+            metadata['reducers'] = ()
+            metadata['release_reduced'] = False
             LOG.trace("Compiled %s metadata for node %s (%s)",
                       metadata, node.name, node_kind)
             self._atom_cache[node.name] = metadata
+        # This needs the scopes of the reducers (and the atoms that are
+        # visible in them), so it can only be done after the above...
+        reducers, releasable = self._find_reducers(graph)
+        for atom_name, atom_reducers in six.iteritems(reducers):
+            metadata = self._atom_cache[atom_name]
+            metadata['reducers'] = tuple(atom_reducers)
+            metadata['release_reduced'] = atom_name in releasable
         # TODO(harlowja): optimize the different decider depths to avoid
         # repeated full successor searching; this can be done by searching
         # for the widest depth of parent(s), and limiting the search of
@@ -196,7 +256,11 @@ class Runtime(object):
     def task_action(self):
         return ta.TaskAction(self._storage,
                              self._atom_notifier,
-                             self._task_executor)
+                             self._task_executor,
+                             min_progress_interval=float(
+                                 self._options.get('progress_interval', 0.0)),
+                             min_progress_delta=float(
+                                 self._options.get('progress_delta', 0.0)))
 
     def _fetch_atom_metadata_entry(self, atom_name, metadata_key):
         return self._atom_cache[atom_name][metadata_key]
@@ -224,23 +288,46 @@ class Runtime(object):
         # not exist and therefore doesn't need to handle that case).
         return self._fetch_atom_metadata_entry(atom.name, 'scheduler')
 
+    def fetch_reducers(self, atom):
+        """Fetches the reducers (+ names) that reduce the atoms results."""
+        # This does not check if the name exists (since this is only used
+        # internally to the engine, and is not exposed to atoms that will
+        # not exist and therefore doesn't need to handle that case).
+        return self._fetch_atom_metadata_entry(atom.name, 'reducers')
+
+    def can_release_reduced(self, atom):
+        """Checks if the atoms result can be released once it is reduced."""
+        # This does not check if the name exists (since this is only used
+        # internally to the engine, and is not exposed to atoms that will
+        # not exist and therefore doesn't need to handle that case).
+        return self._fetch_atom_metadata_entry(atom.name, 'release_reduced')
+
     def fetch_action(self, atom):
         """Fetches the cached action handler for the given atom."""
         metadata = self._atom_cache[atom.name]
         return metadata['action']
 
     def fetch_scopes_for(self, atom_name):
-        """Fetches a walker of the visible scopes for the given atom."""
+        """Fetches a table of the visible scopes for the given atom."""
+        scope_tables = self._compilation.scope_tables
         try:
-            return self._fetch_atom_metadata_entry(atom_name, 'scope_walker')
+            return scope_tables[atom_name]
         except KeyError:
-            # This signals to the caller that there is no walker for whatever
-            # atom name was given that doesn't really have any associated atom
-            # known to be named with that name; this is done since the storage
-            # layer will call into this layer to fetch a scope for a named
-            # atom and users can provide random names that do not actually
-            # exist...
-            return None
+            try:
+                atom = self._fetch_atom_metadata_entry(atom_name, 'atom')
+            except KeyError:
+                # This signals to the caller that there is no table for
+                # whatever atom name was given that doesn't really have any
+                # associated atom known to be named with that name; this is
+                # done since the storage layer will call into this layer to
+                # fetch a scope for a named atom and users can provide random
+                # names that do not actually exist...
+                return None
+            # This is only done once per atom (and then is
+            # shared by anything else using the same compilation); it is done
+            # lazily since many atoms never need to look up any arguments.
+            walker = sc.ScopeWalker(self._compilation, atom, names_only=True)
+            return scope_tables.setdefault(atom_name, walker.flatten())
 
     # Various helper methods used by the runtime components; not for public
     # consumption...
@@ -297,8 +384,14 @@ class Runtime(object):
                 change_state_handler = self._fetch_atom_metadata_entry(
                     atom.name, 'change_state_handler')
                 change_state_handler(atom, state)
+                if (state == st.PENDING
+                        and isinstance(atom, task_atom.StreamingReduceTask)):
+                    # It will be ran again, so anything it reduced
+                    # before will be reduced again...
+                    self.storage.cleanup_reduction(atom.name)
             if intention:
                 self.storage.set_atom_intention(atom.name, intention)
+        self.selector.refresh(atom for (atom, _state, _intention) in tweaked)
         return tweaked
 
     def reset_all(self, state=st.PENDING, intention=st.EXECUTE):
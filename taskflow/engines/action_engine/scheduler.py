@@ -14,8 +14,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import weakref
 
+import six
+
 from taskflow import exceptions as excp
 from taskflow import states as st
 from taskflow.types import failure
@@ -75,11 +78,71 @@ class TaskScheduler(object):
                                         " intention: %s" % intention)
 
 
+class ResourceLimiter(object):
+    """Limits how many atoms (of each resource class) run at the same time.
+
+    Atoms declare the resource classes they use via their ``resources``
+    attribute; resource classes that this limiter was **not** provided a
+    limit for are not limited.
+    """
+
+    def __init__(self, limits=None):
+        self._limits = {}
+        if limits:
+            for resource, limit in six.iteritems(limits):
+                limit = int(limit)
+                if limit <= 0:
+                    raise ValueError("Resource class '%s' limit must be"
+                                     " greater than zero" % resource)
+                self._limits[resource] = limit
+        self._in_use = collections.defaultdict(int)
+
+    @property
+    def limits(self):
+        """Copy of the resource class limits this limiter enforces."""
+        return self._limits.copy()
+
+    def _fetch_limited(self, atom):
+        if not self._limits:
+            return ()
+        return set(resource for resource in getattr(atom, 'resources', ())
+                   if resource in self._limits)
+
+    def acquire(self, atom):
+        """Reserves the atoms resource classes (if they are not all in use)."""
+        limited = self._fetch_limited(atom)
+        for resource in limited:
+            if self._in_use[resource] >= self._limits[resource]:
+                return False
+        for resource in limited:
+            self._in_use[resource] += 1
+        return True
+
+    def release(self, atom):
+        """Releases the atoms (previously acquired) resource classes."""
+        for resource in self._fetch_limited(atom):
+            self._in_use[resource] -= 1
+
+    def reset(self):
+        """Forgets about all currently acquired resource classes."""
+        self._in_use.clear()
+
+
 class Scheduler(object):
     """Safely schedules atoms using a runtime ``fetch_scheduler`` routine."""
 
     def __init__(self, runtime):
         self._runtime = weakref.proxy(runtime)
+        self._limiter = ResourceLimiter(
+            runtime.options.get('resource_limits'))
+
+    def release(self, atom):
+        """Releases what scheduling of the (now completed) atom acquired."""
+        self._limiter.release(atom)
+
+    def reset(self):
+        """Forgets about all atoms previously scheduled (and not released)."""
+        self._limiter.reset()
 
     def schedule(self, atoms):
         """Schedules the provided atoms for *future* completion.
@@ -89,15 +152,28 @@ class Scheduler(object):
         purposes). It should also return any failure objects that represented
         scheduling failures that may have occurred during this scheduling
         process.
+
+        Atoms that use a resource class that is already at its limit are
+        deferred (they are skipped and no future is returned for them); they
+        should be provided again later (after some other atoms have
+        completed and been released).
         """
         futures = set()
+        selector = self._runtime.selector
         for atom in atoms:
+            if not self._limiter.acquire(atom):
+                continue
             scheduler = self._runtime.fetch_scheduler(atom)
             try:
                 futures.add(scheduler.schedule(atom))
             except Exception:
+                self._limiter.release(atom)
                 # Immediately stop scheduling future work so that we can
                 # exit execution early (rather than later) if a single atom
                 # fails to schedule correctly.
                 return (futures, [failure.Failure()])
+            finally:
+                # The atom (likely) transitioned into a running (or reverting)
+                # state, make sure the selector knows about that.
+                selector.refresh([atom])
         return (futures, [])
@@ -116,3 +116,53 @@ class ScopeWalker(object):
             else:
                 yield visible
             last = parent
+
+    def flatten(self):
+        """Flattens the visible scopes into a :py:class:`.ScopeTable`."""
+        if self._names_only:
+            return ScopeTable(iter(self))
+        else:
+            return ScopeTable([a.name for a in visible] for visible in self)
+
+
+class ScopeTable(object):
+    """Flattened (precompiled) visible scopes of a single atom.
+
+    For internal usage only.
+
+    Iterating over this provides the same scopes (as tuples of atom names)
+    that a ``names_only`` :py:class:`.ScopeWalker` would, but without any
+    graph or tree traversal; it also allows for finding the scope level
+    (and position) of a visible atom name without iterating at all.
+    """
+
+    __slots__ = ('_names', '_bounds', '_locations')
+
+    def __init__(self, scopes):
+        names = []
+        bounds = []
+        locations = {}
+        for level, scope_names in enumerate(scopes):
+            for name in scope_names:
+                locations.setdefault(name, (level, len(names)))
+                names.append(name)
+            bounds.append(len(names))
+        self._names = tuple(names)
+        self._bounds = tuple(bounds)
+        self._locations = locations
+
+    def __iter__(self):
+        start = 0
+        for end in self._bounds:
+            yield self._names[start:end]
+            start = end
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def locate(self, name):
+        """Returns the ``(level, position)`` of a visible atom name.
+
+        If the atom name is not visible then none is returned.
+        """
+        return self._locations.get(name)
@@ -14,18 +14,89 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import operator
 import weakref
 
 from taskflow.engines.action_engine import compiler as co
 from taskflow.engines.action_engine import deciders
-from taskflow.engines.action_engine import traversal
 from taskflow import logging
 from taskflow import states as st
 from taskflow.utils import iter_utils
 
 LOG = logging.getLogger(__name__)
 
+# Atom states + intentions that allow successors to execute (if *all* the
+# predecessors of that atom also allow this).
+_EXECUTE_OK_STATES = (st.SUCCESS, st.IGNORE)
+_EXECUTE_OK_INTENTIONS = (st.EXECUTE, st.IGNORE)
+
+# Atom states that allow predecessors to revert (if *all* the successors
+# of that atom also allow this).
+_REVERT_OK_STATES = (st.PENDING, st.REVERTED, st.IGNORE)
+
+
+class _BlockerTracker(object):
+    """Tracks how many directly connected nodes are blocking each node.
+
+    For internal usage only.
+
+    A node is *satisfied* when its own state is acceptable and none of the
+    nodes it depends on (its predecessors when tracking execution, its
+    successors when tracking reversion) are unsatisfied. Counters are kept
+    for **all** nodes (including ``noop`` flow nodes, which are always
+    acceptable) so that being satisfied is transitive while changes only
+    ever need to examine direct neighbors (and only continue onward when
+    a neighbors satisfaction actually flips).
+    """
+
+    def __init__(self, blockers_fetcher, dependents_fetcher):
+        self._blockers_fetcher = blockers_fetcher
+        self._dependents_fetcher = dependents_fetcher
+        self._blocked_by = {}
+        self._acceptable = set()
+
+    def is_satisfied(self, node):
+        return node in self._acceptable and not self._blocked_by[node]
+
+    def is_unblocked(self, node):
+        return not self._blocked_by[node]
+
+    def build(self, ordered_nodes, acceptable_nodes):
+        """Builds all counters (nodes **must** be in dependency order)."""
+        self._acceptable = set(acceptable_nodes)
+        self._blocked_by = {}
+        for node in ordered_nodes:
+            blocked_by = 0
+            for other in self._blockers_fetcher(node):
+                if not self.is_satisfied(other):
+                    blocked_by += 1
+            self._blocked_by[node] = blocked_by
+
+    def change(self, node, acceptable):
+        """Changes a nodes acceptability (adjusting affected counters)."""
+        was_satisfied = self.is_satisfied(node)
+        if acceptable:
+            self._acceptable.add(node)
+        else:
+            self._acceptable.discard(node)
+        now_satisfied = self.is_satisfied(node)
+        if was_satisfied == now_satisfied:
+            return
+        flipped = collections.deque([(node, now_satisfied)])
+        while flipped:
+            node, now_satisfied = flipped.popleft()
+            if now_satisfied:
+                delta = -1
+            else:
+                delta = 1
+            for other in self._dependents_fetcher(node):
+                other_was_satisfied = self.is_satisfied(other)
+                self._blocked_by[other] += delta
+                other_now_satisfied = self.is_satisfied(other)
+                if other_was_satisfied != other_now_satisfied:
+                    flipped.append((other, other_now_satisfied))
+
 
 class Selector(object):
     """Selector that uses a compilation and aids in execution processes.
@@ -35,15 +106,83 @@ class Selector(object):
     edge relations...) and using this information along with the atom
     state/states stored in storage to provide other useful functionality to
     the rest of the runtime system.
+
+    To avoid re-walking (and re-fetching the states of) all the predecessors
+    or successors of an atom every time readiness is checked it maintains
+    per-node counters of unsatisfied predecessors (for execution) and
+    successors (for reversion); these are built from storage on first
+    usage (or after :py:meth:`.reset`) and are then kept up to date
+    by :py:meth:`.refresh` being called with the atoms that have had there
+    state and/or intention changed.
     """
 
     def __init__(self, runtime):
         self._runtime = weakref.proxy(runtime)
         self._storage = runtime.storage
         self._execution_graph = runtime.compilation.execution_graph
+        graph = self._execution_graph
+        self._execute_tracker = _BlockerTracker(graph.predecessors_iter,
+                                                graph.successors_iter)
+        self._revert_tracker = _BlockerTracker(graph.successors_iter,
+                                               graph.predecessors_iter)
+        self._tracking = False
+
+    def reset(self):
+        """Forgets all tracked readiness (it will be rebuilt when needed).
+
+        This should be used when atom states may have been altered
+        without :py:meth:`.refresh` being told about it (for example
+        when resuming).
+        """
+        self._tracking = False
+
+    def _ensure_tracking(self):
+        if self._tracking:
+            return
+        graph = self._execution_graph
+        ordered_nodes = list(graph.topological_sort())
+        atoms = [node for node in ordered_nodes
+                 if graph.node[node]['kind'] in co.ATOMS]
+        atom_states = self._storage.get_atoms_states(atom.name
+                                                     for atom in atoms)
+        execute_ok = []
+        revert_ok = []
+        for node in ordered_nodes:
+            if graph.node[node]['kind'] in co.ATOMS:
+                state, intention = atom_states[node.name]
+                if (state in _EXECUTE_OK_STATES
+                        and intention in _EXECUTE_OK_INTENTIONS):
+                    execute_ok.append(node)
+                if state in _REVERT_OK_STATES:
+                    revert_ok.append(node)
+            else:
+                execute_ok.append(node)
+                revert_ok.append(node)
+        self._execute_tracker.build(ordered_nodes, execute_ok)
+        self._revert_tracker.build(reversed(ordered_nodes), revert_ok)
+        self._tracking = True
+
+    def refresh(self, atoms):
+        """Refreshes tracked readiness of the given (now altered) atoms."""
+        if not self._tracking:
+            # Nothing to refresh, it will be built (with the latest atom
+            # states and intentions) on next usage...
+            return
+        atoms = list(atoms)
+        if not atoms:
+            return
+        atom_states = self._storage.get_atoms_states(atom.name
+                                                     for atom in atoms)
+        for atom in atoms:
+            state, intention = atom_states[atom.name]
+            self._execute_tracker.change(
+                atom, (state in _EXECUTE_OK_STATES
+                       and intention in _EXECUTE_OK_INTENTIONS))
+            self._revert_tracker.change(atom, state in _REVERT_OK_STATES)
 
     def iter_next_atoms(self, atom=None):
         """Iterate next atoms to run (originating from atom or all atoms)."""
+        self._ensure_tracking()
         if atom is None:
             return iter_utils.unique_seen((self._browse_atoms_for_execute(),
                                            self._browse_atoms_for_revert()),
@@ -66,6 +205,57 @@ class Selector(object):
         else:
             return iter([])
 
+    def is_ready(self, atom):
+        """Checks if a (previously selected) atom is still ready to run.
+
+        This is used for atoms that were selected (and had their deciders
+        applied) but that have not been scheduled yet (for example because
+        they were deferred due to resource limits), since the state and/or
+        intention of these atoms (or of the atoms connected to them) may have
+        been altered since (for example by a retry or a failure resolution
+        strategy) which may make them no longer ready to execute or revert.
+        """
+        state = self._storage.get_atom_state(atom.name)
+        if state in (st.RUNNING, st.REVERTING):
+            # Left unfinished by a prior run (and it is being resumed), so
+            # it has to be scheduled again no matter what...
+            return True
+        self._ensure_tracking()
+        is_ready, _late_decider = self._get_maybe_ready_for_execute(atom)
+        if not is_ready:
+            is_ready, _late_decider = self._get_maybe_ready_for_revert(atom)
+        return is_ready
+
+    def _browse_connected(self, atom, connected_iter, tracker,
+                          through_retries=True):
+        # NOTE(harlowja): the reason this uses breadth first is so that
+        # when deciders are applied that those deciders can be applied
+        # from top levels to lower levels since lower levels *may* be
+        # able to run even if top levels have deciders that decide to
+        # ignore some atoms... (going deeper first would make this
+        # problematic to determine as top levels can have their deciders
+        # applied **after** going deeper).
+        #
+        # Only nodes that are (still) satisfied are traversed through, since
+        # anything on the other side of an unsatisfied node can not be ready
+        # (this is checked lazily, after the node has been yielded, so that
+        # deciders that ignore a yielded atom are taken into account).
+        graph = self._execution_graph
+        visited = set([atom])
+        q = collections.deque(connected_iter(atom))
+        while q:
+            node = q.popleft()
+            if node in visited:
+                continue
+            visited.add(node)
+            node_attrs = graph.node[node]
+            if not node_attrs.get('noop'):
+                yield node
+            if not through_retries and node_attrs['kind'] == co.RETRY:
+                continue
+            if tracker.is_satisfied(node):
+                q.extend(connected_iter(node))
+
     def _browse_atoms_for_execute(self, atom=None):
         """Browse next atoms to execute.
 
@@ -76,15 +266,9 @@ class Selector(object):
         if atom is None:
             atom_it = self._runtime.iterate_nodes(co.ATOMS)
         else:
-            # NOTE(harlowja): the reason this uses breadth first is so that
-            # when deciders are applied that those deciders can be applied
-            # from top levels to lower levels since lower levels *may* be
-            # able to run even if top levels have deciders that decide to
-            # ignore some atoms... (going deeper first would make this
-            # problematic to determine as top levels can have their deciders
-            # applied **after** going deeper).
-            atom_it = traversal.breadth_first_iterate(
-                self._execution_graph, atom, traversal.Direction.FORWARD)
+            atom_it = self._browse_connected(
+                atom, self._execution_graph.successors_iter,
+                self._execute_tracker)
         for atom in atom_it:
             is_ready, late_decider = self._get_maybe_ready_for_execute(atom)
             if is_ready:
@@ -101,8 +285,9 @@ class Selector(object):
         if atom is None:
             atom_it = self._runtime.iterate_nodes(co.ATOMS)
         else:
-            atom_it = traversal.breadth_first_iterate(
-                self._execution_graph, atom, traversal.Direction.BACKWARD,
+            atom_it = self._browse_connected(
+                atom, self._execution_graph.predecessors_iter,
+                self._revert_tracker,
                 # Stop at the retry boundary (as retries 'control' there
                 # surronding atoms, and we don't want to back track over
                 # them so that they can correctly affect there associated
@@ -116,18 +301,7 @@ class Selector(object):
                 yield (atom, late_decider)
 
     def _get_maybe_ready(self, atom, transition_to, allowed_intentions,
-                         connected_fetcher, ready_checker,
-                         decider_fetcher, for_what="?"):
-        def iter_connected_states():
-            # Lazily iterate over connected states so that ready checkers
-            # can stop early (vs having to consume and check all the
-            # things...)
-            for atom in connected_fetcher():
-                # TODO(harlowja): make this storage api better, its not
-                # especially clear what the following is doing (mainly
-                # to avoid two calls into storage).
-                atom_states = self._storage.get_atoms_states([atom.name])
-                yield (atom, atom_states[atom.name])
+                         tracker, decider_fetcher, for_what="?"):
         # NOTE(harlowja): How this works is the following...
         #
         # 1. First check if the current atom can even transition to the
@@ -136,15 +310,12 @@ class Selector(object):
         # 2. Check if the actual atoms intention is in one of the desired/ok
         #    intentions, if it is not there we are still not ready to execute
         #    or revert.
-        # 3. Iterate over (atom, atom_state, atom_intention) for all the
-        #    atoms the 'connected_fetcher' callback yields from underlying
-        #    storage and direct that iterator into the 'ready_checker'
-        #    callback, that callback should then iterate over these entries
-        #    and determine if it is ok to execute or revert.
-        # 4. If (and only if) 'ready_checker' returns true, then
-        #    the 'decider_fetcher' callback is called to get a late decider
-        #    which can (if it desires) affect this ready result (but does
-        #    so right before the atom is about to be scheduled).
+        # 3. Check the tracker to see if any of the atoms (transitively)
+        #    connected atoms are blocking it from executing or reverting.
+        # 4. If (and only if) it is not blocked, then the 'decider_fetcher'
+        #    callback is called to get a late decider which can (if it
+        #    desires) affect this ready result (but does so right before
+        #    the atom is about to be scheduled).
         state = self._storage.get_atom_state(atom.name)
         ok_to_transition = self._runtime.check_atom_transition(atom, state,
                                                                transition_to)
@@ -159,64 +330,29 @@ class Selector(object):
                       " intention %s is not in allowed intentions %s",
                       atom, for_what, intention, allowed_intentions)
             return (False, None)
-        ok_to_run = ready_checker(iter_connected_states())
-        if not ok_to_run:
+        if not tracker.is_unblocked(atom):
+            LOG.trace("Atom '%s' is not ready to %s since it is blocked"
+                      " by connected atoms", atom, for_what)
             return (False, None)
-        else:
-            return (True, decider_fetcher())
+        LOG.trace("Able to let '%s' %s", atom, for_what)
+        return (True, decider_fetcher())
 
     def _get_maybe_ready_for_execute(self, atom):
         """Returns if an atom is *likely* ready to be executed."""
-        def ready_checker(pred_connected_it):
-            for pred in pred_connected_it:
-                pred_atom, (pred_atom_state, pred_atom_intention) = pred
-                if (pred_atom_state in (st.SUCCESS, st.IGNORE) and
-                        pred_atom_intention in (st.EXECUTE, st.IGNORE)):
-                    continue
-                LOG.trace("Unable to begin to execute since predecessor"
-                          " atom '%s' is in state %s with intention %s",
-                          pred_atom, pred_atom_state, pred_atom_intention)
-                return False
-            LOG.trace("Able to let '%s' execute", atom)
-            return True
         decider_fetcher = lambda: \
             deciders.IgnoreDecider(
                 atom, self._runtime.fetch_edge_deciders(atom))
-        connected_fetcher = lambda: \
-            traversal.depth_first_iterate(self._execution_graph, atom,
-                                          # Whether the desired atom
-                                          # can execute is dependent on its
-                                          # predecessors outcomes (thus why
-                                          # we look backwards).
-                                          traversal.Direction.BACKWARD)
         # If this atoms current state is able to be transitioned to RUNNING
         # and its intention is to EXECUTE and all of its predecessors executed
         # successfully or were ignored then this atom is ready to execute.
         LOG.trace("Checking if '%s' is ready to execute", atom)
         return self._get_maybe_ready(atom, st.RUNNING, [st.EXECUTE],
-                                     connected_fetcher, ready_checker,
-                                     decider_fetcher, for_what='execute')
+                                     self._execute_tracker, decider_fetcher,
+                                     for_what='execute')
 
     def _get_maybe_ready_for_revert(self, atom):
         """Returns if an atom is *likely* ready to be reverted."""
-        def ready_checker(succ_connected_it):
-            for succ in succ_connected_it:
-                succ_atom, (succ_atom_state, _succ_atom_intention) = succ
-                if succ_atom_state not in (st.PENDING, st.REVERTED, st.IGNORE):
-                    LOG.trace("Unable to begin to revert since successor"
-                              " atom '%s' is in state %s", succ_atom,
-                              succ_atom_state)
-                    return False
-            LOG.trace("Able to let '%s' revert", atom)
-            return True
         noop_decider = deciders.NoOpDecider()
-        connected_fetcher = lambda: \
-            traversal.depth_first_iterate(self._execution_graph, atom,
-                                          # Whether the desired atom
-                                          # can revert is dependent on its
-                                          # successors states (thus why we
-                                          # look forwards).
-                                          traversal.Direction.FORWARD)
         decider_fetcher = lambda: noop_decider
         # If this atoms current state is able to be transitioned to REVERTING
         # and its intention is either REVERT or RETRY and all of its
@@ -224,5 +360,5 @@ class Selector(object):
         # to revert.
         LOG.trace("Checking if '%s' is ready to revert", atom)
         return self._get_maybe_ready(atom, st.REVERTING, [st.REVERT, st.RETRY],
-                                     connected_fetcher, ready_checker,
-                                     decider_fetcher, for_what='revert')
+                                     self._revert_tracker, decider_fetcher,
+                                     for_what='revert')
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+import contextlib
+import errno
+import io
+import os
+
+from oslo_serialization import msgpackutils
+from oslo_utils import fileutils
+from oslo_utils import uuidutils
+import six
+
+from taskflow import exceptions as exc
+from taskflow import logging
+
+LOG = logging.getLogger(__name__)
+
+#: Size (in bytes) that encoded values must be larger than to be offloaded.
+DEFAULT_THRESHOLD = 256 * 1024
+
+
+@contextlib.contextmanager
+def _storagefailure_wrapper():
+    try:
+        yield
+    except exc.TaskFlowException:
+        raise
+    except Exception as e:
+        if isinstance(e, (IOError, OSError)) and e.errno == errno.ENOENT:
+            exc.raise_with_cause(exc.NotFound,
+                                 'Blob not found: %s' % e.filename,
+                                 cause=e)
+        else:
+            exc.raise_with_cause(exc.StorageFailure,
+                                 "Blob store internal error", cause=e)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class BlobStore(object):
+    """Stores (large) binary blobs outside of the messages that refer to them.
+
+    Engines and the workers they send requests to must be configured with
+    stores that are backed by the same underlying storage (so that blobs put
+    into the store on one side can be fetched on the other side).
+
+    Blobs are deleted by whichever side fetches them last; a result blob
+    whose response arrives after the engine that would fetch it has been
+    stopped is **not** deleted (stores that are shared by engines that can
+    stop while requests are ongoing should be periodically cleaned of old
+    blobs).
+    """
+
+    @abc.abstractmethod
+    def put(self, data):
+        """Stores a binary blob and returns the (string) key to fetch it by."""
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Fetches the binary blob with the given key.
+
+        Raises :py:class:`~taskflow.exceptions.NotFound` if no blob with that
+        key exists.
+        """
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Deletes the binary blob with the given key (if it exists)."""
+
+
+class FilesystemBlobStore(BlobStore):
+    """Stores blobs as files (one per blob) in a directory.
+
+    The directory can be on a shared (or network) filesystem to allow engines
+    and workers on different hosts to use it.
+    """
+
+    def __init__(self, path):
+        self._path = os.path.abspath(path)
+        with _storagefailure_wrapper():
+            fileutils.ensure_tree(self._path)
+
+    @property
+    def path(self):
+        """Directory the blobs are stored in."""
+        return self._path
+
+    def _blob_path(self, key):
+        # Keys are always generated by this class, but since they arrive
+        # in messages from other processes ensure they can not be used
+        # to access anything outside of the directory...
+        if not key or os.path.basename(key) != key or key.startswith("."):
+            raise exc.NotFound("Invalid blob key '%s'" % key)
+        return os.path.join(self._path, key)
+
+    def put(self, data):
+        key = uuidutils.generate_uuid()
+        blob_path = self._blob_path(key)
+        tmp_path = os.path.join(self._path, ".%s.tmp" % key)
+        with _storagefailure_wrapper():
+            with io.open(tmp_path, 'wb') as fp:
+                fp.write(data)
+            # Make the blob visible (to readers) only once it has been
+            # completely written out...
+            os.rename(tmp_path, blob_path)
+        return key
+
+    def get(self, key):
+        with _storagefailure_wrapper():
+            with io.open(self._blob_path(key), 'rb') as fp:
+                return fp.read()
+
+    def delete(self, key):
+        try:
+            with _storagefailure_wrapper():
+                os.unlink(self._blob_path(key))
+        except exc.NotFound:
+            pass
+
+
+class Offloader(object):
+    """Moves values that are too large to send inline into a blob store.
+
+    Values are encoded (using msgpack) and when the encoded value is larger
+    than ``threshold`` bytes it is put into the ``store`` (and the key it
+    can be fetched by is sent instead of the value).
+
+    For **internal** usage only (not for public consumption).
+    """
+
+    def __init__(self, store, threshold=DEFAULT_THRESHOLD):
+        if threshold < 0:
+            raise ValueError("Blob threshold must be greater than or equal"
+                             " to zero")
+        self._store = store
+        self._threshold = threshold
+
+    @property
+    def store(self):
+        """Blob store values are offloaded into."""
+        return self._store
+
+    def offload(self, value):
+        """Offloads the value (if it is large enough).
+
+        Returns the key of the blob the value was offloaded into (or none if
+        the value was small enough to be sent inline).
+        """
+        try:
+            data = msgpackutils.dumps(value)
+        except Exception:
+            # Leave it to the message serializer to handle (or fail on)...
+            LOG.debug("Unable to encode value (so it can not be offloaded)",
+                      exc_info=True)
+            return None
+        if len(data) <= self._threshold:
+            return None
+        return self._store.put(data)
+
+    def fetch(self, key, delete=False):
+        """Fetches (and decodes) a previously offloaded value."""
+        data = self._store.get(key)
+        try:
+            value = msgpackutils.loads(data)
+        except Exception as e:
+            exc.raise_with_cause(exc.StorageFailure,
+                                 "Unable to decode blob '%s'" % key,
+                                 cause=e)
+        if delete:
+            self._store.delete(key)
+        return value
+
+    def delete(self, keys):
+        """Deletes the blobs with the given keys (ignoring any failures)."""
+        for key in keys:
+            try:
+                self._store.delete(key)
+            except Exception:
+                LOG.warning("Failed to delete blob '%s'", key, exc_info=True)
@@ -53,6 +53,28 @@ class Handler(object):
         return self._validator
 
 
+class BatchedMessage(object):
+    """A message that was received (packed with others) inside a batch.
+
+    It looks enough like the message the batch arrived in (sharing its
+    ``reply_to`` property and delivery details) that handlers can process it
+    the same way as a message that was sent by itself; it can not be
+    acknowledged (or rejected or requeued) by itself though (that happens to
+    the batch as a whole).
+    """
+
+    def __init__(self, batch_message, message_type, correlation_id=None):
+        self.properties = dict(batch_message.properties)
+        self.properties['type'] = message_type
+        if correlation_id is not None:
+            self.properties['correlation_id'] = correlation_id
+        else:
+            self.properties.pop('correlation_id', None)
+        self.delivery_tag = batch_message.delivery_tag
+        self.content_type = batch_message.content_type
+        self.body = None
+
+
 class TypeDispatcher(object):
     """Receives messages and dispatches to type specific handlers."""
 
@@ -149,6 +171,34 @@ class TypeDispatcher(object):
                 message.reject_log_error(logger=LOG,
                                          errors=(kombu_exc.MessageStateError,))
 
+    def dispatch_batch(self, data, message):
+        """Dispatches the messages packed in a (validated) batch message.
+
+        Each packed message is validated and processed by the handler for
+        its type (as if it had been received by itself); packed messages
+        that are not valid (or that have no handler) are skipped.
+        """
+        for entry in data['messages']:
+            batched_message = BatchedMessage(
+                message, entry['type'],
+                correlation_id=entry.get('correlation_id'))
+            handler = self._type_handlers.get(entry['type'])
+            if handler is None:
+                LOG.warning("Unexpected message type: '%s' in batched"
+                            " message '%s'", entry['type'],
+                            ku.DelayedPretty(batched_message))
+                continue
+            if handler.validator is not None:
+                try:
+                    handler.validator(entry['body'])
+                except excp.InvalidFormat as e:
+                    LOG.warning("Batched message '%s' (%s) was skipped due"
+                                " to it being in an invalid format: %s",
+                                ku.DelayedPretty(batched_message),
+                                entry['type'], e)
+                    continue
+            handler.process_message(entry['body'], batched_message)
+
     def on_message(self, data, message):
         """This method is called on incoming messages."""
         LOG.debug("Received message '%s'", ku.DelayedPretty(message))
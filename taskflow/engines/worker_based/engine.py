@@ -15,6 +15,7 @@
 #    under the License.
 
 from taskflow.engines.action_engine import engine
+from taskflow.engines.worker_based import blobs
 from taskflow.engines.worker_based import executor
 from taskflow.engines.worker_based import protocol as pr
 
@@ -50,6 +51,27 @@ class WorkerBasedActionEngine(engine.ActionEngine):
                           have **not** responded back to a prior
                           notification/ping request (this defaults
                           to 60 seconds).
+    :param batch_delay: numeric value (or None to disable batching) that
+                        defines the number of seconds that requests to the
+                        same worker are buffered for (so that they can be
+                        sent to it in a single message); workers send
+                        replies to requests received this way back in
+                        batches as well.
+    :param serializer: serializer (or codec) to send requests to workers
+                       with, one of :py:data:`~.proxy.SERIALIZERS` (this
+                       defaults to json); requests are only sent using it
+                       to workers that have said (in their notify
+                       responses) that they accept it, and workers reply
+                       using the same serializer the request was sent with.
+    :param blob_store: blob store (a :py:class:`~.blobs.BlobStore`) that
+                       large task arguments and results are put into
+                       (instead of being sent inside of messages); workers
+                       must be configured with a store that uses the same
+                       underlying storage (by default nothing is offloaded).
+    :param blob_threshold: size (in bytes) that encoded task arguments and
+                           results must be larger than to be put into the
+                           blob store (this defaults to
+                           :py:data:`~.blobs.DEFAULT_THRESHOLD`).
     """
 
     def __init__(self, flow, flow_detail, backend, options):
@@ -82,4 +104,9 @@ class WorkerBasedActionEngine(engine.ActionEngine):
                                                pr.REQUEST_TIMEOUT),
                 worker_expiry=options.get('worker_expiry',
                                           pr.EXPIRES_AFTER),
+                batch_delay=options.get('batch_delay'),
+                serializer=options.get('serializer'),
+                blob_store=options.get('blob_store'),
+                blob_threshold=options.get('blob_threshold',
+                                           blobs.DEFAULT_THRESHOLD),
                 )
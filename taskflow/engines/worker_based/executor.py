@@ -14,13 +14,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
+import heapq
 import threading
 
+from oslo_utils import reflection
 from oslo_utils import timeutils
 import six
 
 from taskflow.engines.action_engine import executor
+from taskflow.engines.worker_based import blobs
 from taskflow.engines.worker_based import dispatcher
 from taskflow.engines.worker_based import protocol as pr
 from taskflow.engines.worker_based import proxy
@@ -36,15 +40,60 @@ LOG = logging.getLogger(__name__)
 
 
 class WorkerTaskExecutor(executor.TaskExecutor):
-    """Executes tasks on remote workers."""
+    """Executes tasks on remote workers.
+
+    When a ``batch_delay`` (in seconds) is provided, requests that are
+    submitted to the same worker within that amount of time of each other
+    are packed into (and sent as) a single message; workers that receive
+    requests this way also send their replies back in batches.
+
+    When a ``serializer`` (one of :py:data:`~.proxy.SERIALIZERS`) is
+    provided, requests are sent using it to workers that accept it (and
+    using json to those that do not); workers reply using the same
+    serializer as the request they are replying to was sent with.
+
+    When a ``blob_store`` (a :py:class:`~.blobs.BlobStore`) is provided,
+    arguments (and results) that are larger than ``blob_threshold`` bytes
+    are put into it (instead of being sent inside of the request messages)
+    when the request is sent to a worker that said it was also given a blob
+    store (others are sent everything inside of the request messages); those
+    workers fetch them from it (and offload their large results into it).
+    The blobs that get created are deleted once the requests they were
+    created for have finished (and result blobs once they are fetched, or
+    once their response arrives after the request has already finished).
+    """
 
     def __init__(self, uuid, exchange, topics,
                  transition_timeout=pr.REQUEST_TIMEOUT,
                  url=None, transport=None, transport_options=None,
-                 retry_options=None, worker_expiry=pr.EXPIRES_AFTER):
+                 retry_options=None, worker_expiry=pr.EXPIRES_AFTER,
+                 batch_delay=None, serializer=None, blob_store=None,
+                 blob_threshold=blobs.DEFAULT_THRESHOLD):
+        if serializer is not None and serializer not in proxy.SERIALIZERS:
+            raise ValueError("Unknown serializer '%s' (expected one of %s)"
+                             % (serializer, list(proxy.SERIALIZERS)))
+        self._serializer = serializer
+        if blob_store is not None:
+            self._offloader = blobs.Offloader(blob_store,
+                                              threshold=blob_threshold)
+        else:
+            self._offloader = None
         self._uuid = uuid
         self._ongoing_requests = {}
         self._ongoing_requests_lock = threading.RLock()
+        # Heap of (deadline, request uuid) tuples, so that only requests
+        # whose deadline has passed have to be looked at to find the
+        # expired ones (entries of requests that have since finished are
+        # just dropped when they get popped off)...
+        self._deadlines = []
+        # Requests still waiting for a worker to be found for them (keyed
+        # by the name of the task class they are for)...
+        self._waiting_requests = collections.defaultdict(
+            collections.OrderedDict)
+        # How many published (and not yet finished) requests each worker
+        # topic has; used to avoid picking already busy workers...
+        self._in_flight = collections.defaultdict(int)
+        self._in_flight_topics = {}
         self._transition_timeout = transition_timeout
         self._proxy = proxy.Proxy(uuid, exchange,
                                   on_wait=self._on_wait, url=url,
@@ -63,10 +112,19 @@ class WorkerTaskExecutor(executor.TaskExecutor):
             pr.RESPONSE: dispatcher.Handler(self._process_response,
                                             validator=pr.Response.validate),
             pr.NOTIFY: dispatcher.Handler(
-                self._finder.process_response,
+                self._process_notify,
                 validator=functools.partial(pr.Notify.validate,
                                             response=True)),
+            pr.BATCH: dispatcher.Handler(
+                self._proxy.dispatcher.dispatch_batch,
+                validator=pr.Batch.validate),
         })
+        if batch_delay is not None:
+            self._batcher = proxy.Batcher(
+                self._proxy, batch_delay,
+                on_failure=self._on_batch_failure)
+        else:
+            self._batcher = None
         # Thread that will run the message dispatching (and periodically
         # call the on_wait callback to do various things) loop...
         self._helper = None
@@ -104,13 +162,42 @@ class WorkerTaskExecutor(executor.TaskExecutor):
                     if request.transition_and_log_error(response.state,
                                                         logger=LOG):
                         with self._ongoing_requests_lock:
-                            del self._ongoing_requests[request.uuid]
-                        request.set_result(result=response.data['result'])
+                            self._remove_request(request.uuid)
+                        request.set_result(result=self._fetch_result(
+                            request, response))
+                    else:
+                        self._delete_result(response.data)
                 else:
                     LOG.warning("Unexpected response status '%s'",
                                 response.state)
             else:
                 LOG.debug("Request with id='%s' not found", request_uuid)
+                # It likely expired (or was cancelled), so any result that
+                # was offloaded for it will never be fetched...
+                self._delete_result(response.get('data'))
+
+    def _fetch_result(self, request, response):
+        """Gets the result out of a response (fetching it if offloaded)."""
+        key = response.data.get('blob')
+        if key is None:
+            return response.data['result']
+        try:
+            if self._offloader is None:
+                raise exc.NotFound("Result of '%s' was offloaded into blob"
+                                   " '%s' but no blob store was provided"
+                                   " to fetch it from" % (request, key))
+            return self._offloader.fetch(key, delete=True)
+        except Exception:
+            with misc.capture_failure() as failure:
+                LOG.warning("Failed to fetch offloaded result of '%s'",
+                            request, exc_info=True)
+                return failure
+
+    def _delete_result(self, data):
+        """Deletes the blob a responses result was offloaded into (if any)."""
+        key = data.get('blob') if data else None
+        if key is not None and self._offloader is not None:
+            self._offloader.delete([key])
 
     @staticmethod
     def _handle_expired_request(request):
@@ -137,46 +224,121 @@ class WorkerTaskExecutor(executor.TaskExecutor):
             return True
         return False
 
+    def _process_notify(self, notify, message):
+        """Process notify response (and publish requests now matched)."""
+        self._finder.process_response(notify, message)
+        # Requests waiting for the tasks this worker performs do not have
+        # to wait for the next cleaning cycle to be sent to it...
+        self._publish_waiting(task_names=notify.get('tasks'))
+
+    def _add_request(self, request, waiting=False):
+        with self._ongoing_requests_lock:
+            self._ongoing_requests[request.uuid] = request
+            if request.deadline is not None:
+                heapq.heappush(self._deadlines,
+                               (request.deadline, request.uuid))
+            if waiting:
+                self._add_waiting(request)
+
+    def _add_waiting(self, request):
+        task_name = reflection.get_class_name(request.task)
+        self._waiting_requests[task_name][request.uuid] = request
+
+    def _remove_request(self, request_uuid):
+        request = self._ongoing_requests.pop(request_uuid)
+        self._forget_waiting(request)
+        self._forget_in_flight(request_uuid)
+
+    def _forget_waiting(self, request):
+        task_name = reflection.get_class_name(request.task)
+        try:
+            waiting_requests = self._waiting_requests[task_name]
+        except KeyError:
+            pass
+        else:
+            waiting_requests.pop(request.uuid, None)
+            if not waiting_requests:
+                del self._waiting_requests[task_name]
+
+    def _forget_in_flight(self, request_uuid):
+        topic = self._in_flight_topics.pop(request_uuid, None)
+        if topic is not None:
+            self._in_flight[topic] -= 1
+            if self._in_flight[topic] <= 0:
+                del self._in_flight[topic]
+
     def _clean(self):
         if not self._ongoing_requests:
             return
+        self._expire_requests()
+        new_messages_processed = self._finder.messages_processed
+        last_messages_processed = self._messages_processed['finder']
+        if new_messages_processed > last_messages_processed:
+            # Some new message got to the finder, so we can see
+            # if any new workers match (if no new messages have been
+            # processed we might as well not do anything).
+            self._publish_waiting()
+            self._messages_processed['finder'] = new_messages_processed
+
+    def _expire_requests(self):
+        """Expires the requests whose deadline has passed.
+
+        Only the requests whose deadline has passed are looked at (instead
+        of every ongoing request), so this is cheap to call often.
+        """
+        now = timeutils.now()
         with self._ongoing_requests_lock:
-            ongoing_requests_uuids = set(six.iterkeys(self._ongoing_requests))
-        waiting_requests = {}
-        expired_requests = {}
-        for request_uuid in ongoing_requests_uuids:
-            try:
-                request = self._ongoing_requests[request_uuid]
-            except KeyError:
-                # Guess it got removed before we got to it...
-                pass
-            else:
+            not_expired = []
+            while self._deadlines and self._deadlines[0][0] <= now:
+                entry = heapq.heappop(self._deadlines)
+                request_uuid = entry[1]
+                try:
+                    request = self._ongoing_requests[request_uuid]
+                except KeyError:
+                    # Guess it finished before it expired...
+                    continue
                 if request.expired:
-                    expired_requests[request_uuid] = request
-                elif request.current_state == pr.WAITING:
-                    waiting_requests[request_uuid] = request
-        if expired_requests:
-            with self._ongoing_requests_lock:
-                while expired_requests:
-                    request_uuid, request = expired_requests.popitem()
                     if self._handle_expired_request(request):
-                        del self._ongoing_requests[request_uuid]
-        if waiting_requests:
-            finder = self._finder
-            new_messages_processed = finder.messages_processed
-            last_messages_processed = self._messages_processed['finder']
-            if new_messages_processed > last_messages_processed:
-                # Some new message got to the finder, so we can see
-                # if any new workers match (if no new messages have been
-                # processed we might as well not do anything).
-                while waiting_requests:
-                    _request_uuid, request = waiting_requests.popitem()
-                    worker = finder.get_worker_for_task(request.task)
-                    if (worker is not None and
-                            request.transition_and_log_error(pr.PENDING,
-                                                             logger=LOG)):
-                        self._publish_request(request, worker)
-                self._messages_processed['finder'] = new_messages_processed
+                        self._remove_request(request_uuid)
+                elif request.current_state in pr.WAITING_STATES:
+                    # Not quite expired yet (according to the request
+                    # itself), so check it again later...
+                    not_expired.append(entry)
+            for entry in not_expired:
+                heapq.heappush(self._deadlines, entry)
+
+    def _publish_waiting(self, task_names=None):
+        """Publishes waiting requests (for the given tasks) to workers.
+
+        Only the requests for tasks that a worker can now be found for are
+        looked at (instead of every waiting request).
+        """
+        matched = []
+        with self._ongoing_requests_lock:
+            if task_names is None:
+                task_names = list(self._waiting_requests)
+            for task_name in task_names:
+                waiting_requests = self._waiting_requests.get(task_name)
+                if not waiting_requests:
+                    continue
+                worker = self._finder.get_worker_for_task(
+                    task_name, in_flight=self._in_flight)
+                if worker is None:
+                    # No worker for this task (so no point in looking
+                    # at any of the requests for it).
+                    continue
+                del self._waiting_requests[task_name]
+                matched.extend(six.itervalues(waiting_requests))
+        for request in matched:
+            worker = self._finder.get_worker_for_task(
+                request.task, in_flight=self._in_flight)
+            if worker is None:
+                # Guess the worker went away, so keep on waiting...
+                with self._ongoing_requests_lock:
+                    if request.uuid in self._ongoing_requests:
+                        self._add_waiting(request)
+            elif request.transition_and_log_error(pr.PENDING, logger=LOG):
+                self._publish_request(request, worker)
 
     def _on_wait(self):
         """This function is called cyclically between draining events."""
@@ -205,17 +367,16 @@ class WorkerTaskExecutor(executor.TaskExecutor):
                 lambda _fut: task.notifier.deregister(EVENT_UPDATE_PROGRESS,
                                                       progress_callback))
         # Get task's worker and publish request if worker was found.
-        worker = self._finder.get_worker_for_task(task)
+        worker = self._finder.get_worker_for_task(
+            task, in_flight=self._in_flight)
         if worker is not None:
             if request.transition_and_log_error(pr.PENDING, logger=LOG):
-                with self._ongoing_requests_lock:
-                    self._ongoing_requests[request.uuid] = request
+                self._add_request(request)
                 self._publish_request(request, worker)
         else:
             LOG.debug("Delaying submission of '%s', no currently known"
                       " worker/s available to process it", request)
-            with self._ongoing_requests_lock:
-                self._ongoing_requests[request.uuid] = request
+            self._add_request(request, waiting=True)
         return request.future
 
     def _publish_request(self, request, worker):
@@ -225,18 +386,45 @@ class WorkerTaskExecutor(executor.TaskExecutor):
                   " correlation_id=%s) - waited %0.3f seconds to"
                   " get published", request, worker, self._uuid,
                   request.uuid, timeutils.now() - request.created_on)
+        with self._ongoing_requests_lock:
+            self._in_flight_topics[request.uuid] = worker.topic
+            self._in_flight[worker.topic] += 1
+        if self._batcher is not None:
+            publish = self._batcher.publish
+        else:
+            publish = self._proxy.publish
+        publish_kwargs = {}
+        if (self._serializer is not None and
+                self._serializer in (worker.serializers or ())):
+            publish_kwargs['serializer'] = self._serializer
         try:
-            self._proxy.publish(request, worker.topic,
-                                reply_to=self._uuid,
-                                correlation_id=request.uuid)
+            if self._offloader is not None and worker.blobs:
+                self._offload_request(request)
+            publish(request, worker.topic,
+                    reply_to=self._uuid, correlation_id=request.uuid,
+                    **publish_kwargs)
         except Exception:
             with misc.capture_failure() as failure:
-                LOG.critical("Failed to submit '%s' (transitioning it to"
-                             " %s)", request, pr.FAILURE, exc_info=True)
-                if request.transition_and_log_error(pr.FAILURE, logger=LOG):
-                    with self._ongoing_requests_lock:
-                        del self._ongoing_requests[request.uuid]
-                    request.set_result(failure)
+                self._handle_publish_failure(request, failure)
+
+    def _offload_request(self, request):
+        keys = request.offload(self._offloader)
+        if keys:
+            request.future.add_done_callback(
+                lambda _fut: self._offloader.delete(keys))
+
+    def _handle_publish_failure(self, request, failure):
+        LOG.critical("Failed to submit '%s' (transitioning it to"
+                     " %s)", request, pr.FAILURE, exc_info=True)
+        if request.transition_and_log_error(pr.FAILURE, logger=LOG):
+            with self._ongoing_requests_lock:
+                self._remove_request(request.uuid)
+            request.set_result(failure)
+
+    def _on_batch_failure(self, request, routing_key, request_uuid,
+                          serializer, failure):
+        if self._ongoing_requests.get(request_uuid) is request:
+            self._handle_publish_failure(request, failure)
 
     def execute_task(self, task, task_uuid, arguments,
                      progress_callback=None):
@@ -272,13 +460,19 @@ class WorkerTaskExecutor(executor.TaskExecutor):
 
     def stop(self):
         """Stops message processing thread."""
+        if self._batcher is not None:
+            self._batcher.stop(flush=False)
         if self._helper is not None:
             self._proxy.stop()
             self._helper.join()
             self._helper = None
         with self._ongoing_requests_lock:
+            self._deadlines = []
+            self._waiting_requests.clear()
             while self._ongoing_requests:
                 _request_uuid, request = self._ongoing_requests.popitem()
                 self._handle_expired_request(request)
+            self._in_flight.clear()
+            self._in_flight_topics.clear()
         self._finder.reset()
         self._messages_processed['finder'] = self._finder.messages_processed
@@ -83,6 +83,14 @@ EXPIRES_AFTER = 60
 NOTIFY = 'NOTIFY'
 REQUEST = 'REQUEST'
 RESPONSE = 'RESPONSE'
+BATCH = 'BATCH'
+
+# How many seconds workers wait for other replies (to requests that were
+# received in batches) to be ready before sending them back in a single batch.
+REPLY_BATCH_DELAY = 0.01
+
+# Maximum number of messages that are packed into a single batch.
+BATCH_SIZE = 256
 
 # Object that denotes nothing (none can actually be valid).
 NO_RESULT = object()
@@ -168,6 +176,17 @@ class Notify(Message):
     #: String constant representing this message type.
     TYPE = NOTIFY
 
+    #: Header notify requests are sent with that lists which of the optional
+    #: response fields the sender understands; it is sent as a header (and
+    #: not in the request itself) since older workers validate requests
+    #: using a schema that allows no fields at all.
+    FIELDS_HEADER = 'taskflow-notify-fields'
+
+    #: Optional response fields, these are only sent to senders that said
+    #: they understand them (older senders validate responses using a schema
+    #: that does not allow them).
+    OPTIONAL_FIELDS = ('capacity', 'serializers', 'blobs')
+
     # NOTE(harlowja): the executor (the entity who initially requests a worker
     # to send back a notification response) schema is different than the
     # worker response schema (that's why there are two schemas here).
@@ -184,7 +203,46 @@ class Notify(Message):
                 "items": {
                     "type": "string",
                 },
-            }
+            },
+            # How loaded the worker currently is (optional, since older
+            # workers do not send it and it is only sent to senders that
+            # understand it); used to pick between workers that can all
+            # perform some task.
+            'capacity': {
+                "type": "object",
+                'properties': {
+                    'workers': {
+                        "type": "integer",
+                        "minimum": 1,
+                    },
+                    'outstanding': {
+                        "type": "integer",
+                        "minimum": 0,
+                    },
+                    'latency': {
+                        "type": "number",
+                        "minimum": 0,
+                    },
+                },
+                "required": ['outstanding'],
+                "additionalProperties": False,
+            },
+            # Serializers the worker accepts requests to be sent with
+            # (optional, older workers only accept the default one and it
+            # is only sent to senders that understand it).
+            'serializers': {
+                "type": "array",
+                "items": {
+                    "type": "string",
+                },
+            },
+            # Whether the worker was given a blob store (optional, older
+            # workers and workers without one can not fetch offloaded
+            # arguments, so requests sent to them must not have any); it
+            # is only sent to senders that understand it.
+            'blobs': {
+                "type": "boolean",
+            },
         },
         "required": ["topic", 'tasks'],
         "additionalProperties": False,
@@ -207,6 +265,18 @@ class Notify(Message):
     def tasks(self):
         return self._data.get('tasks')
 
+    @property
+    def capacity(self):
+        return self._data.get('capacity')
+
+    @property
+    def serializers(self):
+        return self._data.get('serializers')
+
+    @property
+    def blobs(self):
+        return self._data.get('blobs', False)
+
     def to_dict(self):
         return self._data
 
@@ -299,6 +369,24 @@ class Request(Message):
             'arguments': {
                 "type": "object",
             },
+            # Keys of blobs that (large) arguments and/or the result were
+            # offloaded into; when present (even if empty) this also means
+            # the sender can fetch offloaded results itself.
+            'blobs': {
+                "type": "object",
+                'properties': {
+                    'arguments': {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "string",
+                        },
+                    },
+                    'result': {
+                        "type": "string",
+                    },
+                },
+                "additionalProperties": False,
+            },
         },
         'required': ['task_cls', 'task_name', 'task_version', 'action'],
     }
@@ -311,6 +399,7 @@ class Request(Message):
         self._arguments = arguments
         self._result = result
         self._failures = failures
+        self._blobs = None
         self._watch = timeutils.StopWatch(duration=timeout).start()
         self._lock = threading.Lock()
         self._machine = build_a_machine()
@@ -318,6 +407,12 @@ class Request(Message):
         self.task = task
         self.uuid = uuid
         self.created_on = timeutils.now()
+        # When (if ever) the request expires (if it is still in one of the
+        # waiting states by then); uses the same clock as ``created_on``.
+        if timeout is not None:
+            self.deadline = self.created_on + timeout
+        else:
+            self.deadline = None
         self.future = futurist.Future()
         self.future.atom = task
 
@@ -345,6 +440,28 @@ class Request(Message):
             return self._watch.expired()
         return False
 
+    def offload(self, offloader):
+        """Offloads (large) arguments and results using the given offloader.
+
+        Returns the keys of the blobs that were created; the caller owns
+        those blobs (and should delete them once they are no longer needed).
+        """
+        blobs = {}
+        for name, value in six.iteritems(self._arguments):
+            key = offloader.offload(value)
+            if key is not None:
+                blobs.setdefault('arguments', {})[name] = key
+        if (self._result is not NO_RESULT and
+                not isinstance(self._result, ft.Failure)):
+            key = offloader.offload(self._result)
+            if key is not None:
+                blobs['result'] = key
+        self._blobs = blobs
+        keys = list(six.itervalues(blobs.get('arguments', {})))
+        if 'result' in blobs:
+            keys.append(blobs['result'])
+        return keys
+
     def to_dict(self):
         """Return json-serializable request.
 
@@ -352,17 +469,29 @@ class Request(Message):
         convert all `failure.Failure` objects into dictionaries (which will
         then be reconstituted by the receiver).
         """
+        arguments = self._arguments
+        blobs = self._blobs
+        if blobs is not None:
+            offloaded = blobs.get('arguments', {})
+            if offloaded:
+                arguments = dict((name, value)
+                                 for name, value in six.iteritems(arguments)
+                                 if name not in offloaded)
         request = {
             'task_cls': reflection.get_class_name(self.task),
             'task_name': self.task.name,
             'task_version': self.task.version,
             'action': self._action,
-            'arguments': self._arguments,
+            'arguments': arguments,
         }
+        if blobs is not None:
+            request['blobs'] = blobs
         if self._result is not NO_RESULT:
             result = self._result
             if isinstance(result, ft.Failure):
                 request['result'] = ('failure', failure_to_dict(result))
+            elif blobs is not None and 'result' in blobs:
+                request['result'] = ('success', None)
             else:
                 request['result'] = ('success', result)
         if self._failures:
@@ -441,12 +570,15 @@ class Request(Message):
                 ft.Failure.validate(fail_data)
 
     @staticmethod
-    def from_dict(data, task_uuid=None):
+    def from_dict(data, task_uuid=None, offloader=None):
         """Parses **validated** data into a work unit.
 
         All :py:class:`~taskflow.types.failure.Failure` objects that have been
         converted to dict(s) on the remote side will now converted back
         to py:class:`~taskflow.types.failure.Failure` objects.
+
+        Any arguments (or result) that were offloaded by the remote side are
+        fetched using the provided offloader.
         """
         task_cls = data['task_cls']
         task_name = data['task_name']
@@ -454,6 +586,16 @@ class Request(Message):
         arguments = data.get('arguments', {})
         result = data.get('result')
         failures = data.get('failures')
+        blobs = data.get('blobs')
+        if blobs:
+            if offloader is None:
+                raise ValueError("Request contains offloaded values but no"
+                                 " blob store was provided to fetch them")
+            arguments = dict(arguments)
+            for name, key in six.iteritems(blobs.get('arguments', {})):
+                arguments[name] = offloader.fetch(key)
+            if 'result' in blobs:
+                result = ('success', offloader.fetch(blobs['result']))
         # These arguments will eventually be given to the task executor
         # so they need to be in a format it will accept (and using keyword
         # argument names that it accepts)...
@@ -532,6 +674,11 @@ class Response(Message):
                     # thats why we can't be strict about what type it is since
                     # any of the json serializable types are allowed.
                     "result": {},
+                    # Key of the blob the result was offloaded into (the
+                    # result itself is then sent as none).
+                    "blob": {
+                        "type": "string",
+                    },
                 },
                 "required": ["result"],
                 "additionalProperties": False,
@@ -569,3 +716,83 @@ class Response(Message):
             state = data['state']
             if state == FAILURE and 'result' in data:
                 ft.Failure.validate(data['result'])
+
+
+class Batch(Message):
+    """Represents many other messages packed into a single message.
+
+    Each of the packed messages is sent with its type (and correlation id,
+    if it has one) so that it can be dispatched (by the receiving side) as if
+    it had been sent by itself.
+    """
+
+    #: String constant representing this message type.
+    TYPE = BATCH
+
+    #: Expected message schema (in json schema format).
+    SCHEMA = {
+        "type": "object",
+        'properties': {
+            'messages': {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    'properties': {
+                        'type': {
+                            "type": "string",
+                        },
+                        'correlation_id': {
+                            "type": "string",
+                        },
+                        'body': {
+                            "type": "object",
+                        },
+                    },
+                    "required": ["type", 'body'],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["messages"],
+        "additionalProperties": False,
+    }
+
+    def __init__(self):
+        self._messages = []
+
+    def add(self, message, correlation_id=None):
+        """Adds a message (and its optional correlation id) to this batch."""
+        self._messages.append((message, correlation_id))
+
+    @property
+    def messages(self):
+        """List of ``(message, correlation_id)`` tuples in this batch."""
+        return list(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def to_dict(self):
+        messages = []
+        for message, correlation_id in self._messages:
+            entry = {
+                'type': message.TYPE,
+                'body': message.to_dict(),
+            }
+            if correlation_id is not None:
+                entry['correlation_id'] = correlation_id
+            messages.append(entry)
+        return {'messages': messages}
+
+    @classmethod
+    def validate(cls, data):
+        try:
+            su.schema_validate(data, cls.SCHEMA)
+        except su.ValidationError as e:
+            cls_name = reflection.get_class_name(cls, fully_qualified=False)
+            excp.raise_with_cause(excp.InvalidFormat,
+                                  "%s message data not of the"
+                                  " expected format: %s" % (cls_name,
+                                                            e.message),
+                                  cause=e)
@@ -19,10 +19,15 @@ import threading
 
 import kombu
 from kombu import exceptions as kombu_exceptions
+from kombu import serialization as kombu_serialization
+from oslo_serialization import msgpackutils
 import six
 
 from taskflow.engines.worker_based import dispatcher
+from taskflow.engines.worker_based import protocol as pr
 from taskflow import logging
+from taskflow.utils import misc
+from taskflow.utils import threading_utils as tu
 
 LOG = logging.getLogger(__name__)
 
@@ -30,6 +35,20 @@ LOG = logging.getLogger(__name__)
 # the socket can get "stuck", and is a best practice for Kombu consumers.
 DRAIN_EVENTS_PERIOD = 1
 
+# Serializers (or codecs) that messages can be sent with; the msgpack one is
+# a binary format that is (typically) quicker to encode/decode and more
+# compact than json (though only workers that say they accept it in their
+# notify responses are sent messages encoded with it).
+JSON = 'json'
+MSGPACK = 'taskflow-msgpack'
+SERIALIZERS = (JSON, MSGPACK)
+
+# The content types messages sent with the above serializers have.
+_SERIALIZER_CONTENT_TYPES = {
+    'application/json': JSON,
+    'application/x-taskflow-msgpack': MSGPACK,
+}
+
 # Helper objects returned when requested to get connection details, used
 # instead of returning the raw results from the kombu connection objects
 # themselves so that a person can not mutate those objects (which would be
@@ -41,6 +60,26 @@ _TransportDetails = collections.namedtuple('_TransportDetails',
                                             'driver_name', 'driver_version'])
 
 
+def _register_serializers():
+    kombu_serialization.register(MSGPACK, msgpackutils.dumps,
+                                 misc.decode_msgpack,
+                                 content_type='application/x-taskflow-msgpack',
+                                 content_encoding='binary')
+
+
+_register_serializers()
+
+
+def serializer_for(message):
+    """Returns the serializer a (received) message was sent with.
+
+    Returns none if the message was sent with some serializer that is not
+    one of the known ``SERIALIZERS``.
+    """
+    return _SERIALIZER_CONTENT_TYPES.get(getattr(message, 'content_type',
+                                                 None))
+
+
 class Proxy(object):
     """A proxy processes messages from/to the named exchange.
 
@@ -152,8 +191,14 @@ class Proxy(object):
                            exchange=exchange, auto_delete=True,
                            channel=channel)
 
-    def publish(self, msg, routing_key, reply_to=None, correlation_id=None):
-        """Publish message to the named exchange with given routing key."""
+    def publish(self, msg, routing_key, reply_to=None, correlation_id=None,
+                serializer=None, headers=None):
+        """Publish message to the named exchange with given routing key.
+
+        When no serializer is provided the message is serialized with the
+        default one (json); any headers provided are sent along with the
+        message (receivers that do not look for them ignore them).
+        """
         if isinstance(routing_key, six.string_types):
             routing_keys = [routing_key]
         else:
@@ -167,6 +212,12 @@ class Proxy(object):
                         self._exchange_name)
             return
 
+        publish_kwargs = {}
+        if serializer is not None:
+            publish_kwargs['serializer'] = serializer
+        if headers:
+            publish_kwargs['headers'] = headers
+
         def _publish(producer, routing_key):
             queue = self._make_queue(routing_key, self._exchange)
             producer.publish(body=msg.to_dict(),
@@ -175,7 +226,8 @@ class Proxy(object):
                              declare=[queue],
                              type=msg.TYPE,
                              reply_to=reply_to,
-                             correlation_id=correlation_id)
+                             correlation_id=correlation_id,
+                             **publish_kwargs)
 
         def _publish_errback(exc, interval):
             LOG.exception('Publishing error: %s', exc)
@@ -229,3 +281,122 @@ class Proxy(object):
     def stop(self):
         """Stop proxy."""
         self._running.clear()
+
+
+class Batcher(object):
+    """Packs messages published within a short window into batch messages.
+
+    Messages that are published (to the same routing key with the same
+    ``reply_to`` and serializer) within ``delay`` seconds of each other are
+    sent as a single :py:class:`~.protocol.Batch` message (a batch is also
+    sent as soon as it contains ``max_size`` messages). The messages are sent
+    in the same order they were published in.
+
+    When a batch can not be sent ``on_failure`` (when provided) is called
+    with each message it contained (along with the routing key, correlation
+    id and serializer the message was published with and the failure).
+
+    For **internal** usage only (not for public consumption).
+    """
+
+    def __init__(self, proxy, delay, max_size=pr.BATCH_SIZE,
+                 on_failure=None):
+        if delay < 0:
+            raise ValueError("Batch delay must be greater than or equal"
+                             " to zero")
+        if max_size <= 0:
+            raise ValueError("Batch size must be greater than zero")
+        self._proxy = proxy
+        self._delay = delay
+        self._max_size = max_size
+        self._on_failure = on_failure
+        self._pending = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Held while batches are taken and sent (so that they are sent in
+        # the order that they were created in).
+        self._send_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._stop_wanted = threading.Event()
+        self._flusher = None
+
+    def publish(self, msg, routing_key, reply_to=None, correlation_id=None,
+                serializer=None):
+        """Adds a message to the batch for the routing key (and reply to)."""
+        with self._lock:
+            key = (routing_key, reply_to, serializer)
+            try:
+                batch = self._pending[key]
+            except KeyError:
+                batch = self._pending[key] = pr.Batch()
+            batch.add(msg, correlation_id=correlation_id)
+            full = len(batch) >= self._max_size
+            if not full:
+                if not tu.is_alive(self._flusher):
+                    self._flusher = tu.daemon_thread(self._flush_later)
+                    self._flusher.start()
+                self._flush_wanted.set()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Sends all pending batches (now, instead of later)."""
+        with self._send_lock:
+            with self._lock:
+                pending = self._pending
+                self._pending = collections.OrderedDict()
+            for key, batch in six.iteritems(pending):
+                routing_key, reply_to, serializer = key
+                self._send(batch, routing_key, reply_to, serializer)
+
+    def stop(self, flush=True):
+        """Stops the thread that sends batches later.
+
+        Any pending batches are sent first (or are discarded when
+        ``flush`` is false); if more messages are published after this
+        has been called a new thread is started to send them.
+        """
+        if flush:
+            self.flush()
+        with self._lock:
+            self._pending.clear()
+            self._stop_wanted.set()
+            self._flush_wanted.set()
+            flusher = self._flusher
+        if tu.is_alive(flusher):
+            flusher.join()
+        with self._lock:
+            self._stop_wanted.clear()
+            self._flusher = None
+
+    def _flush_later(self):
+        while True:
+            self._flush_wanted.wait()
+            # Give other messages a chance to join these batches...
+            self._stop_wanted.wait(self._delay)
+            with self._lock:
+                self._flush_wanted.clear()
+                if self._stop_wanted.is_set():
+                    return
+            self.flush()
+
+    def _send(self, batch, routing_key, reply_to, serializer):
+        messages = batch.messages
+        try:
+            if len(messages) == 1:
+                # No point in packing a single message...
+                msg, correlation_id = messages[0]
+                self._proxy.publish(msg, routing_key, reply_to=reply_to,
+                                    correlation_id=correlation_id,
+                                    serializer=serializer)
+            else:
+                self._proxy.publish(batch, routing_key, reply_to=reply_to,
+                                    serializer=serializer)
+        except Exception:
+            with misc.capture_failure() as failure:
+                LOG.critical("Failed to send batch of %s messages using"
+                             " routing key '%s'", len(messages), routing_key,
+                             exc_info=True)
+                if self._on_failure is not None:
+                    for msg, correlation_id in messages:
+                        self._on_failure(msg, routing_key, correlation_id,
+                                         serializer, failure)
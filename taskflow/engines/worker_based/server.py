@@ -15,13 +15,16 @@
 #    under the License.
 
 import functools
+import threading
 
 from oslo_utils import reflection
 from oslo_utils import timeutils
 
+from taskflow.engines.worker_based import blobs
 from taskflow.engines.worker_based import dispatcher
 from taskflow.engines.worker_based import protocol as pr
 from taskflow.engines.worker_based import proxy
+from taskflow import exceptions as excp
 from taskflow import logging
 from taskflow.types import failure as ft
 from taskflow.types import notifier as nt
@@ -34,35 +37,64 @@ LOG = logging.getLogger(__name__)
 class Server(object):
     """Server implementation that waits for incoming tasks requests."""
 
+    LATENCY_WEIGHT = 0.2
+    """
+    Weight given to the most recent request processing time when updating
+    the (exponentially weighted) average latency that is sent back in notify
+    responses (so that engines can avoid picking slow/busy workers).
+    """
+
     def __init__(self, topic, exchange, executor, endpoints,
                  url=None, transport=None, transport_options=None,
-                 retry_options=None):
+                 retry_options=None, batch_delay=pr.REPLY_BATCH_DELAY,
+                 blob_store=None, blob_threshold=blobs.DEFAULT_THRESHOLD):
         type_handlers = {
             pr.NOTIFY: dispatcher.Handler(
                 self._delayed_process(self._process_notify),
                 validator=functools.partial(pr.Notify.validate,
                                             response=False)),
             pr.REQUEST: dispatcher.Handler(
-                self._delayed_process(self._process_request),
+                self._delayed_process(self._process_request, tracked=True),
                 validator=pr.Request.validate),
+            pr.BATCH: dispatcher.Handler(self._process_batch,
+                                         validator=pr.Batch.validate),
         }
+        self._outstanding = 0
+        self._latency = None
+        self._load_lock = threading.Lock()
         self._executor = executor
         self._proxy = proxy.Proxy(topic, exchange,
                                   type_handlers=type_handlers,
                                   url=url, transport=transport,
                                   transport_options=transport_options,
                                   retry_options=retry_options)
+        # Replies to requests that were received in batches are sent back
+        # in batches (the engines that sent them will be able to handle
+        # that, while others may not be).
+        self._batcher = proxy.Batcher(self._proxy, batch_delay,
+                                      on_failure=self._on_batch_failure)
+        # Large arguments (and results) are sent using the blob store (when
+        # one is provided) instead of inside of the messages themselves.
+        if blob_store is not None:
+            self._offloader = blobs.Offloader(blob_store,
+                                              threshold=blob_threshold)
+        else:
+            self._offloader = None
         self._topic = topic
         self._endpoints = dict([(endpoint.name, endpoint)
                                 for endpoint in endpoints])
 
-    def _delayed_process(self, func):
+    def _delayed_process(self, func, tracked=False):
         """Runs the function using the instances executor (eventually).
 
         This adds a *nice* benefit on showing how long it took for the
         function to finally be executed from when the message was received
         to when it was finally ran (which can be a nice thing to know
         to determine bottle-necks...).
+
+        When tracked, the message counts as outstanding (until the function
+        has finished) and how long the function took to run updates the
+        average latency; both are sent back in notify responses.
         """
         func_name = reflection.get_callable_name(func)
 
@@ -71,16 +103,29 @@ class Server(object):
                       " function/method '%s' with"
                       " message '%s'", watch.elapsed(), func_name,
                       ku.DelayedPretty(message))
-            return func(content, message)
+            if not tracked:
+                return func(content, message)
+            run_watch = timeutils.StopWatch()
+            run_watch.start()
+            try:
+                return func(content, message)
+            finally:
+                self._finished(run_watch.elapsed())
 
         def _on_receive(content, message):
             LOG.debug("Submitting message '%s' for execution in the"
                       " future to '%s'", ku.DelayedPretty(message), func_name)
             watch = timeutils.StopWatch()
             watch.start()
+            if tracked:
+                with self._load_lock:
+                    self._outstanding += 1
             try:
                 self._executor.submit(_on_run, watch, content, message)
             except RuntimeError:
+                if tracked:
+                    with self._load_lock:
+                        self._outstanding -= 1
                 LOG.error("Unable to continue processing message '%s',"
                           " submission to instance executor (with later"
                           " execution by '%s') was unsuccessful",
@@ -89,6 +134,35 @@ class Server(object):
 
         return _on_receive
 
+    def _finished(self, elapsed):
+        with self._load_lock:
+            self._outstanding -= 1
+            if self._latency is None:
+                self._latency = elapsed
+            else:
+                weight = self.LATENCY_WEIGHT
+                self._latency = (weight * elapsed +
+                                 (1 - weight) * self._latency)
+
+    @property
+    def capacity(self):
+        """How loaded this server is (as sent back in notify responses).
+
+        This includes how many requests have been received but have not
+        finished being processed (``outstanding``), how many workers the
+        executor used to process them has (``workers``, when known) and the
+        average time processing a request has recently taken (``latency``,
+        once any have been processed).
+        """
+        with self._load_lock:
+            capacity = {'outstanding': max(0, self._outstanding)}
+            if self._latency is not None:
+                capacity['latency'] = self._latency
+        workers = getattr(self._executor, 'max_workers', None)
+        if isinstance(workers, int) and workers > 0:
+            capacity['workers'] = workers
+        return capacity
+
     @property
     def connection_details(self):
         return self._proxy.connection_details
@@ -109,17 +183,34 @@ class Server(object):
                                  prop)
         return properties
 
-    def _reply(self, capture, reply_to, task_uuid, state=pr.FAILURE, **kwargs):
+    @staticmethod
+    def _parse_notify_fields(message):
+        """Extracts the optional notify response fields the sender knows."""
+        headers = getattr(message, 'headers', None) or {}
+        return frozenset(headers.get(pr.Notify.FIELDS_HEADER) or ())
+
+    def _process_batch(self, batch, message):
+        """Process batch message (by dispatching what it contains)."""
+        self._proxy.dispatcher.dispatch_batch(batch, message)
+
+    def _reply(self, capture, reply_to, task_uuid, state=pr.FAILURE,
+               publish=None, serializer=None, **kwargs):
         """Send a reply to the `reply_to` queue with the given information.
 
         Can capture failures to publish and if capturing will log associated
         critical errors on behalf of the caller, and then returns whether the
         publish worked out or did not.
         """
+        if publish is None:
+            publish = self._proxy.publish
+        publish_kwargs = {}
+        if serializer is not None:
+            publish_kwargs['serializer'] = serializer
         response = pr.Response(state, **kwargs)
         published = False
         try:
-            self._proxy.publish(response, reply_to, correlation_id=task_uuid)
+            publish(response, reply_to, correlation_id=task_uuid,
+                    **publish_kwargs)
             published = True
         except Exception:
             if not capture:
@@ -129,13 +220,38 @@ class Server(object):
                          exc_info=True)
         return published
 
-    def _on_event(self, reply_to, task_uuid, event_type, details):
+    def _on_batch_failure(self, response, reply_to, task_uuid, serializer,
+                          failure):
+        """Resends a reply that could not be sent as part of a batch.
+
+        It is sent by itself (so that a reply that can not be sent does not
+        stop the replies it was batched with from being sent); if that also
+        fails any blob its result was offloaded into is deleted (since the
+        engine will never be told to fetch it).
+        """
+        publish_kwargs = {}
+        if serializer is not None:
+            publish_kwargs['serializer'] = serializer
+        try:
+            self._proxy.publish(response, reply_to, correlation_id=task_uuid,
+                                **publish_kwargs)
+        except Exception:
+            LOG.critical("Failed to send reply to '%s' for task '%s' with"
+                         " response %s", reply_to, task_uuid, response,
+                         exc_info=True)
+            blob = response.data.get('blob')
+            if blob is not None and self._offloader is not None:
+                self._offloader.delete([blob])
+
+    def _on_event(self, reply_to, task_uuid, event_type, details,
+                  publish=None, serializer=None):
         """Send out a task event notification."""
         # NOTE(harlowja): the executor that will trigger this using the
         # task notification/listener mechanism will handle logging if this
         # fails, so thats why capture is 'False' is used here.
-        self._reply(False, reply_to, task_uuid, pr.EVENT,
-                    event_type=event_type, details=details)
+        self._reply(False, reply_to, task_uuid, pr.EVENT, publish=publish,
+                    serializer=serializer, event_type=event_type,
+                    details=details)
 
     def _process_notify(self, notify, message):
         """Process notify message and reply back."""
@@ -146,8 +262,19 @@ class Server(object):
                         " in received notify message '%s'",
                         ku.DelayedPretty(message), exc_info=True)
         else:
+            # Optional fields are only sent to senders that understand them
+            # (older ones reject responses that contain them).
+            fields = self._parse_notify_fields(message)
+            notify_kwargs = {}
+            if 'capacity' in fields:
+                notify_kwargs['capacity'] = self.capacity
+            if 'serializers' in fields:
+                notify_kwargs['serializers'] = list(proxy.SERIALIZERS)
+            if 'blobs' in fields and self._offloader is not None:
+                notify_kwargs['blobs'] = True
             response = pr.Notify(topic=self._topic,
-                                 tasks=list(self._endpoints.keys()))
+                                 tasks=list(self._endpoints.keys()),
+                                 **notify_kwargs)
             try:
                 self._proxy.publish(response, routing_key=reply_to)
             except Exception:
@@ -168,14 +295,24 @@ class Server(object):
                      ku.DelayedPretty(message), exc_info=True)
             return
         else:
-            # prepare reply callback
+            # prepare reply callback (replies to requests that came in a
+            # batch are also sent back in batches, and replies are sent
+            # using the same serializer the request was sent with)
+            if isinstance(message, dispatcher.BatchedMessage):
+                publish = self._batcher.publish
+            else:
+                publish = None
+            serializer = proxy.serializer_for(message)
             reply_callback = functools.partial(self._reply, True, reply_to,
-                                               task_uuid)
+                                               task_uuid, publish=publish,
+                                               serializer=serializer)
 
-        # Parse the request to get the activity/work to perform.
+        # Parse the request to get the activity/work to perform (this is
+        # also where any offloaded arguments get fetched).
         try:
-            work = pr.Request.from_dict(request, task_uuid=task_uuid)
-        except ValueError:
+            work = pr.Request.from_dict(request, task_uuid=task_uuid,
+                                        offloader=self._offloader)
+        except (ValueError, excp.TaskFlowException):
             with misc.capture_failure() as failure:
                 LOG.warning("Failed to parse request contents"
                             " from message '%s'",
@@ -217,22 +354,24 @@ class Server(object):
                         reply_callback(result=pr.failure_to_dict(failure))
                         return
                 else:
-                    if not reply_callback(state=pr.RUNNING):
+                    # This is always sent right away (batched replies are
+                    # only queued, so whether they were sent is not known
+                    # until later); the task is not ran if it can not be.
+                    if not reply_callback(state=pr.RUNNING,
+                                          publish=self._proxy.publish):
                         return
 
         # Associate *any* events this task emits with a proxy that will
         # emit them back to the engine... for handling at the engine side
         # of things...
+        on_event = functools.partial(self._on_event, reply_to, task_uuid,
+                                     publish=publish, serializer=serializer)
         if task.notifier.can_be_registered(nt.Notifier.ANY):
-            task.notifier.register(nt.Notifier.ANY,
-                                   functools.partial(self._on_event,
-                                                     reply_to, task_uuid))
+            task.notifier.register(nt.Notifier.ANY, on_event)
         elif isinstance(task.notifier, nt.RestrictedNotifier):
             # Only proxy the allowable events then...
             for event_type in task.notifier.events_iter():
-                task.notifier.register(event_type,
-                                       functools.partial(self._on_event,
-                                                         reply_to, task_uuid))
+                task.notifier.register(event_type, on_event)
 
         # Perform the task action.
         try:
@@ -248,7 +387,32 @@ class Server(object):
             if isinstance(result, ft.Failure):
                 reply_callback(result=result.to_dict())
             else:
-                reply_callback(state=pr.SUCCESS, result=result)
+                self._reply_success(reply_callback, request, result,
+                                    endpoint, work, message)
+
+    def _reply_success(self, reply_callback, request, result,
+                       endpoint, work, message):
+        """Replies with a result (offloading it if it is large)."""
+        key = None
+        # Only offload when the sender said that it can fetch offloaded
+        # results (older senders can not).
+        if self._offloader is not None and 'blobs' in request:
+            try:
+                key = self._offloader.offload(result)
+            except Exception:
+                with misc.capture_failure() as failure:
+                    LOG.warning("The '%s' endpoint '%s' result offloading"
+                                " for request message '%s' failed",
+                                endpoint, work.action,
+                                ku.DelayedPretty(message), exc_info=True)
+                    reply_callback(result=pr.failure_to_dict(failure))
+                    return
+        if key is None:
+            reply_callback(state=pr.SUCCESS, result=result)
+        elif not reply_callback(state=pr.SUCCESS, result=None, blob=key):
+            # Nobody will ever fetch it (batched replies that can not be
+            # sent have it deleted by the batch failure handler instead)...
+            self._offloader.delete([key])
 
     def start(self):
         """Start processing incoming requests."""
@@ -261,3 +425,4 @@ class Server(object):
     def stop(self):
         """Stop processing incoming requests."""
         self._proxy.stop()
+        self._batcher.stop()
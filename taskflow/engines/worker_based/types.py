@@ -45,6 +45,15 @@ class TopicWorker(object):
         self.topic = topic
         self.identity = identity
         self.last_seen = None
+        # Last known capacity/load details this worker sent (if any); unlike
+        # the other attributes this is expected to change over time.
+        self.capacity = None
+        # Serializers this worker accepts messages to be sent with (if it
+        # said so, otherwise only the default one should be used).
+        self.serializers = None
+        # Whether this worker can fetch offloaded arguments (and offload its
+        # results) using a blob store (only if it said so).
+        self.blobs = False
 
     def performs(self, task):
         if not isinstance(task, six.string_types):
@@ -123,7 +132,29 @@ class ProxyWorkerFinder(object):
             return 0
 
     @staticmethod
-    def _match_worker(task, available_workers):
+    def _estimate_load(worker, in_flight=None):
+        """Estimates how loaded a worker is (lower is less loaded).
+
+        This uses the greater of how many requests we know we have sent to
+        the worker that have not finished (which is always up to date) and
+        how many requests the worker last told us it had outstanding (which
+        includes requests from others, but may be somewhat stale) divided by
+        how many requests the worker can process at once.
+        """
+        outstanding = 0
+        if in_flight:
+            outstanding = in_flight.get(worker.topic, 0)
+        workers = 1
+        latency = 0.0
+        capacity = worker.capacity
+        if capacity:
+            outstanding = max(outstanding, capacity.get('outstanding', 0))
+            workers = max(1, capacity.get('workers', 1))
+            latency = capacity.get('latency', 0.0)
+        return (float(outstanding + 1) / workers, latency)
+
+    @classmethod
+    def _match_worker(cls, task, available_workers, in_flight=None):
         """Select a worker (from geq 1 workers) that can best perform the task.
 
         NOTE(harlowja): this method will be activated when there exists
@@ -132,11 +163,21 @@ class ProxyWorkerFinder(object):
         task that is being requested to perform and the result should be one
         of those workers using whatever best-fit algorithm is possible (or
         random at the least).
+
+        This uses the *power of two choices* algorithm; two of the
+        potential workers are randomly chosen and the least loaded one of
+        those two is selected (ties go to the one with the lower latency),
+        which avoids piling work onto a single worker (and avoids everyone
+        picking the same least loaded worker at the same time) while only
+        having to look at two workers.
         """
         if len(available_workers) == 1:
             return available_workers[0]
         else:
-            return random.choice(available_workers)
+            choices = random.sample(available_workers, 2)
+            return min(choices,
+                       key=lambda worker: cls._estimate_load(worker,
+                                                             in_flight))
 
     @property
     def messages_processed(self):
@@ -158,17 +199,16 @@ class ProxyWorkerFinder(object):
         about workers and what tasks they can perform (so that we can then
         match workers to tasks to run).
         """
-        if self._messages_published == 0:
-            self._proxy.publish(pr.Notify(),
-                                self._topics, reply_to=self._uuid)
+        if self._messages_published == 0 or self._watch.expired():
+            # Say which optional fields can be sent back (workers leave
+            # them out otherwise).
+            headers = {
+                pr.Notify.FIELDS_HEADER: list(pr.Notify.OPTIONAL_FIELDS),
+            }
+            self._proxy.publish(pr.Notify(), self._topics,
+                                reply_to=self._uuid, headers=headers)
             self._messages_published += 1
             self._watch.restart()
-        else:
-            if self._watch.expired():
-                self._proxy.publish(pr.Notify(),
-                                    self._topics, reply_to=self._uuid)
-                self._messages_published += 1
-                self._watch.restart()
 
     def _add(self, topic, tasks):
         """Adds/updates a worker for the topic for the given tasks."""
@@ -197,6 +237,9 @@ class ProxyWorkerFinder(object):
         with self._cond:
             worker, new_or_updated = self._add(response.topic,
                                                response.tasks)
+            worker.capacity = response.capacity
+            worker.serializers = response.serializers
+            worker.blobs = response.blobs
             if new_or_updated:
                 LOG.debug("Updated worker '%s' (%s total workers are"
                           " currently known)", worker, self.total_workers)
@@ -241,14 +284,21 @@ class ProxyWorkerFinder(object):
             self._seen_workers = 0
             self._cond.notify_all()
 
-    def get_worker_for_task(self, task):
-        """Gets a worker that can perform a given task."""
+    def get_worker_for_task(self, task, in_flight=None):
+        """Gets a worker that can perform a given task.
+
+        If provided, ``in_flight`` is a mapping of worker topic to how many
+        requests have been sent to the worker on that topic (that have not
+        finished yet); it is used (with what workers tell us about their
+        load) to prefer the least loaded workers.
+        """
         available_workers = []
         with self._cond:
             for worker in six.itervalues(self._workers):
                 if worker.performs(task):
                     available_workers.append(worker)
         if available_workers:
-            return self._match_worker(task, available_workers)
+            return self._match_worker(task, available_workers,
+                                      in_flight=in_flight)
         else:
             return None
@@ -22,6 +22,7 @@ import sys
 import futurist
 from oslo_utils import reflection
 
+from taskflow.engines.worker_based import blobs
 from taskflow.engines.worker_based import endpoint
 from taskflow.engines.worker_based import server
 from taskflow import logging
@@ -55,12 +56,19 @@ class Worker(object):
                               options imply and are expected to be)
     :param retry_options: retry specific options
                           (see: :py:attr:`~.proxy.Proxy.DEFAULT_RETRY_OPTIONS`)
+    :param blob_store: blob store (a :py:class:`~.blobs.BlobStore`) that
+                       large task arguments are fetched from (and large task
+                       results are put into); it must use the same
+                       underlying storage as the engines blob store
+    :param blob_threshold: size (in bytes) that encoded task results must be
+                           larger than to be put into the blob store
     """
 
     def __init__(self, exchange, topic, tasks,
                  executor=None, threads_count=None, url=None,
                  transport=None, transport_options=None,
-                 retry_options=None):
+                 retry_options=None, blob_store=None,
+                 blob_threshold=blobs.DEFAULT_THRESHOLD):
         self._topic = topic
         self._executor = executor
         self._owns_executor = False
@@ -74,7 +82,9 @@ class Worker(object):
                                      self._endpoints, url=url,
                                      transport=transport,
                                      transport_options=transport_options,
-                                     retry_options=retry_options)
+                                     retry_options=retry_options,
+                                     blob_store=blob_store,
+                                     blob_threshold=blob_threshold)
 
     @staticmethod
     def _derive_endpoints(tasks):
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from oslo_utils import reflection
+import six
+from six.moves import map as compat_map
+
+from taskflow.patterns import graph_flow
+from taskflow import task
+
+
+def _chunk_bounds(length, chunk, chunks):
+    return (length * chunk // chunks, length * (chunk + 1) // chunks)
+
+
+class MapSplitTask(task.Task):
+    """Splits a sequence into many chunks (or slices).
+
+    The sequence is split into as many (roughly equally sized) contiguous
+    slices as there are names in ``provides`` and each slice is provided
+    under the name at the same index.
+    """
+
+    def __init__(self, sequence, provides, name=None):
+        super(MapSplitTask, self).__init__(name=name, provides=provides,
+                                           requires=[sequence])
+        self._sequence = sequence
+
+    def execute(self, *args, **kwargs):
+        sequence = kwargs[self._sequence]
+        chunks = len(self.provides)
+        slices = []
+        for chunk in six.moves.range(0, chunks):
+            start, stop = _chunk_bounds(len(sequence), chunk, chunks)
+            slices.append(list(itertools.islice(sequence, start, stop)))
+        return slices
+
+
+class MapChunkTask(task.Task):
+    """Maps a function over one chunk (or slice) of a sequence.
+
+    Maps the functor over the chunk named by ``chunk`` (typically one
+    provided by a :py:class:`.MapSplitTask`), returning the list of
+    results (in the same order).
+    """
+
+    def __init__(self, functor, chunk, name=None, provides=None,
+                 inject=None):
+        if name is None:
+            name = "%s-%s" % (reflection.get_callable_name(functor), chunk)
+        super(MapChunkTask, self).__init__(name=name, provides=provides,
+                                           requires=[chunk],
+                                           inject=inject)
+        self._functor = functor
+        self._chunk = chunk
+
+    def execute(self, *args, **kwargs):
+        return list(compat_map(self._functor, kwargs[self._chunk]))
+
+
+class MapGatherTask(task.Task):
+    """Concatenates the results of many chunks into a single list."""
+
+    def __init__(self, chunk_provides, name=None, provides=None):
+        super(MapGatherTask, self).__init__(name=name, provides=provides,
+                                            requires=chunk_provides)
+
+    def execute(self, *args, **kwargs):
+        return list(itertools.chain.from_iterable(
+            kwargs[r] for r in self.requires))
+
+
+class Flow(graph_flow.Flow):
+    """Batched (or chunked) map flow pattern.
+
+    Maps a functor (that takes exactly one argument) over each item of the
+    sequence named by ``requires``; instead of creating one atom per item
+    (which for large sequences creates very large graphs and a persisted atom
+    detail per item) a :py:class:`.MapSplitTask` first splits the sequence
+    into ``chunks`` contiguous slices and one :py:class:`.MapChunkTask` is
+    created per slice (each one only requires, and is only sent, its own
+    slice). Those tasks do not depend on each other so they can be ran in
+    parallel (using the engines executor) and since each one saves the
+    results of its slice as a single list, resumption happens at chunk
+    granularity (chunks that finished are not re-ran).
+
+    When ``provides`` is given a final :py:class:`.MapGatherTask` is also
+    added that concatenates the results of all the chunks (in the same order
+    as the original sequence) and provides that list under that name; since
+    that persists another copy of all the results it can be avoided by
+    not providing ``provides`` and instead requiring the results of each
+    chunk (which are provided as ``<name>-chunk-<number>``) directly.
+
+    The number of chunks (and not the size of each chunk) is what is
+    provided, since the length of the sequence is typically not known until
+    the flow is actually ran.
+    """
+
+    def __init__(self, name, functor, requires, provides=None, chunks=1,
+                 retry=None):
+        super(Flow, self).__init__(name, retry=retry)
+        if not six.callable(functor):
+            raise ValueError("Function to use for map must be callable")
+        f_args = reflection.get_callable_args(functor)
+        if len(f_args) != 1:
+            raise ValueError("%s arguments were provided. Map functor must "
+                             "take exactly 1 argument." % len(f_args))
+        if not isinstance(requires, six.string_types):
+            raise TypeError("%s type was provided for requires. Requires "
+                            "must be the name of the sequence to map"
+                            " over." % type(requires))
+        if chunks <= 0:
+            raise ValueError("Chunks must be greater than zero")
+        slice_provides = []
+        chunk_provides = []
+        for chunk in six.moves.range(0, chunks):
+            slice_provides.append("%s-slice-%s" % (name, chunk))
+            chunk_provides.append("%s-chunk-%s" % (name, chunk))
+        self.add(MapSplitTask(requires, slice_provides,
+                              name="%s-split" % name))
+        for slice_name, chunk_name in zip(slice_provides, chunk_provides):
+            self.add(MapChunkTask(functor, slice_name, name=chunk_name,
+                                  provides=chunk_name))
+        if provides is not None:
+            self.add(MapGatherTask(chunk_provides, name="%s-gather" % name,
+                                   provides=provides))
+        self._chunks = chunks
+
+    @property
+    def chunks(self):
+        """How many chunks the mapped over sequence is split into."""
+        return self._chunks
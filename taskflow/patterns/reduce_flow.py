@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import reflection
+import six
+
+from taskflow import flow
+from taskflow.patterns import graph_flow
+from taskflow import retry as retry_atom
+from taskflow import task
+
+
+def _has_retry(item):
+    if isinstance(item, flow.Flow):
+        if item.retry is not None:
+            return True
+        return any(_has_retry(child) for child in item)
+    return isinstance(item, retry_atom.Retry)
+
+
+class Flow(graph_flow.Flow):
+    """Streaming reduce flow pattern.
+
+    Reduces the results of the provided ``items`` (tasks or flows that each
+    provide a single value) with a functor that takes exactly two arguments
+    (the accumulator and a value). The items do not depend on each other (so
+    they can be ran in parallel) and a single
+    :py:class:`~taskflow.task.StreamingReduceTask` is added that the engine
+    folds each items result into as soon as that item has finished (instead
+    of a single reduction that waits for every item to have finished). Only
+    that running accumulator is saved in storage (so resumption continues
+    folding from the last saved accumulator) and the results of the items
+    are released once they have been folded into it (unless some other atom
+    also requires them).
+
+    Values are folded in the order the items finish in (and not the order
+    they were provided in), so the functor should be commutative (and
+    associative) to produce the same result each time. The final accumulator
+    is provided under the ``provides`` name.
+
+    When ``initial`` is provided it is used as the starting accumulator
+    (otherwise the result of the first item to finish is).
+
+    Since folded values can not be taken back out of the accumulator the
+    items must be reverted (and retried) together, so they can not contain
+    their own retry controllers (a ``retry`` controller for this flow, or one
+    of the flows it is contained in, can be used instead).
+    """
+
+    _NO_INITIAL = object()
+
+    def __init__(self, name, functor, items, provides,
+                 initial=_NO_INITIAL, retry=None):
+        super(Flow, self).__init__(name, retry=retry)
+        if not six.callable(functor):
+            raise ValueError("Function to use for reduce must be callable")
+        f_args = reflection.get_callable_args(functor)
+        if len(f_args) != 2:
+            raise ValueError("%s arguments were provided. Reduce functor "
+                             "must take exactly 2 arguments." % len(f_args))
+        if not items:
+            raise ValueError("At least one item to reduce must be provided")
+        values = []
+        for item in items:
+            if len(item.provides) != 1:
+                raise ValueError("Item '%s' must provide exactly one value"
+                                 " to reduce (not %s)"
+                                 % (item.name, len(item.provides)))
+            if _has_retry(item):
+                raise ValueError("Item '%s' can not contain a retry"
+                                 " controller" % item.name)
+            values.append(list(item.provides)[0])
+        reduce_kwargs = {
+            'name': "%s-reduce" % name,
+            'provides': provides,
+        }
+        if initial is not self._NO_INITIAL:
+            reduce_kwargs['initial'] = initial
+        self.add(*items)
+        self.add(task.StreamingReduceTask(functor, values, **reduce_kwargs))
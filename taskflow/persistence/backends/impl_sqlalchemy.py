@@ -17,6 +17,7 @@
 
 from __future__ import absolute_import
 
+import collections
 import contextlib
 import copy
 import functools
@@ -108,6 +109,10 @@ DEFAULT_TXN_ISOLATION_LEVELS = {
     'postgres': 'READ COMMITTED',
 }
 
+# Maximum number of uuids placed into a single ``IN`` clause (some databases,
+# for example sqlite, limit how many bound parameters a statement may have).
+MAX_IN_UUIDS = 500
+
 
 def _log_statements(log_level, conn, cursor, statement, parameters, *args):
     if LOG.isEnabledFor(log_level):
@@ -190,6 +195,11 @@ class _Alchemist(object):
 
     NOTE(harlowja): for internal usage only.
     """
+    #: Atom detail columns that are not selected when deferring (these are
+    #: instead selected when the deferred atom details are first accessed).
+    DEFERRED_ATOM_COLUMNS = frozenset(['results', 'failure',
+                                       'revert_results', 'revert_failure'])
+
     def __init__(self, tables):
         self._tables = tables
 
@@ -207,11 +217,32 @@ class _Alchemist(object):
         atom_cls = models.atom_detail_class(row.pop('atom_type'))
         return atom_cls.from_dict(row)
 
-    def atom_query_iter(self, conn, parent_uuid):
-        q = (sql.select([self._tables.atomdetails]).
-             where(self._tables.atomdetails.c.parent_uuid == parent_uuid))
+    def atom_query_iter(self, conn, parent_uuid, loader=None):
+        atomdetails = self._tables.atomdetails
+        if loader is None:
+            columns = [atomdetails]
+        else:
+            columns = [c for c in atomdetails.c
+                       if c.name not in self.DEFERRED_ATOM_COLUMNS]
+        q = (sql.select(columns).
+             where(atomdetails.c.parent_uuid == parent_uuid))
         for row in conn.execute(q):
-            yield self.convert_atom_detail(row)
+            ad = self.convert_atom_detail(row)
+            if loader is not None:
+                ad.defer(functools.partial(loader, ad.uuid))
+                ad.mark_clean()
+            yield ad
+
+    def atom_query_many(self, conn, uuids):
+        atomdetails = self._tables.atomdetails
+        e_ads = {}
+        for i in six.moves.range(0, len(uuids), MAX_IN_UUIDS):
+            q = (sql.select([atomdetails]).
+                 where(atomdetails.c.uuid.in_(uuids[i:i + MAX_IN_UUIDS])))
+            for row in conn.execute(q):
+                e_ad = self.convert_atom_detail(row)
+                e_ads[e_ad.uuid] = e_ad
+        return e_ads
 
     def flow_query_iter(self, conn, parent_uuid):
         q = (sql.select([self._tables.flowdetails]).
@@ -219,13 +250,13 @@ class _Alchemist(object):
         for row in conn.execute(q):
             yield self.convert_flow_detail(row)
 
-    def populate_book(self, conn, book):
+    def populate_book(self, conn, book, loader=None):
         for fd in self.flow_query_iter(conn, book.uuid):
             book.add(fd)
-            self.populate_flow_detail(conn, fd)
+            self.populate_flow_detail(conn, fd, loader=loader)
 
-    def populate_flow_detail(self, conn, fd):
-        for ad in self.atom_query_iter(conn, fd.uuid):
+    def populate_flow_detail(self, conn, fd, loader=None):
+        for ad in self.atom_query_iter(conn, fd.uuid, loader=loader):
             fd.add(ad)
 
 
@@ -237,6 +268,14 @@ class SQLAlchemyBackend(base.Backend):
         conf = {
             "connection": "sqlite:////tmp/test.db",
         }
+
+    When the ``defer_results`` configuration key is truthy the atom details
+    of flow details that are read will **not** have their results and
+    failures selected; those will instead be selected when first accessed
+    (see :py:meth:`~taskflow.persistence.models.AtomDetail.defer`). Such
+    atom details start out marked as clean (unchanged since last saved), so
+    any in-place alterations made to them **must** be followed by marking
+    them as dirty, otherwise those alterations will not be saved.
     """
     def __init__(self, conf, engine=None):
         super(SQLAlchemyBackend, self).__init__(conf)
@@ -252,6 +291,8 @@ class SQLAlchemyBackend(base.Backend):
             self._max_retries = misc.as_int(self._conf.get('max_retries'))
         except TypeError:
             self._max_retries = 0
+        self._defer_results = _as_bool(self._conf.get('defer_results',
+                                                      False))
 
     @staticmethod
     def _create_engine(conf):
@@ -329,6 +370,11 @@ class SQLAlchemyBackend(base.Backend):
     def engine(self):
         return self._engine
 
+    @property
+    def defer_results(self):
+        """If selecting flow detail atom results is deferred."""
+        return self._defer_results
+
     def get_connection(self):
         conn = Connection(self, upgrade_lock=self._upgrade_lock)
         if not self._validated:
@@ -353,6 +399,10 @@ class Connection(base.Connection):
         self._metadata = sa.MetaData()
         self._tables = tables.fetch(self._metadata)
         self._converter = _Alchemist(self._tables)
+        if backend.defer_results:
+            self._loader = self.get_atom_details
+        else:
+            self._loader = None
 
     @property
     def backend(self):
@@ -438,6 +488,28 @@ class Connection(base.Connection):
                                  "Failed updating atom details"
                                  " with uuid '%s'" % atom_detail.uuid)
 
+    def update_atom_details_many(self, atom_details):
+        atom_details = list(atom_details)
+        if not atom_details:
+            return []
+        try:
+            with self._engine.begin() as conn:
+                e_ads = self._converter.atom_query_many(
+                    conn, [ad.uuid for ad in atom_details])
+                pairs = []
+                for ad in atom_details:
+                    try:
+                        pairs.append((ad, e_ads[ad.uuid]))
+                    except KeyError:
+                        raise exc.NotFound("No atom details found with uuid"
+                                           " '%s'" % ad.uuid)
+                self._update_atom_details_many(conn, pairs)
+            return [e_ad for (_ad, e_ad) in pairs]
+        except sa_exc.SQLAlchemyError:
+            exc.raise_with_cause(exc.StorageFailure,
+                                 "Failed updating %s atom details"
+                                 % len(atom_details))
+
     def _insert_flow_details(self, conn, fd, parent_uuid):
         value = fd.to_dict()
         value['parent_uuid'] = parent_uuid
@@ -452,23 +524,58 @@ class Connection(base.Connection):
         conn.execute(sql.insert(self._tables.atomdetails, value))
 
     def _update_atom_details(self, conn, ad, e_ad):
-        e_ad.merge(ad)
-        conn.execute(sql.update(self._tables.atomdetails)
-                     .where(self._tables.atomdetails.c.uuid == e_ad.uuid)
-                     .values(e_ad.to_dict()))
+        # Only the fields that changed (in the incoming atom detail) are
+        # translated and written (this avoids rewriting potentially large
+        # results that have not changed)...
+        fields = ad.dirty_fields
+        if fields:
+            e_ad.merge(ad)
+            conn.execute(sql.update(self._tables.atomdetails)
+                         .where(self._tables.atomdetails.c.uuid == e_ad.uuid)
+                         .values(e_ad.to_dict(fields=fields)))
+
+    def _update_atom_details_many(self, conn, pairs):
+        # Merges each (atom detail, existing atom detail) pair and then writes
+        # the merged rows using a single executemany statement per each
+        # unique set of changed fields (each statement must set the same
+        # columns for all of its rows)...
+        values_by_fields = collections.defaultdict(list)
+        for ad, e_ad in pairs:
+            fields = ad.dirty_fields
+            if fields:
+                e_ad.merge(ad)
+                value = e_ad.to_dict(fields=fields)
+                value['e_uuid'] = e_ad.uuid
+                values_by_fields[fields].append(value)
+        atomdetails = self._tables.atomdetails
+        for values in six.itervalues(values_by_fields):
+            conn.execute(sql.update(atomdetails)
+                         .where(atomdetails.c.uuid == sql.bindparam('e_uuid')),
+                         values)
 
     def _update_flow_details(self, conn, fd, e_fd):
+        fields = fd.dirty_fields
         e_fd.merge(fd)
-        conn.execute(sql.update(self._tables.flowdetails)
-                     .where(self._tables.flowdetails.c.uuid == e_fd.uuid)
-                     .values(e_fd.to_dict()))
+        if fields:
+            conn.execute(sql.update(self._tables.flowdetails)
+                         .where(self._tables.flowdetails.c.uuid == e_fd.uuid)
+                         .values(e_fd.to_dict(fields=fields)))
+        pairs = []
         for ad in fd:
             e_ad = e_fd.find(ad.uuid)
             if e_ad is None:
                 e_fd.add(ad)
                 self._insert_atom_details(conn, ad, fd.uuid)
+            elif e_ad.deferred:
+                # Merging into a deferred existing atom detail would select
+                # what was deferred (and what would result from that merge
+                # is the same as the incoming atom detail), so just use the
+                # incoming atom detail instead...
+                e_fd.add(ad)
+                pairs.append((ad, ad))
             else:
-                self._update_atom_details(conn, ad, e_ad)
+                pairs.append((ad, e_ad))
+        self._update_atom_details_many(conn, pairs)
 
     def update_flow_details(self, flow_detail):
         try:
@@ -481,7 +588,8 @@ class Connection(base.Connection):
                     raise exc.NotFound("No flow details found with"
                                        " uuid '%s'" % flow_detail.uuid)
                 e_fd = self._converter.convert_flow_detail(row)
-                self._converter.populate_flow_detail(conn, e_fd)
+                self._converter.populate_flow_detail(conn, e_fd,
+                                                     loader=self._loader)
                 self._update_flow_details(conn, flow_detail, e_fd)
             return e_fd
         except sa_exc.SQLAlchemyError:
@@ -511,7 +619,8 @@ class Connection(base.Connection):
                 row = conn.execute(q).first()
                 if row:
                     e_lb = self._converter.convert_book(row)
-                    self._converter.populate_book(conn, e_lb)
+                    self._converter.populate_book(conn, e_lb,
+                                                  loader=self._loader)
                     e_lb.merge(book)
                     conn.execute(sql.update(logbooks)
                                  .where(logbooks.c.uuid == e_lb.uuid)
@@ -546,7 +655,8 @@ class Connection(base.Connection):
                                        " uuid '%s'" % book_uuid)
                 book = self._converter.convert_book(row)
                 if not lazy:
-                    self._converter.populate_book(conn, book)
+                    self._converter.populate_book(conn, book,
+                                                  loader=self._loader)
                 return book
         except sa_exc.DBAPIError:
             exc.raise_with_cause(exc.StorageFailure,
@@ -560,7 +670,8 @@ class Connection(base.Connection):
                 for row in conn.execute(q):
                     book = self._converter.convert_book(row)
                     if not lazy:
-                        self._converter.populate_book(conn, book)
+                        self._converter.populate_book(conn, book,
+                                                      loader=self._loader)
                     gathered.append(book)
         except sa_exc.DBAPIError:
             exc.raise_with_cause(exc.StorageFailure,
@@ -574,7 +685,8 @@ class Connection(base.Connection):
             with contextlib.closing(self._engine.connect()) as conn:
                 for fd in self._converter.flow_query_iter(conn, book_uuid):
                     if not lazy:
-                        self._converter.populate_flow_detail(conn, fd)
+                        self._converter.populate_flow_detail(
+                            conn, fd, loader=self._loader)
                     gathered.append(fd)
         except sa_exc.DBAPIError:
             exc.raise_with_cause(exc.StorageFailure,
@@ -595,7 +707,8 @@ class Connection(base.Connection):
                                        " '%s'" % fd_uuid)
                 fd = self._converter.convert_flow_detail(row)
                 if not lazy:
-                    self._converter.populate_flow_detail(conn, fd)
+                    self._converter.populate_flow_detail(conn, fd,
+                                                         loader=self._loader)
                 return fd
         except sa_exc.SQLAlchemyError:
             exc.raise_with_cause(exc.StorageFailure,
@@ -80,6 +80,19 @@ class Connection(object):
         of it.
         """
 
+    def update_atom_details_many(self, atom_details):
+        """Updates many atom details and returns the updated versions.
+
+        The updated versions are returned in the same order as the given
+        atom details (the same restrictions as :py:meth:`.update_atom_details`
+        apply to each atom detail given).
+
+        This default implementation updates each atom detail
+        one at a time, backends that can do better (for example by updating
+        all of them in a single transaction) should override it.
+        """
+        return [self.update_atom_details(ad) for ad in atom_details]
+
     @abc.abstractmethod
     def update_flow_details(self, flow_detail):
         """Updates a given flow details and returns the updated version.
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import cachetools
+
+from taskflow.persistence import base
+from taskflow.persistence import models
+
+
+def _make_cache(max_size, ttl):
+    if ttl is None:
+        return cachetools.LRUCache(maxsize=max_size)
+    else:
+        return cachetools.TTLCache(maxsize=max_size, ttl=ttl)
+
+
+def _load_atom(data):
+    atom_cls = models.atom_detail_class(data['type'])
+    return atom_cls.from_dict(data['atom'])
+
+
+class CachingBackend(base.Backend):
+    """A backend that caches what another (wrapped) backend reads.
+
+    Logbooks, flow details and atom details that are read from the wrapped
+    backend are retained (in their serialized form, so that each reader
+    gets its own objects) in bounded least-recently-used caches; later reads
+    of the same uuids will then avoid going to the wrapped backend. Writes
+    made through this backend are passed to the wrapped backend and
+    invalidate whatever cached entries they affect.
+
+    NOTE: writes made by **other** users of the wrapped backend
+    (for example by other processes) can **not** be detected, so a ``ttl``
+    (in seconds) should be provided when that is expected (this will cause
+    cached entries to be refetched once they are older than that ttl).
+
+    Example configuration::
+
+        conf = {
+            "max_size": 1024,
+            "ttl": 30,
+        }
+    """
+
+    #: Default maximum number of entries each cache retains.
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, backend, conf=None):
+        super(CachingBackend, self).__init__(conf)
+        self._backend = backend
+        max_size = int(self._conf.get('max_size', self.DEFAULT_MAX_SIZE))
+        if max_size <= 0:
+            raise ValueError("Maximum cache size must be greater than"
+                             " zero (not %s)" % max_size)
+        ttl = self._conf.get('ttl')
+        if ttl is not None:
+            ttl = float(ttl)
+        self._books = _make_cache(max_size, ttl)
+        self._flows = _make_cache(max_size, ttl)
+        self._atoms = _make_cache(max_size, ttl)
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """The backend being cached."""
+        return self._backend
+
+    def get_connection(self):
+        return CachingConnection(self, self._backend.get_connection())
+
+    def clear(self):
+        """Forgets everything that has been cached."""
+        with self._lock:
+            self._books.clear()
+            self._flows.clear()
+            self._atoms.clear()
+
+    def close(self):
+        self.clear()
+        self._backend.close()
+
+    # Various helper methods used by the connections (not for public
+    # consumption)...
+
+    def _fetch(self, cache, uuid):
+        with self._lock:
+            return cache.get(uuid)
+
+    def _retain_atom(self, ad):
+        with self._lock:
+            self._atoms[ad.uuid] = base._format_atom(ad)
+
+    def _retain_flow(self, fd, with_atoms):
+        if with_atoms and any(ad.deferred for ad in fd):
+            # Caching these would require loading what was deferred (which
+            # would defeat the point of deferring it)...
+            with_atoms = False
+        with self._lock:
+            if with_atoms:
+                atom_uuids = tuple(ad.uuid for ad in fd)
+                for ad in fd:
+                    self._atoms[ad.uuid] = base._format_atom(ad)
+            else:
+                # Keep whatever is known about the contained atoms (if
+                # anything is known about them)...
+                try:
+                    _data, atom_uuids = self._flows[fd.uuid]
+                except KeyError:
+                    atom_uuids = None
+            self._flows[fd.uuid] = (fd.to_dict(), atom_uuids)
+
+    def _retain_book(self, book, with_flows):
+        if with_flows:
+            for fd in book:
+                self._retain_flow(fd, True)
+        with self._lock:
+            if with_flows:
+                flow_uuids = tuple(fd.uuid for fd in book)
+            else:
+                try:
+                    _data, flow_uuids = self._books[book.uuid]
+                except KeyError:
+                    flow_uuids = None
+            self._books[book.uuid] = (book.to_dict(marshal_time=True),
+                                      flow_uuids)
+
+    def _load_atoms(self, atom_uuids):
+        # Only returns something if **all** of the atoms are still cached...
+        if atom_uuids is None:
+            return None
+        ads = []
+        with self._lock:
+            for atom_uuid in atom_uuids:
+                try:
+                    ads.append(self._atoms[atom_uuid])
+                except KeyError:
+                    return None
+        return [_load_atom(data) for data in ads]
+
+    def _load_flow(self, fd_uuid, lazy=False):
+        cached = self._fetch(self._flows, fd_uuid)
+        if cached is None:
+            return None
+        fd_data, atom_uuids = cached
+        fd = models.FlowDetail.from_dict(fd_data)
+        if not lazy:
+            ads = self._load_atoms(atom_uuids)
+            if ads is None:
+                return None
+            for ad in ads:
+                fd.add(ad)
+        return fd
+
+    def _load_flows(self, flow_uuids):
+        # Only returns something if **all** of the flows are still cached...
+        if flow_uuids is None:
+            return None
+        fds = []
+        for fd_uuid in flow_uuids:
+            fd = self._load_flow(fd_uuid)
+            if fd is None:
+                return None
+            fds.append(fd)
+        return fds
+
+    def _load_book(self, book_uuid, lazy=False):
+        cached = self._fetch(self._books, book_uuid)
+        if cached is None:
+            return None
+        book_data, flow_uuids = cached
+        book = models.LogBook.from_dict(book_data, unmarshal_time=True)
+        if not lazy:
+            fds = self._load_flows(flow_uuids)
+            if fds is None:
+                return None
+            for fd in fds:
+                book.add(fd)
+        return book
+
+    def _forget_atoms(self, atom_uuids):
+        with self._lock:
+            for atom_uuid in atom_uuids:
+                self._atoms.pop(atom_uuid, None)
+
+    def _forget_flow(self, fd):
+        with self._lock:
+            self._flows.pop(fd.uuid, None)
+            for ad in fd:
+                self._atoms.pop(ad.uuid, None)
+
+    def _forget_book(self, book):
+        with self._lock:
+            self._books.pop(book.uuid, None)
+        for fd in book:
+            self._forget_flow(fd)
+
+
+class CachingConnection(base.Connection):
+    """A connection that caches what another (wrapped) connection reads."""
+
+    def __init__(self, backend, connection):
+        self._backend = backend
+        self._connection = connection
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def close(self):
+        self._connection.close()
+
+    def upgrade(self):
+        self._connection.upgrade()
+
+    def validate(self):
+        self._connection.validate()
+
+    def clear_all(self):
+        try:
+            self._connection.clear_all()
+        finally:
+            self._backend.clear()
+
+    def update_atom_details(self, atom_detail):
+        try:
+            return self._connection.update_atom_details(atom_detail)
+        finally:
+            self._backend._forget_atoms([atom_detail.uuid])
+
+    def update_atom_details_many(self, atom_details):
+        atom_details = list(atom_details)
+        try:
+            return self._connection.update_atom_details_many(atom_details)
+        finally:
+            self._backend._forget_atoms([ad.uuid for ad in atom_details])
+
+    def update_flow_details(self, flow_detail):
+        try:
+            return self._connection.update_flow_details(flow_detail)
+        finally:
+            self._backend._forget_flow(flow_detail)
+
+    def save_logbook(self, book):
+        try:
+            return self._connection.save_logbook(book)
+        finally:
+            self._backend._forget_book(book)
+
+    def destroy_logbook(self, book_uuid):
+        try:
+            return self._connection.destroy_logbook(book_uuid)
+        finally:
+            # What the destroyed logbook contained may not be known (or may
+            # have been evicted), so just forget everything...
+            self._backend.clear()
+
+    def get_logbook(self, book_uuid, lazy=False):
+        book = self._backend._load_book(book_uuid, lazy=lazy)
+        if book is None:
+            book = self._connection.get_logbook(book_uuid, lazy=lazy)
+            self._backend._retain_book(book, not lazy)
+        return book
+
+    def get_logbooks(self, lazy=False):
+        # The set of logbooks that exist is not cached (it can not be known
+        # if it has changed or not), but what is read is...
+        for book in self._connection.get_logbooks(lazy=lazy):
+            self._backend._retain_book(book, not lazy)
+            yield book
+
+    def get_flows_for_book(self, book_uuid):
+        cached = self._backend._fetch(self._backend._books, book_uuid)
+        if cached is None:
+            fds = None
+        else:
+            _book_data, flow_uuids = cached
+            fds = self._backend._load_flows(flow_uuids)
+        if fds is None:
+            fds = []
+            for fd in self._connection.get_flows_for_book(book_uuid):
+                self._backend._retain_flow(fd, True)
+                fds.append(fd)
+        return iter(fds)
+
+    def get_flow_details(self, fd_uuid, lazy=False):
+        fd = self._backend._load_flow(fd_uuid, lazy=lazy)
+        if fd is None:
+            fd = self._connection.get_flow_details(fd_uuid, lazy=lazy)
+            self._backend._retain_flow(fd, not lazy)
+        return fd
+
+    def get_atom_details(self, ad_uuid):
+        cached = self._backend._fetch(self._backend._atoms, ad_uuid)
+        if cached is not None:
+            return _load_atom(cached)
+        ad = self._connection.get_atom_details(ad_uuid)
+        self._backend._retain_atom(ad)
+        return ad
+
+    def get_atoms_for_flow(self, fd_uuid):
+        fd = self._backend._load_flow(fd_uuid)
+        if fd is None:
+            ads = []
+            for ad in self._connection.get_atoms_for_flow(fd_uuid):
+                self._backend._retain_atom(ad)
+                ads.append(ad)
+        else:
+            ads = list(fd)
+        return iter(ads)
+
+
+def maybe_cache(backend, conf):
+    """Wraps the backend with a caching backend (if configured to).
+
+    If the configuration has a non-empty ``cache_size`` key then the given
+    backend will be wrapped with a :py:class:`.CachingBackend` (of that
+    size, and using the configurations ``cache_ttl`` key as the ttl),
+    otherwise the given backend is returned as is.
+    """
+    if not conf:
+        return backend
+    max_size = conf.get('cache_size')
+    if not max_size or isinstance(backend, CachingBackend):
+        return backend
+    cache_conf = {
+        'max_size': max_size,
+    }
+    if conf.get('cache_ttl') is not None:
+        cache_conf['ttl'] = conf['cache_ttl']
+    return CachingBackend(backend, cache_conf)
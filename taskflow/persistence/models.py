@@ -99,6 +99,62 @@ def _fix_meta(data):
     return meta
 
 
+class _DirtyTrackingMixin(object):
+    """Tracks which (public) attributes have been assigned new values.
+
+    Attributes listed in ``_TRACKED_FIELDS`` are marked as dirty when they
+    are assigned a value that is not the exact same object as their current
+    value; in-place alterations (for example to a dictionary that is one of
+    those attributes) can **not** be detected and must be followed by a
+    call to :py:meth:`.mark_dirty` (or the attribute should instead be
+    assigned a new value).
+    """
+
+    #: Attributes that when assigned (new values) become dirty.
+    _TRACKED_FIELDS = frozenset()
+
+    def __setattr__(self, name, value):
+        if name in self._TRACKED_FIELDS:
+            try:
+                changed = self.__dict__[name] is not value
+            except KeyError:
+                changed = True
+            if changed:
+                self._dirty.add(name)
+        super(_DirtyTrackingMixin, self).__setattr__(name, value)
+
+    def __copy__(self):
+        cls = type(self)
+        clone = cls.__new__(cls)
+        clone.__dict__.update(self.__dict__)
+        # The clone should **not** share the same set, otherwise marking one
+        # as dirty (or clean) would also affect the other...
+        clone.__dict__['_dirty'] = set(self._dirty)
+        return clone
+
+    @property
+    def dirty_fields(self):
+        """Fields that (may) have changed since last marked as clean.
+
+        Objects start out with **all** fields dirty (so that they will be
+        fully saved by backends) and they only become clean when explicitly
+        marked as clean (for example by a user that knows the current values
+        match the ones that were saved).
+        """
+        return frozenset(self._dirty)
+
+    def mark_dirty(self, *fields):
+        """Marks the given fields (or all fields if none given) as dirty."""
+        if not fields:
+            self._dirty.update(self._TRACKED_FIELDS)
+        else:
+            self._dirty.update(fields)
+
+    def mark_clean(self):
+        """Marks all fields as clean (unchanged since last saved)."""
+        self._dirty.clear()
+
+
 class LogBook(object):
     """A collection of flow details and associated metadata.
 
@@ -289,7 +345,7 @@ class LogBook(object):
         return clone
 
 
-class FlowDetail(object):
+class FlowDetail(_DirtyTrackingMixin):
     """A collection of atom details and associated metadata.
 
     Typically this class contains a collection of atom detail entries that
@@ -304,7 +360,11 @@ class FlowDetail(object):
     :ivar state: The state of the flow associated with this flow detail.
     :ivar meta: A dictionary of meta-data associated with this flow detail.
     """
+
+    _TRACKED_FIELDS = frozenset(['state', 'meta'])
+
     def __init__(self, name, uuid):
+        self._dirty = set()
         self._uuid = uuid
         self._name = name
         self._atomdetails_by_id = {}
@@ -400,22 +460,28 @@ class FlowDetail(object):
             clone._atomdetails_by_id = self._atomdetails_by_id.copy()
         if self.meta:
             clone.meta = self.meta.copy()
+        clone._dirty = set(self._dirty)
         return clone
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """Translates the internal state of this object to a ``dict``.
 
         NOTE(harlowja): The returned ``dict`` does **not** include any
         contained atom details.
 
+        :param fields: when provided **only** these fields (typically the
+                       objects current :py:attr:`.dirty_fields`) will
+                       be translated
         :returns: this flow detail in ``dict`` form
         """
-        return {
-            'name': self.name,
-            'meta': self.meta,
-            'state': self.state,
-            'uuid': self.uuid,
-        }
+        if fields is None:
+            return {
+                'name': self.name,
+                'meta': self.meta,
+                'state': self.state,
+                'uuid': self.uuid,
+            }
+        return dict((field, getattr(self, field)) for field in fields)
 
     @classmethod
     def from_dict(cls, data):
@@ -470,7 +536,7 @@ class FlowDetail(object):
 
 
 @six.add_metaclass(abc.ABCMeta)
-class AtomDetail(object):
+class AtomDetail(_DirtyTrackingMixin):
     """A collection of atom specific runtime information and metadata.
 
     This is a base **abstract** class that contains attributes that are used
@@ -512,7 +578,17 @@ class AtomDetail(object):
                           failure this will be set to none).
     """
 
+    _TRACKED_FIELDS = frozenset(['state', 'intention', 'results', 'failure',
+                                 'revert_results', 'revert_failure',
+                                 'meta', 'version'])
+
+    #: Attributes whose loading can be deferred (see :py:meth:`.defer`).
+    _DEFERRABLE_FIELDS = frozenset(['results', 'failure',
+                                    'revert_results', 'revert_failure'])
+
     def __init__(self, name, uuid):
+        self._dirty = set()
+        self._loader = None
         self._uuid = uuid
         self._name = name
         self.state = None
@@ -524,6 +600,54 @@ class AtomDetail(object):
         self.meta = {}
         self.version = None
 
+    def __getattr__(self, name):
+        # This is only called when the normal attribute
+        # lookup fails, which for the deferrable fields means that they have
+        # been deferred and have not been loaded yet...
+        if name in self._DEFERRABLE_FIELDS:
+            loader = self.__dict__.get('_loader')
+            if loader is not None:
+                self._load_deferred(loader)
+                return self.__dict__[name]
+        raise AttributeError("'%s' object has no attribute '%s'"
+                             % (type(self).__name__, name))
+
+    def _load_deferred(self, loader):
+        loaded = loader()
+        for field in self._DEFERRABLE_FIELDS:
+            # Anything assigned since deferring is newer than what was
+            # loaded, so leave it be (and avoid marking what is loaded as
+            # dirty, since it is what was already saved).
+            if field not in self.__dict__:
+                self.__dict__[field] = getattr(loaded, field)
+        # Everything is now loaded, so the loader (and whatever it may be
+        # retaining) is no longer needed...
+        self.__dict__['_loader'] = None
+
+    def _is_deferred(self, field):
+        return (field not in self.__dict__ and
+                self.__dict__.get('_loader') is not None)
+
+    def defer(self, loader):
+        """Defers loading the results and failures until first accessed.
+
+        The ``results``, ``failure``, ``revert_results`` and
+        ``revert_failure`` attributes (which can be very large) are discarded
+        and will instead be loaded when any of them is first accessed by
+        calling the provided ``loader`` (a callable that takes no arguments
+        and returns an atom detail that has those attributes, typically
+        a fresh copy of this atom detail fetched from a backend).
+        """
+        for field in self._DEFERRABLE_FIELDS:
+            self.__dict__.pop(field, None)
+        self._loader = loader
+
+    @property
+    def deferred(self):
+        """If any of this atom details attributes have yet to be loaded."""
+        return any(self._is_deferred(field)
+                   for field in self._DEFERRABLE_FIELDS)
+
     @property
     def last_results(self):
         """Gets the atoms last result.
@@ -552,11 +676,13 @@ class AtomDetail(object):
         self.state = ad.state
         self.intention = ad.intention
         self.meta = ad.meta
-        self.failure = ad.failure
-        self.results = ad.results
-        self.revert_results = ad.revert_results
-        self.revert_failure = ad.revert_failure
         self.version = ad.version
+        for field in self._DEFERRABLE_FIELDS:
+            # Avoid loading what neither object has loaded (and therefore
+            # neither object could have altered)...
+            if ad._is_deferred(field) and self._is_deferred(field):
+                continue
+            setattr(self, field, getattr(ad, field))
         return self
 
     @abc.abstractmethod
@@ -614,31 +740,32 @@ class AtomDetail(object):
     def put(self, state, result):
         """Puts a result (acquired in the given state) into this detail."""
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """Translates the internal state of this object to a ``dict``.
 
+        :param fields: when provided **only** these fields (typically the
+                       objects current :py:attr:`.dirty_fields`) will
+                       be translated (this avoids translating potentially
+                       large fields, like ``results``, that have not changed)
         :returns: this atom detail in ``dict`` form
         """
-        if self.failure:
-            failure = self.failure.to_dict()
-        else:
-            failure = None
-        if self.revert_failure:
-            revert_failure = self.revert_failure.to_dict()
+        if fields is None:
+            data = {
+                'name': self.name,
+                'uuid': self.uuid,
+            }
+            fields = self._TRACKED_FIELDS
         else:
-            revert_failure = None
-        return {
-            'failure': failure,
-            'revert_failure': revert_failure,
-            'meta': self.meta,
-            'name': self.name,
-            'results': self.results,
-            'revert_results': self.revert_results,
-            'state': self.state,
-            'version': self.version,
-            'intention': self.intention,
-            'uuid': self.uuid,
-        }
+            data = {}
+        for field in fields:
+            value = getattr(self, field)
+            if field in ('failure', 'revert_failure'):
+                if value:
+                    value = value.to_dict()
+                else:
+                    value = None
+            data[field] = value
+        return data
 
     @classmethod
     def from_dict(cls, data):
@@ -822,6 +949,7 @@ class TaskDetail(AtomDetail):
             clone.meta = self.meta.copy()
         if self.version:
             clone.version = copy.copy(self.version)
+        clone._dirty = set(self._dirty)
         return clone
 
 
@@ -892,6 +1020,7 @@ class RetryDetail(AtomDetail):
             clone.meta = self.meta.copy()
         if self.version:
             clone.version = copy.copy(self.version)
+        clone._dirty = set(self._dirty)
         return clone
 
     @property
@@ -950,8 +1079,10 @@ class RetryDetail(AtomDetail):
                 self.revert_failure = None
                 self.revert_results = None
             # Track what we produced, so that we can examine it (or avoid
-            # using it again).
-            self.results.append((result, {}))
+            # using it again); a new list is assigned (instead of appending
+            # to the existing one) so that any shallow copies that share the
+            # existing list are left unaltered.
+            self.results = self.results + [(result, {})]
             was_altered = True
         elif state == states.REVERTED:
             # We don't really have the ability to determine equality of
@@ -985,7 +1116,7 @@ class RetryDetail(AtomDetail):
         obj.results = decode_results(obj.results)
         return obj
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """Translates the internal state of this object to a ``dict``."""
 
         def encode_results(results):
@@ -999,8 +1130,9 @@ class RetryDetail(AtomDetail):
                 new_results.append((data, new_failures))
             return new_results
 
-        base = super(RetryDetail, self).to_dict()
-        base['results'] = encode_results(base.get('results'))
+        base = super(RetryDetail, self).to_dict(fields=fields)
+        if 'results' in base:
+            base['results'] = encode_results(base['results'])
         return base
 
     def merge(self, other, deep_copy=False):
@@ -15,6 +15,9 @@
 #    under the License.
 
 import abc
+import functools
+
+from oslo_utils import strutils
 import six
 
 from taskflow import exceptions as exc
@@ -32,6 +35,15 @@ class PathBasedBackend(base.Backend):
     for flow details and one for atom details). They create those associated
     directories and then create files inside those directories that represent
     the contents of those objects for later reading and writing.
+
+    When the ``defer_results`` configuration key is truthy the atom details
+    of flow details that are read will **not** retain their results and
+    failures; those will instead be read again (from the atom details
+    stored contents) when first accessed (see
+    :py:meth:`~taskflow.persistence.models.AtomDetail.defer`). Such atom
+    details start out marked as clean (unchanged since last saved), so any
+    in-place alterations made to them **must** be followed by marking them
+    as dirty, otherwise those alterations will not be saved.
     """
 
     #: Default path used when none is provided.
@@ -42,11 +54,18 @@ class PathBasedBackend(base.Backend):
         self._path = self._conf.get('path', None)
         if not self._path:
             self._path = self.DEFAULT_PATH
+        self._defer_results = strutils.bool_from_string(
+            self._conf.get('defer_results', False))
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def defer_results(self):
+        """If loading of flow detail atom results is deferred."""
+        return self._defer_results
+
 
 @six.add_metaclass(abc.ABCMeta)
 class PathBasedConnection(base.Connection):
@@ -140,16 +159,49 @@ class PathBasedConnection(base.Connection):
             raise exc.StorageFailure("Invalid storage class %s" % type(obj))
         return self._join_path(path, obj.uuid)
 
+    @staticmethod
+    def _serialize_changes(obj, item_data, fields):
+        # Patches (and returns) the prior serialized data with only the
+        # serialized fields that changed (this avoids serializing potentially
+        # large fields, like atom results, that did not change).
+        if isinstance(obj, models.FlowDetail):
+            item_data.update(obj.to_dict(fields=fields))
+        elif isinstance(obj, models.AtomDetail):
+            item_data['atom'].update(obj.to_dict(fields=fields))
+        else:
+            raise exc.StorageFailure("Invalid storage class %s" % type(obj))
+        return item_data
+
     def _update_object(self, obj, transaction, ignore_missing=False):
         path = self._get_obj_path(obj)
         try:
             item_data = self._get_item(path)
-            existing_obj = self._deserialize(type(obj), item_data)
-            obj = existing_obj.merge(obj)
         except exc.NotFound:
             if not ignore_missing:
                 raise
-        self._set_item(path, self._serialize(obj), transaction)
+            item_data = self._serialize(obj)
+        else:
+            if isinstance(obj, models.LogBook):
+                fields = None
+            else:
+                fields = obj.dirty_fields
+            if fields is None:
+                existing_obj = self._deserialize(type(obj), item_data)
+                obj = existing_obj.merge(obj)
+                item_data = self._serialize(obj)
+            elif fields:
+                # Merging would load anything that was
+                # deferred (and what would result from that merge is the
+                # same as the object being written anyway), so avoid it when
+                # the object has deferred attributes...
+                if not (isinstance(obj, models.AtomDetail) and obj.deferred):
+                    existing_obj = self._deserialize(type(obj), item_data)
+                    obj = existing_obj.merge(obj)
+                item_data = self._serialize_changes(obj, item_data, fields)
+            else:
+                # Nothing changed, so nothing needs to be written...
+                return obj
+        self._set_item(path, item_data, transaction)
         return obj
 
     def get_logbooks(self, lazy=False):
@@ -188,6 +240,10 @@ class PathBasedConnection(base.Connection):
         flow_details = self._deserialize(models.FlowDetail, flow_data)
         if not lazy:
             for atom_details in self.get_atoms_for_flow(flow_uuid):
+                if self.backend.defer_results:
+                    atom_details.defer(functools.partial(
+                        self.get_atom_details, atom_details.uuid))
+                    atom_details.mark_clean()
                 flow_details.add(atom_details)
         return flow_details
 
@@ -223,6 +279,12 @@ class PathBasedConnection(base.Connection):
             return self._update_object(atom_detail, transaction,
                                        ignore_missing=ignore_missing)
 
+    def update_atom_details_many(self, atom_details, ignore_missing=False):
+        with self._transaction() as transaction:
+            return [self._update_object(atom_detail, transaction,
+                                        ignore_missing=ignore_missing)
+                    for atom_detail in atom_details]
+
     def _do_destroy_logbook(self, book_uuid, transaction):
         book_path = self._join_path(self.book_path, book_uuid)
         for flow_uuid in self._get_children(book_path):
@@ -14,11 +14,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import contextlib
+import copy
 import functools
+import itertools
+import operator
+import threading
 
 import fasteners
 from oslo_utils import reflection
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import six
 
@@ -84,6 +90,34 @@ META_INJECTED = 'injected'
 META_PROGRESS = 'progress'
 META_PROGRESS_DETAILS = 'progress_details'
 
+# Atom detail metadata key used to save what a (streaming reduce) task has
+# reduced so far.
+META_REDUCTION = 'reduction'
+
+#: Atom detail changes are written to the backend as soon as they happen.
+FLUSH_IMMEDIATELY = 'immediately'
+
+#: Atom detail changes are retained (and not written to the backend) until
+#: an atom state (or intention) change happens (at which point all retained
+#: changes are written).
+FLUSH_ON_STATE_CHANGE = 'on_state_change'
+
+#: Atom detail changes are retained until the engine using the storage unit
+#: finishes a analyze/schedule cycle (at which point all retained changes are
+#: written).
+FLUSH_PER_CYCLE = 'per_cycle'
+
+#: Atom detail changes are retained until a given interval has elapsed since
+#: the last write (at which point all retained changes are written).
+FLUSH_PER_INTERVAL = 'per_interval'
+
+#: Policies that control when atom detail changes are written to the backend.
+FLUSH_POLICIES = (FLUSH_IMMEDIATELY, FLUSH_ON_STATE_CHANGE,
+                  FLUSH_PER_CYCLE, FLUSH_PER_INTERVAL)
+
+# Default interval (in seconds) used with the per interval flush policy.
+_DEFAULT_FLUSH_INTERVAL = 0.1
+
 
 class _ProviderLocator(object):
     """Helper to start to better decouple the finding logic from storage.
@@ -147,15 +181,9 @@ class _ProviderLocator(object):
                 return (searched_providers, providers_and_results)
         if not atom_providers:
             return (searched_providers, providers_and_results)
-        atom_providers_by_name = dict((p.name, p) for p in atom_providers)
-        for accessible_atom_names in iter(scope_walker):
-            # *Always* retain the scope ordering (if any matches
-            # happen); instead of retaining the possible provider match
-            # order (which isn't that important and may be different from
-            # the scope requested ordering).
-            maybe_atom_providers = [atom_providers_by_name[atom_name]
-                                    for atom_name in accessible_atom_names
-                                    if atom_name in atom_providers_by_name]
+        scoped_providers_it = _iter_scoped_providers(atom_providers,
+                                                     scope_walker)
+        for maybe_atom_providers in scoped_providers_it:
             tmp_providers_and_results = []
             if find_potentials:
                 for p in maybe_atom_providers:
@@ -206,6 +234,36 @@ class _ProviderLocator(object):
                           find_potentials=False)
 
 
+def _iter_scoped_providers(atom_providers, scope_walker):
+    """Yields the given providers grouped by the scopes they are visible in.
+
+    *Always* retains the scope ordering (if any matches happen); instead of
+    retaining the possible provider match order (which isn't that important
+    and may be different from the scope requested ordering).
+    """
+    try:
+        locate = scope_walker.locate
+    except AttributeError:
+        # Not precompiled, so we have to go through each scope (and each
+        # name in each scope) to find the providers...
+        atom_providers_by_name = dict((p.name, p) for p in atom_providers)
+        for accessible_atom_names in iter(scope_walker):
+            yield [atom_providers_by_name[atom_name]
+                   for atom_name in accessible_atom_names
+                   if atom_name in atom_providers_by_name]
+    else:
+        # Precompiled, so just find where each provider is (if anywhere)...
+        located = []
+        for p in atom_providers:
+            location = locate(p.name)
+            if location is not None:
+                located.append((location, p))
+        located.sort(key=operator.itemgetter(0))
+        for _level, level_located in itertools.groupby(
+                located, key=lambda item: item[0][0]):
+            yield [p for (_location, p) in level_located]
+
+
 class _Provider(object):
     """A named symbol provider that produces a output at the given index."""
 
@@ -280,6 +338,16 @@ class Storage(object):
     NOTE(harlowja): if no backend is provided then a in-memory backend will
     be automatically used and the provided flow detail object will be placed
     into it for the duration of this objects existence.
+
+    By default every atom detail change is written to the backend as soon as
+    it happens; a different ``flush_policy`` (one of
+    :py:data:`.FLUSH_POLICIES`) can be provided to instead retain those
+    changes (in this storage unit) and write them to the backend later (all
+    at once, via
+    :py:meth:`~taskflow.persistence.base.Connection.update_atom_details_many`).
+    This reduces the number of backend round-trips at the cost of durability
+    (retained changes are **not** visible to other users of the backend
+    and will be lost if this process dies before they are written).
     """
 
     injector_name = '_TaskFlow_INJECTOR'
@@ -290,7 +358,22 @@ class Storage(object):
     with it must be avoided) that are *global* to the flow being executed.
     """
 
-    def __init__(self, flow_detail, backend=None, scope_fetcher=None):
+    def __init__(self, flow_detail, backend=None, scope_fetcher=None,
+                 flush_policy=FLUSH_IMMEDIATELY, flush_interval=None):
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError("Unknown flush policy '%s' (expected one of"
+                             " %s)" % (flush_policy, list(FLUSH_POLICIES)))
+        if flush_interval is None:
+            flush_interval = _DEFAULT_FLUSH_INTERVAL
+        if flush_interval < 0:
+            raise ValueError("Flush interval must be greater than or equal"
+                             " to zero (not %s)" % flush_interval)
+        self._flush_policy = flush_policy
+        self._flush_watch = timeutils.StopWatch(duration=flush_interval)
+        self._flush_watch.start()
+        # Atom details (by uuid) with changes not yet written to the backend
+        # (this is always empty when changes are immediately written).
+        self._unflushed = collections.OrderedDict()
         self._result_mappings = {}
         self._reverse_mapping = {}
         if backend is None:
@@ -315,14 +398,17 @@ class Storage(object):
 
         # NOTE(imelnikov): failure serialization looses information,
         # so we cache failures here, in atom name -> failure mapping.
+        #
+        # The failures of the atom details we were given are
+        # only placed into this cache when all failures are first requested,
+        # since accessing them may require loading them (which is avoided
+        # until needed, if the backend deferred loading them).
         self._failures = {}
+        self._unprimed_failures = set()
+        self._prime_lock = threading.Lock()
         for ad in self._flowdetail:
-            fail_cache = {}
-            if ad.failure is not None:
-                fail_cache[states.EXECUTE] = ad.failure
-            if ad.revert_failure is not None:
-                fail_cache[states.REVERT] = ad.revert_failure
-            self._failures[ad.name] = fail_cache
+            self._failures[ad.name] = {}
+            self._unprimed_failures.add(ad.name)
 
         self._atom_name_to_uuid = dict((ad.name, ad.uuid)
                                        for ad in self._flowdetail)
@@ -449,11 +535,63 @@ class Storage(object):
         # This never changes (so no read locking needed).
         return self._backend
 
+    @property
+    def flush_policy(self):
+        """Policy that controls when atom detail changes get written."""
+        # This never changes (so no read locking needed).
+        return self._flush_policy
+
+    @property
+    def unflushed(self):
+        """How many atom details have changes not yet written."""
+        return len(self._unflushed)
+
+    @staticmethod
+    def _write_atom_details(conn, atom_details):
+        updated_atom_details = conn.update_atom_details_many(atom_details)
+        for ad, updated_ad in six.moves.zip(atom_details,
+                                            updated_atom_details):
+            ad.update(updated_ad)
+            ad.mark_clean()
+
+    def _flush(self):
+        if self._unflushed:
+            self._with_connection(self._write_atom_details,
+                                  list(six.itervalues(self._unflushed)))
+            self._unflushed.clear()
+        self._flush_watch.restart()
+
+    @fasteners.write_locked
+    def flush(self):
+        """Writes all retained atom detail changes to the backend."""
+        self._flush()
+
+    @fasteners.write_locked
+    def checkpoint(self):
+        """Informs storage that a engine analyze/schedule cycle finished.
+
+        Depending on the flush policy this may write all retained atom detail
+        changes to the backend.
+        """
+        if self._flush_policy == FLUSH_PER_CYCLE:
+            self._flush()
+        elif (self._flush_policy == FLUSH_PER_INTERVAL and
+                self._flush_watch.expired()):
+            self._flush()
+
     def _save_flow_detail(self, conn, original_flow_detail, flow_detail):
+        # Write out any retained atom details first, so that the flow
+        # detail written never gets ahead of the atom details it contains.
+        self._flush()
         # NOTE(harlowja): we need to update our contained flow detail if
         # the result of the update actually added more (aka another process
         # added item to the flow detail).
         original_flow_detail.update(conn.update_flow_details(flow_detail))
+        # Everything was just written, so future writes only need to write
+        # what changes after this point...
+        original_flow_detail.mark_clean()
+        for ad in original_flow_detail:
+            ad.mark_clean()
         return original_flow_detail
 
     def _fetch_flowdetail(self, clone=False):
@@ -478,17 +616,41 @@ class Storage(object):
                                 % (atom_name,
                                    reflection.get_class_name(expected_type)))
             if clone:
-                return (ad, ad.copy())
+                # This is a *shallow* (copy-on-write) clone,
+                # none of its values are copied (so large results are never
+                # copied); callers must assign new values to it (and must
+                # **never** alter its existing values in-place) so that the
+                # original atom detail is left untouched until the clone is
+                # successfully saved.
+                return (ad, copy.copy(ad))
             else:
                 return (ad, ad)
 
-    def _save_atom_detail(self, conn, original_atom_detail, atom_detail):
+    def _write_atom_detail(self, conn, original_atom_detail, atom_detail):
         # NOTE(harlowja): we need to update our contained atom detail if
         # the result of the update actually added more (aka another process
         # is also modifying the task detail), since python is by reference
         # and the contained atom detail will reflect the old state if we don't
         # do this update.
         original_atom_detail.update(conn.update_atom_details(atom_detail))
+        original_atom_detail.mark_clean()
+        return original_atom_detail
+
+    def _save_atom_detail(self, original_atom_detail, atom_detail):
+        if self._flush_policy == FLUSH_IMMEDIATELY:
+            return self._with_connection(self._write_atom_detail,
+                                         original_atom_detail, atom_detail)
+        state_changed = (
+            original_atom_detail.state != atom_detail.state or
+            original_atom_detail.intention != atom_detail.intention)
+        original_atom_detail.update(atom_detail)
+        self._unflushed[original_atom_detail.uuid] = original_atom_detail
+        if self._flush_policy == FLUSH_ON_STATE_CHANGE:
+            if state_changed:
+                self._flush()
+        elif self._flush_policy == FLUSH_PER_INTERVAL:
+            if self._flush_watch.expired():
+                self._flush()
         return original_atom_detail
 
     @fasteners.read_locked
@@ -503,7 +665,7 @@ class Storage(object):
         source, clone = self._atomdetail_by_name(atom_name, clone=True)
         if source.state != state:
             clone.state = state
-            self._with_connection(self._save_atom_detail, source, clone)
+            self._save_atom_detail(source, clone)
 
     @fasteners.read_locked
     def get_atom_state(self, atom_name):
@@ -517,7 +679,7 @@ class Storage(object):
         source, clone = self._atomdetail_by_name(atom_name, clone=True)
         if source.intention != intention:
             clone.intention = intention
-            self._with_connection(self._save_atom_detail, source, clone)
+            self._save_atom_detail(source, clone)
 
     @fasteners.read_locked
     def get_atom_intention(self, atom_name):
@@ -541,8 +703,13 @@ class Storage(object):
                                                  expected_type=expected_type,
                                                  clone=True)
         if update_with:
-            clone.meta.update(update_with)
-            self._with_connection(self._save_atom_detail, source, clone)
+            # Assign a new dictionary (instead of altering
+            # the existing one in-place) so that the meta-data is known to
+            # have changed (and so that it will be written).
+            meta = clone.meta.copy()
+            meta.update(update_with)
+            clone.meta = meta
+            self._save_atom_detail(source, clone)
 
     def update_atom_metadata(self, atom_name, update_with):
         """Updates a atoms associated metadata.
@@ -607,6 +774,39 @@ class Storage(object):
         except KeyError:
             return None
 
+    def save_reduction(self, task_name, reduction):
+        """Save what a (streaming reduce) task has reduced so far.
+
+        :param task_name: task name
+        :param reduction: what the task has reduced so far (see
+                          :py:meth:`~taskflow.task.StreamingReduceTask.reduce`)
+        """
+        self._update_atom_metadata(task_name, {META_REDUCTION: reduction},
+                                   expected_type=models.TaskDetail)
+
+    @fasteners.read_locked
+    def get_reduction(self, task_name):
+        """Get what a (streaming reduce) task has reduced so far.
+
+        :param task_name: task name
+        :returns: None if nothing has been reduced, else the reduction
+        """
+        source, _clone = self._atomdetail_by_name(
+            task_name, expected_type=models.TaskDetail)
+        return source.meta.get(META_REDUCTION)
+
+    @fasteners.write_locked
+    def cleanup_reduction(self, task_name):
+        """Forget what a (streaming reduce) task has reduced so far."""
+        source, clone = self._atomdetail_by_name(
+            task_name, expected_type=models.TaskDetail, clone=True)
+        if source.meta.get(META_REDUCTION) is None:
+            return
+        meta = clone.meta.copy()
+        meta.pop(META_REDUCTION)
+        clone.meta = meta
+        self._save_atom_detail(source, clone)
+
     def _check_all_results_provided(self, atom_name, container):
         """Warn if an atom did not provide some of its expected results.
 
@@ -630,7 +830,7 @@ class Storage(object):
         """Put result for atom with provided name to storage."""
         source, clone = self._atomdetail_by_name(atom_name, clone=True)
         if clone.put(state, result):
-            self._with_connection(self._save_atom_detail, source, clone)
+            self._save_atom_detail(source, clone)
         # We need to somehow place more of this responsibility on the atom
         # detail class itself, vs doing it here; since it ties those two
         # together (which is bad)...
@@ -658,8 +858,12 @@ class Storage(object):
                                         " be inserted")
         else:
             if failed_atom_name not in failures:
+                failures = failures.copy()
                 failures[failed_atom_name] = failure
-                self._with_connection(self._save_atom_detail, source, clone)
+                results = list(clone.results)
+                results[-1] = (results[-1][0], failures)
+                clone.results = results
+                self._save_atom_detail(source, clone)
 
     @fasteners.write_locked
     def cleanup_retry_history(self, retry_name, state):
@@ -668,7 +872,7 @@ class Storage(object):
             retry_name, expected_type=models.RetryDetail, clone=True)
         clone.state = state
         clone.results = []
-        self._with_connection(self._save_atom_detail, source, clone)
+        self._save_atom_detail(source, clone)
 
     @fasteners.read_locked
     def _get(self, atom_name,
@@ -717,8 +921,25 @@ class Storage(object):
         else:
             return results
 
+    def _prime_failures(self):
+        # Places the failures of the atom details we were given (that have
+        # not already been placed) into the failure cache; any failure that
+        # has already been cached is retained since it is likely a better
+        # version (one that has a traceback) of the loaded one...
+        with self._prime_lock:
+            while self._unprimed_failures:
+                atom_name = self._unprimed_failures.pop()
+                source, _clone = self._atomdetail_by_name(atom_name)
+                fail_cache = self._failures[atom_name]
+                if source.failure is not None:
+                    fail_cache.setdefault(states.EXECUTE, source.failure)
+                if source.revert_failure is not None:
+                    fail_cache.setdefault(states.REVERT,
+                                          source.revert_failure)
+
     @fasteners.read_locked
     def _get_failures(self, fail_cache_key):
+        self._prime_failures()
         failures = {}
         for atom_name, fail_cache in six.iteritems(self._failures):
             try:
@@ -760,6 +981,7 @@ class Storage(object):
     @fasteners.read_locked
     def has_failures(self):
         """Returns true if there are **any** failures in storage."""
+        self._prime_failures()
         for fail_cache in six.itervalues(self._failures):
             if fail_cache:
                 return True
@@ -774,7 +996,7 @@ class Storage(object):
         if source.state == state:
             return
         clone.reset(state)
-        self._with_connection(self._save_atom_detail, source, clone)
+        self._save_atom_detail(source, clone)
         self._failures[clone.name].clear()
 
     def inject_atom_args(self, atom_name, pairs, transient=True):
@@ -823,9 +1045,13 @@ class Storage(object):
             injected = source.meta.get(META_INJECTED)
             if not injected:
                 injected = {}
+            else:
+                injected = injected.copy()
             injected.update(pairs)
-            clone.meta[META_INJECTED] = injected
-            self._with_connection(self._save_atom_detail, source, clone)
+            meta = clone.meta.copy()
+            meta[META_INJECTED] = injected
+            clone.meta = meta
+            self._save_atom_detail(source, clone)
 
         with self._lock.write_lock():
             if transient:
@@ -884,9 +1110,10 @@ class Storage(object):
                 clone.results = dict(pairs)
                 clone.state = states.SUCCESS
             else:
-                clone.results.update(pairs)
-            result = self._with_connection(self._save_atom_detail,
-                                           source, clone)
+                results = clone.results.copy()
+                results.update(pairs)
+                clone.results = results
+            result = self._save_atom_detail(source, clone)
             return (self.injector_name, six.iterkeys(result.results))
 
         def save_transient():
@@ -1129,7 +1356,9 @@ class Storage(object):
         """Update flowdetails metadata and save it."""
         if update_with:
             source, clone = self._fetch_flowdetail(clone=True)
-            clone.meta.update(update_with)
+            meta = clone.meta.copy()
+            meta.update(update_with)
+            clone.meta = meta
             self._with_connection(self._save_flow_detail, source, clone)
 
     @fasteners.write_locked
@@ -39,6 +39,11 @@ REVERT_RESULT = 'result'
 # The cause of the flow failure/s
 REVERT_FLOW_FAILURES = 'flow_failures'
 
+# Constant passed into (streaming reduce task) execute kwargs.
+#
+# Contains what engines have reduced so far (if anything).
+EXECUTE_REDUCTION = 'reduction'
+
 # Common events
 EVENT_UPDATE_PROGRESS = 'update_progress'
 
@@ -207,6 +212,107 @@ class ReduceFunctorTask(Task):
         return compat_reduce(self._functor, l)
 
 
+class StreamingReduceTask(Task):
+    """Task that reduces values (incrementally) as they are produced.
+
+    Unlike :py:class:`.ReduceFunctorTask` (which only reduces once all the
+    values it requires are available, which means all of them must be
+    retained until then) engines fold each value this task requires into a
+    single running accumulator as soon as the atom that produced that value
+    completes. That accumulator is saved in storage (so that a resumed flow
+    continues from it) and the result saved for the atom that produced the
+    value is then released (replaced with ``None``, when everything that
+    atom provided was reduced and no other atom requires any of it). Values
+    are taken from the atoms that storage would fetch them from for this
+    task (the nearest ones that provide them). Once all of the values have
+    been produced this task is ran and provides the final accumulator.
+
+    Values are folded in the order they are produced in (which can vary from
+    run to run when they are produced in parallel) so the functor should be
+    commutative (and associative). When ``initial`` is provided it is the
+    starting accumulator (otherwise the first value folded is).
+
+    Each value should be produced by one atom that precedes this task; since
+    values that have been reduced can not be taken back out of the
+    accumulator, the accumulator is discarded when any of those atoms (or
+    this task) is reverted, so those atoms should only ever be reverted (and
+    retried) together with this task.
+    """
+
+    _NO_INITIAL = object()
+
+    def __init__(self, functor, requires, name=None, provides=None,
+                 initial=_NO_INITIAL):
+
+        if not six.callable(functor):
+            raise ValueError("Function to use for reduce must be callable")
+
+        f_args = reflection.get_callable_args(functor)
+        if len(f_args) != 2:
+            raise ValueError("%s arguments were provided. Reduce functor "
+                             "must take exactly 2 arguments." % len(f_args))
+
+        if not misc.is_iterable(requires):
+            raise TypeError("%s type was provided for requires. Requires "
+                            "must be an iterable." % type(requires))
+
+        if not requires:
+            raise ValueError("At least one value to reduce must be required")
+
+        if EXECUTE_REDUCTION in requires:
+            raise ValueError("Value to reduce can not be named '%s'"
+                             % EXECUTE_REDUCTION)
+
+        if name is None:
+            name = reflection.get_callable_name(functor)
+        super(StreamingReduceTask, self).__init__(name=name,
+                                                  provides=provides,
+                                                  requires=requires)
+
+        self._functor = functor
+        self._initial = initial
+
+    def reduce(self, reduction, values):
+        """Reduces (name, value) pairs into a prior reduction.
+
+        Values whose name was already reduced (into the prior reduction) are
+        skipped. Returns the new reduction (a prior reduction of ``None``
+        means nothing was reduced before, a reduction is only ``None``
+        when nothing was reduced and no ``initial`` value was provided).
+        """
+        if reduction:
+            accumulator = reduction['accumulator']
+            reduced = list(reduction['reduced'])
+        else:
+            accumulator = self._initial
+            reduced = []
+        seen = set(reduced)
+        for name, value in values:
+            if name in seen:
+                continue
+            if accumulator is self._NO_INITIAL:
+                accumulator = value
+            else:
+                accumulator = self._functor(accumulator, value)
+            seen.add(name)
+            reduced.append(name)
+        if accumulator is self._NO_INITIAL:
+            return None
+        return {'accumulator': accumulator, 'reduced': reduced}
+
+    def execute(self, *args, **kwargs):
+        reduction = kwargs.pop(EXECUTE_REDUCTION, None)
+        # Values that were not produced by a preceding atom (for example
+        # ones injected into storage) were not reduced by the engine, so
+        # reduce any of those now...
+        reduction = self.reduce(reduction,
+                                ((r, kwargs[r]) for r in self.requires))
+        if reduction is None:
+            raise ValueError("Nothing was reduced (and no initial value"
+                             " was provided)")
+        return reduction['accumulator']
+
+
 class MapFunctorTask(Task):
     """General purpose Task to map a function to a list.
 
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Tasks whose methods are coroutine functions; this uses syntax that is only
+# valid on python 3.5 (or newer) so it must only be imported there.
+
+import asyncio
+
+from taskflow import task
+
+
+class SleepingTask(task.Task):
+    def __init__(self, name=None, provides=None, result=None):
+        super(SleepingTask, self).__init__(name=name, provides=provides)
+        self.result = result
+        self.reverted_with = []
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        return self.result
+
+    async def revert(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        self.reverted_with.append(kwargs.get('result'))
+
+
+class FailingTask(task.Task):
+    async def execute(self):
+        await asyncio.sleep(0)
+        raise RuntimeError('Woot!')
+
+
+class CancellingTask(task.Task):
+    async def execute(self):
+        await asyncio.sleep(0)
+        raise asyncio.CancelledError()
@@ -23,17 +23,32 @@ from taskflow.engines.action_engine import compiler
 from taskflow.engines.action_engine import executor
 from taskflow.engines.action_engine import runtime
 from taskflow.patterns import linear_flow as lf
+from taskflow.patterns import unordered_flow as uf
+from taskflow import retry
 from taskflow import states as st
 from taskflow import storage
+from taskflow import task
 from taskflow import test
 from taskflow.tests import utils as test_utils
 from taskflow.types import notifier
 from taskflow.utils import persistence_utils as pu
 
 
+class _HistoryTask(task.Task):
+    def __init__(self, name, history):
+        super(_HistoryTask, self).__init__(name=name)
+        self._history = history
+
+    def execute(self):
+        self._history.append((self.name, 'execute'))
+
+    def revert(self, *args, **kwargs):
+        self._history.append((self.name, 'revert'))
+
+
 class BuildersTest(test.TestCase):
 
-    def _make_runtime(self, flow, initial_state=None):
+    def _make_runtime(self, flow, initial_state=None, options=None):
         compilation = compiler.PatternCompiler(flow).compile()
         flow_detail = pu.create_flow_detail(flow)
         store = storage.Storage(flow_detail)
@@ -50,12 +65,13 @@ class BuildersTest(test.TestCase):
         self.addCleanup(task_executor.stop)
         r = runtime.Runtime(compilation, store,
                             atom_notifier, task_executor,
-                            retry_executor)
+                            retry_executor, options=options)
         r.compile()
         return r
 
-    def _make_machine(self, flow, initial_state=None):
-        runtime = self._make_runtime(flow, initial_state=initial_state)
+    def _make_machine(self, flow, initial_state=None, options=None):
+        runtime = self._make_runtime(flow, initial_state=initial_state,
+                                     options=options)
         machine, memory = runtime.builder.build({})
         machine_runner = runners.FiniteRunner(machine)
         return (runtime, machine, memory, machine_runner)
@@ -309,3 +325,107 @@ class BuildersTest(test.TestCase):
         self.assertEqual(0, len(memory.next_up))
         self.assertEqual(0, len(memory.not_done))
         self.assertEqual(0, len(memory.failures))
+
+    def test_selector_tracks_readiness(self):
+        flow = lf.Flow("root")
+        a, b, c = test_utils.make_many(
+            3, task_cls=test_utils.TaskNoRequiresNoReturns)
+        flow.add(uf.Flow("wide").add(a, b), c)
+
+        runtime = self._make_runtime(flow, initial_state=st.RUNNING)
+        selector = runtime.selector
+
+        next_atoms = set(atom for (atom, _decider)
+                         in selector.iter_next_atoms())
+        self.assertEqual(set([a, b]), next_atoms)
+
+        runtime.storage.save(a.name, None, st.SUCCESS)
+        selector.refresh([a])
+        self.assertEqual([], list(selector.iter_next_atoms(atom=a)))
+
+        runtime.storage.save(b.name, None, st.SUCCESS)
+        selector.refresh([b])
+        next_atoms = [atom for (atom, _decider)
+                      in selector.iter_next_atoms(atom=b)]
+        self.assertEqual([c], next_atoms)
+
+        # Resetting an atom should block its successors again.
+        runtime.reset_atoms([a])
+        self.assertEqual([], list(selector.iter_next_atoms(atom=b)))
+        next_atoms = set(atom for (atom, _decider)
+                         in selector.iter_next_atoms())
+        self.assertEqual(set([a]), next_atoms)
+
+    def test_resource_limits_defer(self):
+        flow = uf.Flow("wide")
+        tasks = test_utils.make_many(
+            3, task_cls=test_utils.TaskNoRequiresNoReturns)
+        for t in tasks:
+            t.resources = ('db',)
+        flow.add(*tasks)
+
+        runtime, machine, memory, machine_runner = self._make_machine(
+            flow, initial_state=st.RUNNING,
+            options={'resource_limits': {'db': 1, 'unused': 2}})
+        transitions = list(machine_runner.run_iter(builder.START))
+        prior_state, new_state = transitions[-1]
+        self.assertEqual(st.SUCCESS, new_state)
+        scheduled = [new_state for (prior_state, new_state) in transitions
+                     if new_state == st.SCHEDULING]
+        self.assertEqual(3, len(scheduled))
+        for t in tasks:
+            self.assertEqual(st.SUCCESS,
+                             runtime.storage.get_atom_state(t.name))
+
+    def _make_limited_flow(self, history, flow_retry=None):
+        flow = uf.Flow("wide", retry=flow_retry)
+        flow.add(test_utils.TaskWithFailure('fail'))
+        for name in ('a', 'b'):
+            t = _HistoryTask(name, history)
+            t.resources = ('db',)
+            flow.add(t)
+        return flow
+
+    def test_resource_limits_deferred_reverted(self):
+        history = []
+        flow = self._make_limited_flow(history)
+        runtime, machine, memory, machine_runner = self._make_machine(
+            flow, initial_state=st.RUNNING,
+            options={'resource_limits': {'db': 1}})
+        transitions = list(machine_runner.run_iter(builder.START))
+        prior_state, new_state = transitions[-1]
+        self.assertEqual(st.REVERTED, new_state)
+        # Only one of the limited tasks got to run (before the other task
+        # failed and everything was set to revert), the deferred one should
+        # not have been scheduled (to revert) since it never ran...
+        self.assertEqual(2, len(history))
+        ran_name = history[0][0]
+        self.assertEqual([(ran_name, 'execute'), (ran_name, 'revert')],
+                         history)
+        deferred_name = 'b' if ran_name == 'a' else 'a'
+        self.assertEqual(st.PENDING,
+                         runtime.storage.get_atom_state(deferred_name))
+
+    def test_resource_limits_deferred_retried(self):
+        history = []
+        flow = self._make_limited_flow(history,
+                                       flow_retry=retry.Times(2))
+        runtime, machine, memory, machine_runner = self._make_machine(
+            flow, initial_state=st.RUNNING,
+            options={'resource_limits': {'db': 1}})
+        transitions = list(machine_runner.run_iter(builder.START))
+        prior_state, new_state = transitions[-1]
+        self.assertEqual(st.REVERTED, new_state)
+        # Each attempt only one limited task ran (and was reverted), those
+        # that were deferred were never ran (or reverted).
+        self.assertEqual(4, len(history))
+        for name in ('a', 'b'):
+            self.assertEqual(history.count((name, 'execute')),
+                             history.count((name, 'revert')))
+
+    def test_bad_resource_limits(self):
+        flow = lf.Flow("root")
+        flow.add(*test_utils.make_many(
+            1, task_cls=test_utils.TaskNoRequiresNoReturns))
+        self.assertRaises(ValueError, self._make_machine, flow,
+                          options={'resource_limits': {'db': 0}})
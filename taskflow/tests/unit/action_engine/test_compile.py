@@ -625,3 +625,79 @@ class PatternCompileTest(test.TestCase):
         self.assertIs(c1, g.node['b']['retry'])
         self.assertIs(c1, g.node['c']['retry'])
         self.assertIsNone(g.node['c1'].get('retry'))
+
+
+class CompilationCacheTest(test.TestCase):
+    @staticmethod
+    def _make_flow():
+        a, b, c, d = test_utils.make_many(4)
+        c1 = retry.AlwaysRevert('c1')
+        inner_flo = lf.Flow("sub-test", c1)
+        inner_flo.add(c, d)
+        flo = gf.Flow("test")
+        flo.add(a, b, inner_flo)
+        flo.link(a, inner_flo)
+        return flo, c1
+
+    def test_same_flow_reused(self):
+        cache = compiler.CompilationCache()
+        flo, _c1 = self._make_flow()
+        compilation = cache.compile(flo)
+        self.assertIs(compilation, cache.compile(flo))
+        self.assertEqual(1, len(cache))
+
+    def test_equivalent_flow_rebound(self):
+        cache = compiler.CompilationCache()
+        flo, c1 = self._make_flow()
+        compilation = cache.compile(flo)
+        flo2, c1_2 = self._make_flow()
+        compilation2 = cache.compile(flo2)
+        self.assertEqual(1, len(cache))
+        self.assertIsNot(compilation, compilation2)
+
+        expected = compiler.PatternCompiler(flo2).compile()
+        g = compilation2.execution_graph
+        self.assertTrue(g.frozen)
+        self.assertTrue(compilation2.hierarchy.frozen)
+        self.assertIs(flo2, compilation2.hierarchy.item)
+        self.assertEqual(
+            set(n for n in expected.execution_graph.nodes()
+                if not isinstance(n, compiler.Terminator)),
+            set(n for n in g.nodes()
+                if not isinstance(n, compiler.Terminator)))
+        self.assertItemsEqual(
+            _replicate_graph_with_names(expected).edges(data=True),
+            _replicate_graph_with_names(compilation2).edges(data=True))
+        for node in g.nodes_iter():
+            if node.name in ('c', 'd'):
+                self.assertIs(c1_2, g.node[node]['retry'])
+                self.assertIsNotNone(compilation2.hierarchy.find(node))
+                self.assertIsNone(compilation.hierarchy.find(node))
+
+    def test_different_flow_not_reused(self):
+        cache = compiler.CompilationCache()
+        flo, _c1 = self._make_flow()
+        cache.compile(flo)
+        flo2, _c1 = self._make_flow()
+        flo2.add(test_utils.DummyTask(name='e'))
+        compilation = cache.compile(flo2)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(['e'], [n.name for n in compilation.execution_graph
+                                 if n.name == 'e'])
+
+    def test_bounded(self):
+        cache = compiler.CompilationCache(max_size=1)
+        for name in ['a', 'b', 'c']:
+            cache.compile(test_utils.DummyTask(name=name))
+        self.assertEqual(1, len(cache))
+
+    def test_engine_uses_cache(self):
+        cache = compiler.CompilationCache()
+        flo, _c1 = self._make_flow()
+        engine = engines.load(flo, compilation_cache=cache)
+        engine.compile()
+        flo2, _c1 = self._make_flow()
+        engine2 = engines.load(flo2, compilation_cache=cache)
+        engine2.compile()
+        self.assertEqual(1, len(cache))
+        self.assertIs(flo2, engine2.compilation.hierarchy.item)
@@ -17,6 +17,7 @@
 import futurist
 import testtools
 
+from taskflow.engines.action_engine import asyncio_executor as ae
 from taskflow.engines.action_engine import engine
 from taskflow.engines.action_engine import executor
 from taskflow.engines.action_engine import process_executor
@@ -75,6 +76,32 @@ class ParallelCreationTest(test.TestCase):
             self.assertIsInstance(eng._task_executor,
                                   executor.ParallelThreadTaskExecutor)
 
+    @testtools.skipIf(not ae.ASYNCIO_AVAILABLE, 'asyncio is not available')
+    def test_asyncio_string_creation(self):
+        eng = self._create_engine(executor='asyncio')
+        self.assertIsInstance(eng._task_executor, ae.AsyncioTaskExecutor)
+
+    @testtools.skipIf(not ae.ASYNCIO_AVAILABLE, 'asyncio is not available')
+    def test_asyncio_loop_creation(self):
+        loop = ae.asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        eng = self._create_engine(executor=loop)
+        self.assertIsInstance(eng._task_executor, ae.AsyncioTaskExecutor)
+
+    def test_priority_string_creation(self):
+        for s in ['priority', 'prioritized']:
+            eng = self._create_engine(executor=s)
+            self.assertIsInstance(
+                eng._task_executor,
+                executor.ParallelPriorityThreadTaskExecutor)
+
+    def test_priority_executor_creation(self):
+        e = executor.PriorityThreadPoolExecutor(1)
+        self.addCleanup(e.shutdown)
+        eng = self._create_engine(executor=e)
+        self.assertIsInstance(eng._task_executor,
+                              executor.ParallelThreadTaskExecutor)
+
     def test_invalid_creation(self):
         self.assertRaises(ValueError, self._create_engine, executor='crap')
         self.assertRaises(TypeError, self._create_engine, executor=2)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from oslo_utils import timeutils
+
+from taskflow.engines.action_engine import executor
+from taskflow import test
+
+
+class _Owner(object):
+    pass
+
+
+class PriorityThreadPoolExecutorTest(test.TestCase):
+    def _make_executor(self, max_workers=1):
+        e = executor.PriorityThreadPoolExecutor(max_workers=max_workers)
+        self.addCleanup(e.shutdown)
+        return e
+
+    def test_submit(self):
+        e = self._make_executor()
+        self.assertEqual(2, e.submit(lambda v: v + 1, 1).result())
+        self.assertRaises(ValueError,
+                          e.submit(int, 'not-a-number').result)
+        e.shutdown()
+        self.assertFalse(e.alive)
+        self.assertRaises(RuntimeError, e.submit, int, 1)
+
+    def test_priority_and_fairness(self):
+        e = self._make_executor()
+        ran = []
+        blocker = threading.Event()
+        e.submit(blocker.wait)
+
+        a, b, c = _Owner(), _Owner(), _Owner()
+        futs = [
+            e.submit_prioritized(0, a, ran.append, 'a-1'),
+            e.submit_prioritized(0, a, ran.append, 'a-2'),
+            e.submit_prioritized(0, a, ran.append, 'a-3'),
+            e.submit_prioritized(10, b, ran.append, 'b-1'),
+            e.submit_prioritized(0, c, ran.append, 'c-1'),
+        ]
+        blocker.set()
+        for fut in futs:
+            fut.result()
+        self.assertEqual(['b-1', 'a-1', 'c-1', 'a-2', 'a-3'], ran)
+
+    def test_bounded_submitter(self):
+        e = self._make_executor(max_workers=2)
+        s = executor.BoundedSubmitter(1)
+        ran = []
+        blocker = threading.Event()
+        fut = s.submit(e.submit, blocker.wait)
+        fut_2 = s.submit(e.submit, ran.append, 'waited')
+        self.assertEqual(1, s.running)
+        self.assertEqual(1, s.waiting)
+        self.assertEqual([], ran)
+        blocker.set()
+        fut.result()
+        fut_2.result()
+        self.assertEqual(['waited'], ran)
+        self.assertEqual(2, s.submitted)
+        self.assertEqual(0, s.waiting)
+        self.assertRaises(ValueError, executor.BoundedSubmitter, 0)
+
+    def test_cancelled_not_ran(self):
+        e = self._make_executor()
+        ran = []
+        blocker = threading.Event()
+        e.submit(blocker.wait)
+        fut = e.submit(ran.append, 'cancelled')
+        self.assertTrue(fut.cancel())
+        e.submit(ran.append, 'ran')
+        blocker.set()
+        e.shutdown()
+        self.assertEqual(['ran'], ran)
+
+    def test_burst_into_warm_pool(self):
+        e = self._make_executor(max_workers=4)
+        self.assertEqual(2, e.submit(lambda v: v + 1, 1).result())
+        started = []
+        blocker = threading.Event()
+
+        def wait():
+            started.append(True)
+            blocker.wait()
+
+        futs = [e.submit(wait) for _i in range(0, 4)]
+        watch = timeutils.StopWatch(duration=5).start()
+        while len(started) < 4 and not watch.expired():
+            time.sleep(0.01)
+        # They all run at the same time (instead of one after the other on
+        # the worker that was idle when they were submitted).
+        self.assertEqual(4, len(started))
+        self.assertEqual(4, e.statistics['workers'])
+        blocker.set()
+        for fut in futs:
+            fut.result()
+
+    def test_autoscaling(self):
+        e = executor.PriorityThreadPoolExecutor(max_workers=3, min_workers=1,
+                                                idle_timeout=0.01)
+        self.addCleanup(e.shutdown)
+        for _attempt in range(0, 2):
+            # Each time (including once it has shrunk back down to its idle
+            # minimum) the pool grows back to its maximum...
+            blocker = threading.Event()
+            futs = [e.submit(blocker.wait) for _i in range(0, 4)]
+            self.assertEqual(3, e.statistics['workers'])
+            blocker.set()
+            for fut in futs:
+                fut.result()
+            watch = timeutils.StopWatch(duration=5).start()
+            while e.statistics['workers'] > 1 and not watch.expired():
+                time.sleep(0.01)
+            self.assertEqual(1, e.statistics['workers'])
+        self.assertEqual(2, e.submit(lambda v: v + 1, 1).result())
+
+    def test_bad_bounds(self):
+        self.assertRaises(ValueError, executor.PriorityThreadPoolExecutor,
+                          max_workers=1, min_workers=2)
+        self.assertRaises(ValueError, executor.PriorityThreadPoolExecutor,
+                          max_workers=1, min_workers=-1)
+        self.assertRaises(ValueError, executor.PriorityThreadPoolExecutor,
+                          max_workers=1, idle_timeout=0)
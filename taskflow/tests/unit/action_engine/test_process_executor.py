@@ -16,6 +16,8 @@
 
 import asyncore
 import errno
+import os
+import pickle
 import socket
 import threading
 
@@ -46,6 +48,35 @@ class ProcessExecutorHelpersTest(test.TestCase):
         in_data = b"".join(pu._encode_message(b"secret", ['hi'], b'me'))
         self.assertRaises(pu.BadHmacValueError, r.feed, in_data)
 
+    def test_unsigned_reader(self):
+        capture_buf = []
+
+        def do_capture(identity, message_capture_func):
+            capture_buf.append(message_capture_func(require_mac=False))
+
+        r = pu.Reader(b"secret", do_capture)
+        for i in range(0, 2):
+            in_data = b"".join(pu._encode_message(b"secret", ['hi', i],
+                                                  b'me', sign=False))
+            r.feed(in_data)
+
+        self.assertEqual([['hi', 0], ['hi', 1]], capture_buf)
+
+    def test_missing_hmac_reader(self):
+        r = pu.Reader(b"secret", lambda ident, capture_func: capture_func())
+        in_data = b"".join(pu._encode_message(b"secret", ['hi'], b'me',
+                                              sign=False))
+        self.assertRaises(pu.BadHmacValueError, r.feed, in_data)
+
+    def test_channel_shared_per_process(self):
+        c = pu.Channel(2222, b"me", b"secret", sign_messages=False)
+        c_2 = pickle.loads(pickle.dumps(c))
+        self.addCleanup(pu._CHANNELS.clear)
+        self.assertIsNot(c, c_2)
+        self.assertIs(c_2, pickle.loads(pickle.dumps(c)))
+        self.assertFalse(c_2.sign_messages)
+        self.assertEqual(c.batch_delay, c_2.batch_delay)
+
     @mock.patch("socket.socket")
     def test_no_connect_channel(self, mock_socket_factory):
         mock_sock = mock.MagicMock()
@@ -91,9 +122,128 @@ class ProcessExecutorHelpersTest(test.TestCase):
         for details in send_what:
             e_s(task.EVENT_UPDATE_PROGRESS, details)
 
+        # Messages are not acknowledged (but barriers are), so this waits
+        # for everything sent to have been dispatched...
+        c.flush()
+
         # This forces the thread to shutdown (since the asyncore loop
         # will exit when no more sockets exist to process...)
         d.close()
 
         self.assertEqual(len(send_what), len(details_capture))
         self.assertEqual(send_what, details_capture)
+
+    def test_send_unsigned_and_dispatch_many(self):
+        details_capture = []
+
+        def capture(name):
+            return (lambda _event_type, details:
+                    details_capture.append((name, details)))
+
+        t = test_utils.DummyTask("rcver")
+        t.notifier.register(task.EVENT_UPDATE_PROGRESS, capture('t'))
+        t_2 = test_utils.DummyTask("rcver-2")
+        t_2.notifier.register(task.EVENT_UPDATE_PROGRESS, capture('t_2'))
+
+        d = pu.Dispatcher({}, b'secret', b'server-josh',
+                          sign_messages=False)
+        d.setup()
+        d.targets[b't'] = t
+        d.targets[b't_2'] = t_2
+
+        s = threading.Thread(target=asyncore.loop, kwargs={'map': d.map})
+        s.start()
+        self.addCleanup(s.join)
+
+        c = pu.Channel(d.port, b'child-josh', b'secret',
+                       sign_messages=False)
+        self.addCleanup(c.close)
+
+        pu.EventSender(c, identity=b't')(task.EVENT_UPDATE_PROGRESS,
+                                         {'progress': 0.1})
+        pu.EventSender(c, identity=b'unknown')(task.EVENT_UPDATE_PROGRESS,
+                                               {'progress': 0.2})
+        pu.EventSender(c, identity=b't_2')(task.EVENT_UPDATE_PROGRESS,
+                                           {'progress': 0.3})
+        c.flush()
+        d.close()
+
+        self.assertEqual([('t', {'progress': 0.1}),
+                          ('t_2', {'progress': 0.3})], details_capture)
+
+    def test_preloaded_task(self):
+        t = test_utils.DummyTask("t")
+        key = pu._preload_key(t)
+        pu._PRELOADED[b'pool'] = {key: t}
+        self.addCleanup(pu._PRELOADED.pop, b'pool', None)
+        ref = pu.PreloadedTask(b'pool', key)
+        self.assertIs(t, pickle.loads(pickle.dumps(ref)))
+        self.assertEqual(1, pu._count_preloaded(b'pool'))
+        self.assertEqual(0, pu._count_preloaded(b'other-pool'))
+
+    def test_preload(self):
+        t = test_utils.DummyTask("t")
+        e = pu.ParallelProcessTaskExecutor(preload_tasks=True)
+        e.preload([t])
+        self.assertEqual([pu._preload_key(t)], list(e._preloadable))
+        self.assertIsNot(t, e._preloadable[pu._preload_key(t)])
+        e = pu.ParallelProcessTaskExecutor()
+        e.preload([t])
+        self.assertEqual({}, e._preloadable)
+
+    def test_run_bound(self):
+        details_capture = []
+        t = test_utils.ProgressingTask("t")
+
+        def func(task, arguments):
+            task.update_progress(0.5)
+            return 'done'
+
+        result = pu._run_bound(
+            func, (task.EVENT_UPDATE_PROGRESS,),
+            lambda _event_type, details: details_capture.append(details),
+            t, {})
+        self.assertEqual('done', result)
+        self.assertEqual([{'progress': 0.5}], details_capture)
+        self.assertEqual(0, len(t.notifier))
+
+    def test_shared_buffer(self):
+        data = b'a' * 1024
+        self.assertIsNone(pu.SharedBuffer.maybe_create(data, 2048))
+        self.assertIsNone(pu.SharedBuffer.maybe_create(['a'], 1))
+        shared = pu.SharedBuffer.maybe_create(data, 1024)
+        self.addCleanup(shared.destroy)
+        self.assertTrue(os.path.exists(shared.path))
+        self.assertEqual(data, shared.open())
+        shared.destroy()
+        self.assertFalse(os.path.exists(shared.path))
+
+    def test_shared_buffer_keeps_kind(self):
+        data = bytearray(b'abc' * 1024)
+        shared = pu.SharedBuffer.maybe_create(data, 1)
+        self.addCleanup(shared.destroy)
+        opened = shared.open()
+        self.assertIsInstance(opened, bytearray)
+        self.assertEqual(data, opened)
+        if hasattr(memoryview, 'cast'):
+            shared = pu.SharedBuffer.maybe_create(memoryview(data), 1)
+            self.addCleanup(shared.destroy)
+            opened = shared.open()
+            self.assertIsInstance(opened, memoryview)
+            self.assertEqual(bytes(data), opened.tobytes())
+
+    def test_run_shared(self):
+        shared = pu.SharedBuffer.maybe_create(b'a' * 10, 1)
+        self.addCleanup(shared.destroy)
+
+        def func(task, arguments):
+            return ('executed', arguments['data'] + b'b')
+
+        outcome, result = pu._run_shared(func, 1, None,
+                                         test_utils.DummyTask("t"),
+                                         {'data': shared, 'other': 1})
+        self.assertEqual('executed', outcome)
+        self.assertIsInstance(result, pu.SharedBuffer)
+        self.assertEqual(b'a' * 10 + b'b',
+                         pu._open_shared(result, destroy=True))
+        self.assertFalse(os.path.exists(result.path))
@@ -295,3 +295,43 @@ class MixedPatternScopingTest(test.TestCase):
 
         # This order is guaranteed...
         self.assertEqual(['customer2', 'customer'], _get_scopes(c, washer)[0])
+
+
+class ScopeTableTest(test.TestCase):
+    def test_flatten_nested_linear(self):
+        r = lf.Flow("root")
+        r.add(test_utils.TaskOneReturn("root.1"),
+              test_utils.TaskOneReturn("root.2"))
+        sub_r = lf.Flow("subroot")
+        sub_r_1 = test_utils.TaskOneReturn("subroot.1")
+        sub_r_2 = test_utils.TaskOneReturn("subroot.2")
+        sub_r.add(sub_r_1, sub_r_2)
+        r.add(sub_r)
+
+        c = compiler.PatternCompiler(r).compile()
+        table = sc.ScopeWalker(c, sub_r_2, names_only=True).flatten()
+        self.assertEqual([('subroot.1',), ('root.2', 'root.1')], list(table))
+        self.assertEqual(2, len(table))
+        self.assertEqual((0, 0), table.locate('subroot.1'))
+        self.assertEqual((1, 1), table.locate('root.2'))
+        self.assertEqual((1, 2), table.locate('root.1'))
+        self.assertIsNone(table.locate('subroot.2'))
+
+    def test_flatten_matches_walker(self):
+        r = gf.Flow("root")
+        customer = test_utils.ProvidesRequiresTask("customer",
+                                                   provides=['dog'],
+                                                   requires=[])
+        washer = test_utils.ProvidesRequiresTask("washer",
+                                                 requires=['dog'],
+                                                 provides=['wash'])
+        dryer = test_utils.ProvidesRequiresTask("dryer",
+                                                requires=['dog', 'wash'],
+                                                provides=['dry_dog'])
+        r.add(customer, washer, dryer)
+
+        c = compiler.PatternCompiler(r).compile()
+        for atom in (customer, washer, dryer):
+            table = sc.ScopeWalker(c, atom).flatten()
+            self.assertEqual([tuple(names) for names in _get_scopes(c, atom)],
+                             list(table))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import taskflow.engines
+from taskflow.patterns import map_flow as mf
+from taskflow import states
+from taskflow import test
+
+
+def double(x):
+    return x * 2
+
+
+class MapFlowTest(test.TestCase):
+
+    def test_map_flow_stringy(self):
+        f = mf.Flow('test', double, 'items', provides='doubled', chunks=3)
+        self.assertEqual('map_flow.Flow: test(len=5)', str(f))
+        self.assertEqual(3, f.chunks)
+        self.assertEqual(set(['items']), set(f.requires))
+        self.assertIn('doubled', f.provides)
+
+    def test_map_flow_no_gather(self):
+        f = mf.Flow('test', double, 'items', chunks=2)
+        self.assertEqual(3, len(f))
+        self.assertEqual(set(['test-slice-0', 'test-slice-1',
+                              'test-chunk-0', 'test-chunk-1']),
+                         set(f.provides))
+
+    def test_map_flow_chunk_requires_slice(self):
+        f = mf.Flow('test', double, 'items', chunks=2)
+        requires = dict((t.name, set(t.requires)) for t in f)
+        self.assertEqual(set(['items']), requires['test-split'])
+        self.assertEqual(set(['test-slice-0']), requires['test-chunk-0'])
+        self.assertEqual(set(['test-slice-1']), requires['test-chunk-1'])
+
+    def test_map_flow_bad_args(self):
+        self.assertRaises(ValueError, mf.Flow, 'test', 2, 'items')
+        self.assertRaises(ValueError, mf.Flow, 'test', lambda x, y: x,
+                          'items')
+        self.assertRaises(TypeError, mf.Flow, 'test', double, ['items'])
+        self.assertRaises(ValueError, mf.Flow, 'test', double, 'items',
+                          chunks=0)
+
+    def test_map_flow_run(self):
+        items = list(range(0, 11))
+        for chunks in (1, 3, 20):
+            f = mf.Flow('test', double, 'items', provides='doubled',
+                        chunks=chunks)
+            result = taskflow.engines.run(f, store={'items': items})
+            self.assertEqual([double(i) for i in items], result['doubled'])
+
+    def test_map_flow_run_parallel(self):
+        items = list(range(0, 100))
+        f = mf.Flow('test', double, 'items', provides='doubled', chunks=4)
+        result = taskflow.engines.run(f, store={'items': items},
+                                      engine='parallel')
+        self.assertEqual([double(i) for i in items], result['doubled'])
+        self.assertEqual([double(i) for i in items[0:25]],
+                         result['test-chunk-0'])
+
+    def test_map_flow_resume(self):
+        mapped = []
+
+        def record(x):
+            mapped.append(x)
+            return double(x)
+
+        items = list(range(0, 12))
+        f = mf.Flow('test', record, 'items', provides='doubled', chunks=3)
+        engine = taskflow.engines.load(f, store={'items': items})
+        engine.run()
+        self.assertEqual(items, sorted(mapped))
+        # Pretend the engine stopped before the second chunk (and the
+        # gathering) finished; only that chunk should be re-ran.
+        del mapped[:]
+        engine.storage.set_atom_state('test-chunk-1', states.PENDING)
+        engine.storage.set_atom_state('test-gather', states.PENDING)
+        engine.storage.set_flow_state(states.SUSPENDED)
+        engine.run()
+        self.assertEqual(states.SUCCESS, engine.storage.get_flow_state())
+        self.assertEqual(items[4:8], sorted(mapped))
+        self.assertEqual([double(i) for i in items],
+                         engine.storage.fetch('doubled'))
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import taskflow.engines
+from taskflow.patterns import linear_flow as lf
+from taskflow.patterns import reduce_flow as rf
+from taskflow import retry
+from taskflow import states
+from taskflow import task
+from taskflow import test
+from taskflow.tests import utils
+
+
+class _ValueTask(task.Task):
+    def __init__(self, value, name, provides):
+        super(_ValueTask, self).__init__(name=name, provides=provides)
+        self._value = value
+
+    def execute(self):
+        return self._value
+
+
+class _MultiplyTask(task.Task):
+    def __init__(self, multiplier, name, provides, rebind=None):
+        super(_MultiplyTask, self).__init__(name=name, provides=provides,
+                                            rebind=rebind)
+        self._multiplier = multiplier
+
+    def execute(self, x):
+        return x * self._multiplier
+
+
+def _items(*values):
+    return [_ValueTask(value, 'item-%s' % i, 'value-%s' % i)
+            for i, value in enumerate(values)]
+
+
+class ReduceFlowTest(test.TestCase):
+
+    def test_reduce_flow_stringy(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        self.assertEqual('reduce_flow.Flow: test(len=4)', str(f))
+        self.assertEqual(set(), set(f.requires))
+        self.assertIn('total', f.provides)
+
+    def test_reduce_flow_bad_args(self):
+        self.assertRaises(ValueError, rf.Flow, 'test', 2, _items(1), 'total')
+        self.assertRaises(ValueError, rf.Flow, 'test', lambda a: a,
+                          _items(1), 'total')
+        self.assertRaises(ValueError, rf.Flow, 'test', lambda a, b: a,
+                          [], 'total')
+        self.assertRaises(ValueError, rf.Flow, 'test', lambda a, b: a,
+                          [utils.ProvidesRequiresTask('t', ['a', 'b'], [])],
+                          'total')
+        item = lf.Flow('item', retry=retry.Times(2)).add(*_items(1))
+        self.assertRaises(ValueError, rf.Flow, 'test', lambda a, b: a,
+                          [item], 'total')
+
+    def test_reduce_flow_run(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        result = taskflow.engines.run(f)
+        self.assertEqual(6, result['total'])
+        # Item results are released once they have been reduced.
+        self.assertIsNone(result['value-0'])
+
+    def test_reduce_flow_run_parallel(self):
+        f = rf.Flow('test', lambda a, b: a + [b], _items(1, 2, 3), 'total',
+                    initial=[])
+        result = taskflow.engines.run(f, engine='parallel')
+        self.assertEqual([1, 2, 3], sorted(result['total']))
+
+    def test_reduce_flow_reduces_as_produced(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        engine = taskflow.engines.load(f)
+        reductions = []
+
+        def on_running(state, details):
+            if details['task_name'] == 'test-reduce':
+                reductions.append(engine.storage.get_reduction('test-reduce'))
+
+        engine.atom_notifier.register(states.RUNNING, on_running)
+        engine.run()
+        self.assertEqual(1, len(reductions))
+        self.assertEqual(6, reductions[0]['accumulator'])
+        self.assertEqual(['value-0', 'value-1', 'value-2'],
+                         sorted(reductions[0]['reduced']))
+
+    def test_reduce_flow_resume(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        engine = taskflow.engines.load(f)
+        engine.compile()
+        engine.prepare()
+        # Pretend a prior run reduced the first item (into a accumulator
+        # that can only have come from storage) before it stopped...
+        engine.storage.save('item-0', None)
+        engine.storage.save_reduction('test-reduce', {
+            'accumulator': 100,
+            'reduced': ['value-0'],
+        })
+        engine.run()
+        self.assertEqual(105, engine.storage.fetch('total'))
+
+    def test_reduce_flow_revert_forgets(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2), 'total')
+        flow = lf.Flow('root').add(f, utils.TaskWithFailure('fail'))
+        engine = taskflow.engines.load(flow)
+        self.assertRaisesRegex(RuntimeError, '^Woot', engine.run)
+        self.assertIsNone(engine.storage.get_reduction('test-reduce'))
+
+    def test_reduce_flow_retried(self):
+        items = [_MultiplyTask(i, 'item-%s' % i, 'value-%s' % i)
+                 for i in (1, 2)]
+        f = rf.Flow('test', lambda a, b: a + b, items, 'total')
+        flow = lf.Flow('root', retry=retry.ForEach([1, 2], provides='x'))
+        flow.add(f, utils.ConditionalTask('c'))
+        # The first attempt (where x is 1) fails, and what was reduced
+        # during it should not be retained for the second attempt.
+        result = taskflow.engines.run(flow, store={'y': 2})
+        self.assertEqual(6, result['total'])
+
+    def test_reduce_flow_shared_value(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        flow = lf.Flow('root').add(
+            f, _MultiplyTask(10, 'consumer', 'copy', rebind={'x': 'value-0'}))
+        result = taskflow.engines.run(flow)
+        self.assertEqual(6, result['total'])
+        # Results that something else requires are not released.
+        self.assertEqual(10, result['copy'])
+        self.assertEqual(1, result['value-0'])
+        self.assertIsNone(result['value-1'])
+
+    def test_reduce_flow_shadowed_value(self):
+        f = rf.Flow('test', lambda a, b: a + b, _items(1, 2, 3), 'total')
+        flow = lf.Flow('root').add(_ValueTask(100, 'outer', 'value-0'), f)
+        engine = taskflow.engines.load(flow)
+        engine.run()
+        # Only the item that is nearest to the reducer is reduced.
+        self.assertEqual(6, engine.storage.fetch('total'))
+        self.assertEqual(100, engine.storage.get_execute_result('outer'))
+
+    def test_reduce_flow_single_item(self):
+        f = rf.Flow('test', lambda a, b: a - b, _items(5), 'total')
+        self.assertEqual(5, taskflow.engines.run(f)['total'])
+        f = rf.Flow('test', lambda a, b: a - b, _items(5), 'total',
+                    initial=10)
+        self.assertEqual(5, taskflow.engines.run(f)['total'])
@@ -215,6 +215,85 @@ class PersistenceTestMixin(object):
         self.assertEqual(43, td2.meta.get('test'))
         self.assertIsInstance(td2, models.TaskDetail)
 
+    def test_task_detail_update_many(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = models.LogBook(name=lb_name, uuid=lb_id)
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        tds = []
+        for i in range(0, 3):
+            td = models.TaskDetail("detail-%s" % i,
+                                   uuid=uuidutils.generate_uuid())
+            fd.add(td)
+            tds.append(td)
+
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        for i, td in enumerate(tds):
+            td.meta = {'test': i}
+            td.state = states.SUCCESS
+        with contextlib.closing(self._get_connection()) as conn:
+            updated_tds = conn.update_atom_details_many(tds)
+        self.assertEqual([td.uuid for td in tds],
+                         [td.uuid for td in updated_tds])
+
+        with contextlib.closing(self._get_connection()) as conn:
+            lb2 = conn.get_logbook(lb_id)
+        fd2 = lb2.find(fd.uuid)
+        for i, td in enumerate(tds):
+            td2 = fd2.find(td.uuid)
+            self.assertEqual(i, td2.meta.get('test'))
+            self.assertEqual(states.SUCCESS, td2.state)
+
+    def test_task_detail_only_dirty_saved(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = models.LogBook(name=lb_name, uuid=lb_id)
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = models.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        td.meta = {'test': 42}
+        fd.add(td)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        td.mark_clean()
+        self.assertEqual(frozenset(), td.dirty_fields)
+        # Alter the meta-data in-place (which can't be detected) and
+        # change the state (which can be).
+        td.meta['test'] = 43
+        td.state = states.SUCCESS
+        self.assertEqual(frozenset(['state']), td.dirty_fields)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.update_atom_details(td)
+            td2 = conn.get_atom_details(td.uuid)
+        self.assertEqual(states.SUCCESS, td2.state)
+        self.assertEqual(42, td2.meta.get('test'))
+
+        td.mark_dirty('meta')
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.update_atom_details(td)
+            td2 = conn.get_atom_details(td.uuid)
+        self.assertEqual(43, td2.meta.get('test'))
+
+    def test_task_detail_update_many_not_existing(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = models.LogBook(name=lb_name, uuid=lb_id)
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = models.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        td2 = models.TaskDetail("detail-2", uuid=uuidutils.generate_uuid())
+        with contextlib.closing(self._get_connection()) as conn:
+            self.assertRaises(exc.NotFound,
+                              conn.update_atom_details_many, [td, td2])
+
     def test_task_detail_with_failure(self):
         lb_id = uuidutils.generate_uuid()
         lb_name = 'lb-%s' % (lb_id)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+
+from oslo_utils import uuidutils
+
+from taskflow.persistence import backends
+from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import caching
+from taskflow.persistence import models
+from taskflow import states
+from taskflow import test
+from taskflow.tests.unit.persistence import base
+
+
+class CachingPersistenceTest(test.TestCase, base.PersistenceTestMixin):
+    def setUp(self):
+        super(CachingPersistenceTest, self).setUp()
+        self._wrapped = impl_memory.MemoryBackend({})
+        self._backend = caching.CachingBackend(self._wrapped,
+                                               {'max_size': 10})
+
+    def _get_connection(self):
+        return self._backend.get_connection()
+
+    def tearDown(self):
+        conn = self._get_connection()
+        conn.clear_all()
+        self._backend = None
+        self._wrapped = None
+        super(CachingPersistenceTest, self).tearDown()
+
+    def _make_book(self):
+        lb = models.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = models.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+        return lb, fd, td
+
+    def test_reads_are_cached(self):
+        lb, fd, td = self._make_book()
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_logbook(lb.uuid)
+
+        # Change what is stored behind the caches back (so that the cached
+        # copy can be told apart from the stored one).
+        td.state = states.FAILURE
+        with contextlib.closing(self._wrapped.get_connection()) as conn:
+            conn.update_atom_details(td)
+
+        with contextlib.closing(self._get_connection()) as conn:
+            lb2 = conn.get_logbook(lb.uuid)
+            td2 = conn.get_atom_details(td.uuid)
+        self.assertIsNone(lb2.find(fd.uuid).find(td.uuid).state)
+        self.assertIsNone(td2.state)
+
+    def test_cached_reads_are_copies(self):
+        lb, fd, td = self._make_book()
+        with contextlib.closing(self._get_connection()) as conn:
+            td2 = conn.get_atom_details(td.uuid)
+            td2.state = states.FAILURE
+            td3 = conn.get_atom_details(td.uuid)
+        self.assertIsNot(td2, td3)
+        self.assertIsNone(td3.state)
+
+    def test_writes_invalidate(self):
+        lb, fd, td = self._make_book()
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_logbook(lb.uuid)
+            td.state = states.SUCCESS
+            conn.update_atom_details(td)
+            fd.state = states.RUNNING
+            conn.update_flow_details(fd)
+            fd2 = conn.get_flow_details(fd.uuid)
+            td2 = conn.get_atom_details(td.uuid)
+        self.assertEqual(states.RUNNING, fd2.state)
+        self.assertEqual(states.SUCCESS, fd2.find(td.uuid).state)
+        self.assertEqual(states.SUCCESS, td2.state)
+
+    def test_bad_max_size(self):
+        self.assertRaises(ValueError, caching.CachingBackend,
+                          self._wrapped, {'max_size': 0})
+
+    def test_fetch_caching(self):
+        conf = {'connection': 'memory', 'cache_size': '10'}
+        with contextlib.closing(backends.fetch(conf)) as be:
+            self.assertIsInstance(be, caching.CachingBackend)
+            self.assertIsInstance(be.backend, impl_memory.MemoryBackend)
@@ -16,9 +16,13 @@
 
 import contextlib
 
+from oslo_utils import uuidutils
+
 from taskflow import exceptions as exc
 from taskflow.persistence import backends
 from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import models
+from taskflow import states
 from taskflow import test
 from taskflow.tests.unit.persistence import base
 
@@ -37,6 +41,29 @@ class MemoryPersistenceTest(test.TestCase, base.PersistenceTestMixin):
         self._backend = None
         super(MemoryPersistenceTest, self).tearDown()
 
+    def test_deferred_results(self):
+        backend = impl_memory.MemoryBackend({'defer_results': True})
+        lb = models.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = models.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        td.state = states.SUCCESS
+        td.results = 'a' * 1024
+        fd.add(td)
+        with contextlib.closing(backend.get_connection()) as conn:
+            conn.save_logbook(lb)
+            fd2 = conn.get_flow_details(fd.uuid)
+            td2 = fd2.find(td.uuid)
+            self.assertTrue(td2.deferred)
+            self.assertEqual(frozenset(), td2.dirty_fields)
+            fd2.state = states.RUNNING
+            conn.update_flow_details(fd2)
+            self.assertTrue(td2.deferred)
+        self.assertEqual(states.SUCCESS, td2.state)
+        self.assertEqual(td.results, td2.results)
+        self.assertFalse(td2.deferred)
+        self.assertEqual(frozenset(), td2.dirty_fields)
+
     def test_memory_backend_entry_point(self):
         conf = {'connection': 'memory:'}
         with contextlib.closing(backends.fetch(conf)) as be:
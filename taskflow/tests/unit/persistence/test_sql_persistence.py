@@ -40,10 +40,13 @@ PASSWD = "openstack_citest"
 DATABASE = "tftest_" + ''.join(random.choice('0123456789')
                                for _ in range(12))
 
+from oslo_utils import uuidutils
 import sqlalchemy as sa
 
 from taskflow.persistence import backends
 from taskflow.persistence.backends import impl_sqlalchemy
+from taskflow.persistence import models
+from taskflow import states
 from taskflow import test
 from taskflow.tests.unit.persistence import base
 
@@ -122,6 +125,34 @@ class SqlitePersistenceTest(test.TestCase, base.PersistenceTestMixin):
             os.unlink(self.db_location)
             self.db_location = None
 
+    def test_deferred_results(self):
+        lb = models.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+        fd = models.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = models.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        td.state = states.SUCCESS
+        td.results = 'a' * 1024
+        fd.add(td)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+        conf = {
+            'connection': self.db_uri,
+            'defer_results': True,
+        }
+        backend = impl_sqlalchemy.SQLAlchemyBackend(conf)
+        with contextlib.closing(backend.get_connection()) as conn:
+            fd2 = conn.get_flow_details(fd.uuid)
+            td2 = fd2.find(td.uuid)
+            self.assertTrue(td2.deferred)
+            self.assertEqual(frozenset(), td2.dirty_fields)
+            fd2.state = states.RUNNING
+            fd3 = conn.update_flow_details(fd2)
+            self.assertTrue(fd3.find(td.uuid).deferred)
+            self.assertTrue(td2.deferred)
+            self.assertEqual(states.SUCCESS, td2.state)
+            self.assertEqual(td.results, td2.results)
+            self.assertFalse(td2.deferred)
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BackendPersistenceTestMixin(base.PersistenceTestMixin):
@@ -86,7 +86,14 @@ class ManyConductorTest(testscenarios.TestWithScenarios,
                                     'conductor_kwargs': {
                                         'executor_factory': single_factory,
                                         'wait_timeout': 0.1,
-                                    }})
+                                    }}),
+        ('nonblocking_shared_tasks', {'kind': 'nonblocking',
+                                      'conductor_kwargs': {
+                                          'task_executor': 'threads',
+                                          'max_task_workers': 2,
+                                          'max_job_tasks': 1,
+                                          'wait_timeout': 0.1,
+                                      }}),
     ]
 
     def make_components(self):
@@ -433,6 +440,23 @@ class NonBlockingExecutorTest(test.TestCase):
                           persistence=persistence,
                           wait_timeout='testing')
 
+    def test_bad_task_executor(self):
+        persistence = impl_memory.MemoryBackend()
+        client = fake_client.FakeClient()
+        board = impl_zookeeper.ZookeeperJobBoard('testing', {},
+                                                 client=client,
+                                                 persistence=persistence)
+        self.assertRaises(ValueError,
+                          backends.fetch,
+                          'nonblocking', 'testing', board,
+                          persistence=persistence,
+                          task_executor='testing')
+        self.assertRaises(ValueError,
+                          backends.fetch,
+                          'nonblocking', 'testing', board,
+                          persistence=persistence,
+                          task_executor='threads', max_job_tasks=0)
+
     def test_bad_factory(self):
         persistence = impl_memory.MemoryBackend()
         client = fake_client.FakeClient()
@@ -17,6 +17,7 @@
 import collections
 import contextlib
 import functools
+import sys
 import threading
 
 import futurist
@@ -24,6 +25,7 @@ import six
 import testtools
 
 import taskflow.engines
+from taskflow.engines.action_engine import asyncio_executor as ae
 from taskflow.engines.action_engine import engine as eng
 from taskflow.engines.worker_based import engine as w_eng
 from taskflow.engines.worker_based import worker as wkr
@@ -35,6 +37,7 @@ from taskflow.persistence import models
 from taskflow import states
 from taskflow import task
 from taskflow import test
+from taskflow.test import mock
 from taskflow.tests import utils
 from taskflow.types import failure
 from taskflow.types import graph as gr
@@ -42,6 +45,11 @@ from taskflow.utils import eventlet_utils as eu
 from taskflow.utils import persistence_utils as p_utils
 from taskflow.utils import threading_utils as tu
 
+if six.PY3 and sys.version_info >= (3, 5):
+    from taskflow.tests import async_utils
+else:
+    async_utils = None
+
 
 # Expected engine transitions when empty workflows are ran...
 _EMPTY_TRANSITIONS = [
@@ -1495,6 +1503,78 @@ class ParallelEngineWithEventletTest(EngineTaskTest,
                                      store=store, **kwargs)
 
 
+@testtools.skipIf(not ae.ASYNCIO_AVAILABLE, 'asyncio is not available')
+class ParallelEngineWithAsyncioTest(EngineTaskTest,
+                                    EngineMultipleResultsTest,
+                                    EngineLinearFlowTest,
+                                    EngineParallelFlowTest,
+                                    EngineLinearAndUnorderedExceptionsTest,
+                                    EngineOptionalRequirementsTest,
+                                    EngineGraphFlowTest,
+                                    EngineResetTests,
+                                    EngineMissingDepsTest,
+                                    EngineGraphConditionalFlowTest,
+                                    EngineCheckingTaskTest,
+                                    EngineDeciderDepthTest,
+                                    EngineTaskNotificationsTest,
+                                    test.TestCase):
+    _EXECUTOR_WORKERS = 2
+
+    def _make_engine(self, flow,
+                     flow_detail=None, executor=None, store=None,
+                     **kwargs):
+        if executor is None:
+            executor = 'asyncio'
+        return taskflow.engines.load(flow, flow_detail=flow_detail,
+                                     backend=self.backend, engine='parallel',
+                                     executor=executor,
+                                     store=store,
+                                     max_workers=self._EXECUTOR_WORKERS,
+                                     **kwargs)
+
+    def test_correct_load(self):
+        engine = self._make_engine(utils.TaskNoRequiresNoReturns)
+        self.assertIsInstance(engine._task_executor,
+                              ae.AsyncioTaskExecutor)
+
+    def test_awaitable_result(self):
+
+        class SleepingTask(task.Task):
+            def execute(self):
+                return ae.asyncio.sleep(0, result=5)
+
+        engine = self._make_engine(SleepingTask(provides='x'))
+        engine.run()
+        self.assertEqual(5, engine.storage.fetch('x'))
+
+    @testtools.skipIf(async_utils is None, 'coroutine syntax not available')
+    def test_coroutine_execute(self):
+        flow = async_utils.SleepingTask(provides='x', result=5)
+        engine = self._make_engine(flow)
+        # Coroutine functions must be ran on the event loop (and not be
+        # sent to the thread pool).
+        with mock.patch.object(ae.AsyncioTaskExecutor, '_submit_task',
+                               side_effect=AssertionError):
+            engine.run()
+        self.assertEqual(5, engine.storage.fetch('x'))
+
+    @testtools.skipIf(async_utils is None, 'coroutine syntax not available')
+    def test_coroutine_execute_raises_reverts(self):
+        sleeper = async_utils.SleepingTask('a', result=1)
+        flow = lf.Flow('flow').add(sleeper, async_utils.FailingTask('b'))
+        engine = self._make_engine(flow)
+        with mock.patch.object(ae.AsyncioTaskExecutor, '_submit_task',
+                               side_effect=AssertionError):
+            self.assertFailuresRegexp(RuntimeError, '^Woot', engine.run)
+        self.assertEqual([1], sleeper.reverted_with)
+        self.assertEqual(states.REVERTED, engine.storage.get_flow_state())
+
+    @testtools.skipIf(async_utils is None, 'coroutine syntax not available')
+    def test_coroutine_cancelled(self):
+        engine = self._make_engine(async_utils.CancellingTask('a'))
+        self.assertRaises(ae.asyncio.CancelledError, engine.run)
+
+
 class ParallelEngineWithProcessTest(EngineTaskTest,
                                     EngineMultipleResultsTest,
                                     EngineLinearFlowTest,
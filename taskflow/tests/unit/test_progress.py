@@ -123,6 +123,26 @@ class TestProgress(test.TestCase):
             'foo': 'bar'
         }, end_details.get('details'))
 
+    def test_throttled_storage_progress(self):
+        saved_progress = []
+        flo = ProgressTask("test", 100)
+        e = taskflow.engines.load(flo, progress_interval=3600)
+        e.compile()
+        e.prepare()
+        set_task_progress = e.storage.set_task_progress
+
+        def capture_set_task_progress(task_name, progress, details=None):
+            saved_progress.append(progress)
+            set_task_progress(task_name, progress, details=details)
+
+        e.storage.set_task_progress = capture_set_task_progress
+        e.run()
+        # The starting progress, the first update, the last held back update
+        # (saved on completion) and the final progress should be all that is
+        # saved...
+        self.assertEqual([0.0, 0.01, 0.99, 1.0], saved_progress)
+        self.assertEqual(1.0, e.storage.get_task_progress("test"))
+
     def test_dual_storage_progress(self):
         fired_events = []
 
@@ -15,6 +15,7 @@
 #    under the License.
 
 import contextlib
+import functools
 import threading
 
 from oslo_utils import uuidutils
@@ -49,10 +50,15 @@ class StorageTestMixin(object):
         for t in threads:
             t.join()
 
-    def _get_storage(self, flow_detail=None):
+    def _get_storage(self, flow_detail=None, **kwargs):
         if flow_detail is None:
             _lb, flow_detail = p_utils.temporary_flow_detail(self.backend)
-        return storage.Storage(flow_detail=flow_detail, backend=self.backend)
+        return storage.Storage(flow_detail=flow_detail, backend=self.backend,
+                               **kwargs)
+
+    def _get_saved_atom_detail(self, s, atom_name):
+        with contextlib.closing(self.backend.get_connection()) as conn:
+            return conn.get_atom_details(s.get_atom_uuid(atom_name))
 
     def test_non_saving_storage(self):
         _lb, flow_detail = p_utils.temporary_flow_detail(self.backend)
@@ -163,6 +169,30 @@ class StorageTestMixin(object):
         self.assertTrue(a_failure.matches(s2.get('my task')))
         self.assertEqual(states.FAILURE, s2.get_atom_state('my task'))
 
+    def test_get_failure_after_deferred_reload(self):
+        a_failure = failure.Failure.from_exception(RuntimeError('Woot!'))
+        s = self._get_storage()
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        s.save('my task', a_failure, states.FAILURE)
+        with contextlib.closing(self.backend.get_connection()) as conn:
+            flow_detail = conn.get_flow_details(s.flow_uuid)
+        loaded = []
+
+        def loader(ad_uuid):
+            loaded.append(ad_uuid)
+            with contextlib.closing(self.backend.get_connection()) as conn:
+                return conn.get_atom_details(ad_uuid)
+
+        for ad in flow_detail:
+            ad.defer(functools.partial(loader, ad.uuid))
+        s2 = self._get_storage(flow_detail)
+        self.assertEqual([], loaded)
+        self.assertEqual(states.FAILURE, s2.get_atom_state('my task'))
+        self.assertEqual([], loaded)
+        self.assertTrue(s2.has_failures())
+        self.assertEqual([s.get_atom_uuid('my task')], loaded)
+        self.assertTrue(a_failure.matches(s2.get('my task')))
+
     def test_get_non_existing_var(self):
         s = self._get_storage()
         s.ensure_atom(test_utils.NoopTask('my task'))
@@ -250,6 +280,22 @@ class StorageTestMixin(object):
         self.assertEqual(0.8, s.get_task_progress('my task'))
         self.assertIsNone(s.get_task_progress_details('my task'))
 
+    def test_task_reduction(self):
+        s = self._get_storage()
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        self.assertIsNone(s.get_reduction('my task'))
+
+        reduction = {'accumulator': 3, 'reduced': ['a', 'b']}
+        s.save_reduction('my task', reduction)
+        self.assertEqual(reduction, s.get_reduction('my task'))
+        saved = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(reduction, saved.meta[storage.META_REDUCTION])
+
+        s.cleanup_reduction('my task')
+        self.assertIsNone(s.get_reduction('my task'))
+        # Nothing to cleanup is fine...
+        s.cleanup_reduction('my task')
+
     def test_fetch_result_not_ready(self):
         s = self._get_storage()
         name = 'my result'
@@ -586,6 +632,86 @@ class StorageTestMixin(object):
         s.save('my task', a_failure, state=states.REVERT_FAILURE)
         self.assertEqual(a_failure, s.get_revert_result('my task'))
 
+    def test_saved_atom_detail_is_clean(self):
+        s = self._get_storage()
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        s.save('my task', 5)
+        ad = s._flowdetail.find(s.get_atom_uuid('my task'))
+        self.assertEqual(frozenset(), ad.dirty_fields)
+        s.set_task_progress('my task', 0.5)
+        self.assertEqual(frozenset(), ad.dirty_fields)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(0.5, ad.meta[storage.META_PROGRESS])
+        self.assertEqual(5, ad.results)
+
+    def test_state_change_keeps_results(self):
+        s = self._get_storage()
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        result = {'a': [1, 2, 3]}
+        s.save('my task', result)
+        s.set_atom_state('my task', states.REVERTING)
+        s.set_task_progress('my task', 0.5)
+        self.assertIs(result, s.get('my task'))
+
+    def test_save_retry_failure_leaves_prior_untouched(self):
+        retry_name = 'my retry'
+        s = self._get_storage()
+        s.ensure_atom(test_utils.NoopRetry(retry_name))
+        s.save(retry_name, 'a')
+        ad = s._flowdetail.find(s.get_atom_uuid(retry_name))
+        prior_results = ad.results
+        a_failure = failure.Failure.from_exception(RuntimeError('Woot!'))
+        s.save_retry_failure(retry_name, 'my task', a_failure)
+        self.assertEqual([('a', {})], prior_results)
+        history = list(s.get_retry_history(retry_name))
+        self.assertEqual(1, len(history))
+        self.assertEqual('a', history[0][0])
+        self.assertEqual(['my task'], list(history[0][1]))
+
+    def test_unknown_flush_policy(self):
+        self.assertRaises(ValueError, self._get_storage,
+                          flush_policy='sometimes')
+
+    def test_flush_per_cycle(self):
+        s = self._get_storage(flush_policy=storage.FLUSH_PER_CYCLE)
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        s.set_atom_state('my task', states.RUNNING)
+        s.set_task_progress('my task', 0.5)
+        self.assertEqual(states.RUNNING, s.get_atom_state('my task'))
+        self.assertEqual(1, s.unflushed)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(states.PENDING, ad.state)
+        s.checkpoint()
+        self.assertEqual(0, s.unflushed)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(states.RUNNING, ad.state)
+        self.assertEqual(0.5, ad.meta[storage.META_PROGRESS])
+
+    def test_flush_on_state_change(self):
+        s = self._get_storage(flush_policy=storage.FLUSH_ON_STATE_CHANGE)
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        s.set_task_progress('my task', 0.5)
+        s.checkpoint()
+        self.assertEqual(1, s.unflushed)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertNotIn(storage.META_PROGRESS, ad.meta)
+        s.set_atom_state('my task', states.RUNNING)
+        self.assertEqual(0, s.unflushed)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(states.RUNNING, ad.state)
+        self.assertEqual(0.5, ad.meta[storage.META_PROGRESS])
+
+    def test_flush_before_flow_state(self):
+        s = self._get_storage(flush_policy=storage.FLUSH_PER_CYCLE)
+        s.ensure_atom(test_utils.NoopTask('my task'))
+        s.save('my task', 5)
+        self.assertEqual(1, s.unflushed)
+        s.set_flow_state(states.SUCCESS)
+        self.assertEqual(0, s.unflushed)
+        ad = self._get_saved_atom_detail(s, 'my task')
+        self.assertEqual(states.SUCCESS, ad.state)
+        self.assertEqual(5, ad.results)
+
 
 class StorageMemoryTest(StorageTestMixin, test.TestCase):
     def setUp(self):
@@ -432,6 +432,45 @@ class ReduceFunctorTaskTest(test.TestCase):
                           lambda x, y: None, requires=[1])
 
 
+class StreamingReduceTaskTest(test.TestCase):
+
+    def test_invalid_args(self):
+        self.assertRaises(ValueError, task.StreamingReduceTask, 2,
+                          requires=['a'])
+        self.assertRaises(ValueError, task.StreamingReduceTask,
+                          lambda x: None, requires=['a'])
+        self.assertRaises(TypeError, task.StreamingReduceTask,
+                          lambda x, y: None, requires=1)
+        self.assertRaises(ValueError, task.StreamingReduceTask,
+                          lambda x, y: None, requires=[])
+        self.assertRaises(ValueError, task.StreamingReduceTask,
+                          lambda x, y: None,
+                          requires=[task.EXECUTE_REDUCTION])
+
+    def test_reduce(self):
+        t = task.StreamingReduceTask(lambda x, y: x + y, requires=['a', 'b'])
+        self.assertIsNone(t.reduce(None, []))
+        reduction = t.reduce(None, [('a', 1)])
+        self.assertEqual({'accumulator': 1, 'reduced': ['a']}, reduction)
+        # Already reduced values are skipped.
+        reduction = t.reduce(reduction, [('a', 1), ('b', 2)])
+        self.assertEqual({'accumulator': 3, 'reduced': ['a', 'b']},
+                         reduction)
+
+    def test_reduce_initial(self):
+        t = task.StreamingReduceTask(lambda x, y: x - y, requires=['a'],
+                                     initial=10)
+        self.assertEqual({'accumulator': 10, 'reduced': []},
+                         t.reduce(None, []))
+        self.assertEqual(7, t.execute(a=3))
+
+    def test_execute_reduces_leftovers(self):
+        t = task.StreamingReduceTask(lambda x, y: x + y, requires=['a', 'b'])
+        reduction = {'accumulator': 5, 'reduced': ['a']}
+        self.assertEqual(7, t.execute(a=None, b=2,
+                                      **{task.EXECUTE_REDUCTION: reduction}))
+
+
 class MapFunctorTaskTest(test.TestCase):
 
     def test_invalid_functor(self):
@@ -25,6 +25,7 @@ import testscenarios
 
 from taskflow import test
 from taskflow.utils import misc
+from taskflow.utils import schema_utils
 from taskflow.utils import threading_utils
 
 
@@ -353,3 +354,43 @@ class TestSafeCopyDictRaises(testscenarios.TestWithScenarios):
 
     def test_exceptions(self):
         self.assertRaises(self.exception, misc.safe_copy_dict, self.original)
+
+
+class TestSchemaValidate(test.TestCase):
+    SCHEMA = {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+            },
+        },
+    }
+
+    def test_validate(self):
+        schema_utils.schema_validate({'items': (1, 2)}, self.SCHEMA)
+        schema_utils.schema_validate({'items': [1, 2]}, self.SCHEMA)
+        self.assertRaises(schema_utils.ValidationError,
+                          schema_utils.schema_validate,
+                          {'items': 1}, self.SCHEMA)
+
+    def test_validator_reused(self):
+        validator = schema_utils._fetch_validator(self.SCHEMA)
+        self.assertIs(validator, schema_utils._fetch_validator(self.SCHEMA))
+        self.assertIsNot(validator,
+                         schema_utils._fetch_validator(dict(self.SCHEMA)))
+
+    def test_validators_bounded(self):
+        validator = schema_utils._fetch_validator(self.SCHEMA)
+        schemas = [dict(self.SCHEMA)
+                   for _i in range(0, schema_utils._MAX_VALIDATORS)]
+        for schema in schemas:
+            schema_utils._fetch_validator(schema)
+        self.assertLessEqual(len(schema_utils._VALIDATORS),
+                             schema_utils._MAX_VALIDATORS)
+        self.assertIsNot(validator,
+                         schema_utils._fetch_validator(self.SCHEMA))
+
+    def test_bad_schema(self):
+        self.assertRaises(schema_utils.SchemaError,
+                          schema_utils.schema_validate,
+                          {}, {'type': 1})
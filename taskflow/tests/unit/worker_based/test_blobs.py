@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from taskflow.engines.worker_based import blobs
+from taskflow import exceptions as exc
+from taskflow import test
+
+
+class TestFilesystemBlobStore(test.TestCase):
+
+    def setUp(self):
+        super(TestFilesystemBlobStore, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.store = blobs.FilesystemBlobStore(self.path)
+
+    def test_put_get_delete(self):
+        key = self.store.put(b'abc')
+        self.assertEqual(b'abc', self.store.get(key))
+        self.assertEqual([key], os.listdir(self.path))
+        self.store.delete(key)
+        self.assertRaises(exc.NotFound, self.store.get, key)
+        self.assertEqual([], os.listdir(self.path))
+        # Deleting something that does not exist is fine...
+        self.store.delete(key)
+
+    def test_bad_keys(self):
+        for key in ['', '..', os.path.join('..', 'a'), '.hidden']:
+            self.assertRaises(exc.NotFound, self.store.get, key)
+
+
+class TestOffloader(test.TestCase):
+
+    def setUp(self):
+        super(TestOffloader, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.store = blobs.FilesystemBlobStore(self.path)
+
+    def test_threshold(self):
+        offloader = blobs.Offloader(self.store, threshold=64)
+        self.assertIsNone(offloader.offload('small'))
+        value = {'big': ['a' * 16] * 16}
+        key = offloader.offload(value)
+        self.assertIsNotNone(key)
+        self.assertEqual(value, offloader.fetch(key))
+        self.assertEqual(value, offloader.fetch(key, delete=True))
+        self.assertRaises(exc.NotFound, offloader.fetch, key)
+
+    def test_unencodable(self):
+        offloader = blobs.Offloader(self.store, threshold=0)
+        self.assertIsNone(offloader.offload(object()))
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_bad_threshold(self):
+        self.assertRaises(ValueError, blobs.Offloader, self.store, -1)
@@ -51,7 +51,11 @@ class TestWorkerBasedActionEngine(test.MockTestCase):
                                      transport_options=None,
                                      transition_timeout=mock.ANY,
                                      retry_options=None,
-                                     worker_expiry=mock.ANY)
+                                     worker_expiry=mock.ANY,
+                                     batch_delay=None,
+                                     serializer=None,
+                                     blob_store=None,
+                                     blob_threshold=mock.ANY)
         ]
         self.assertEqual(expected_calls, self.master_mock.mock_calls)
 
@@ -68,7 +72,10 @@ class TestWorkerBasedActionEngine(test.MockTestCase):
             transition_timeout=200,
             topics=topics,
             retry_options={},
-            worker_expiry=1)
+            worker_expiry=1,
+            batch_delay=0.1,
+            serializer='taskflow-msgpack',
+            blob_threshold=1024)
         expected_calls = [
             mock.call.executor_class(uuid=eng.storage.flow_uuid,
                                      url=broker_url,
@@ -78,7 +85,11 @@ class TestWorkerBasedActionEngine(test.MockTestCase):
                                      transport_options={},
                                      transition_timeout=200,
                                      retry_options={},
-                                     worker_expiry=1)
+                                     worker_expiry=1,
+                                     batch_delay=0.1,
+                                     serializer='taskflow-msgpack',
+                                     blob_store=None,
+                                     blob_threshold=1024)
         ]
         self.assertEqual(expected_calls, self.master_mock.mock_calls)
 
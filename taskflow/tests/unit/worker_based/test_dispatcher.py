@@ -20,6 +20,7 @@ except ImportError:
     from kombu.transport import base as message
 
 from taskflow.engines.worker_based import dispatcher
+from taskflow import exceptions as excp
 from taskflow import test
 from taskflow.test import mock
 
@@ -78,3 +79,23 @@ class TestDispatcher(test.TestCase):
         self.assertTrue(msg.ack_log_error.called)
         self.assertFalse(msg.acknowledged)
         self.assertFalse(on_hello.called)
+
+    def test_dispatch_batch(self):
+        on_hello = mock.MagicMock()
+        validator = mock.MagicMock()
+        validator.side_effect = [None, excp.InvalidFormat("bad")]
+        handlers = {'hello': dispatcher.Handler(on_hello,
+                                                validator=validator)}
+        d = dispatcher.TypeDispatcher(type_handlers=handlers)
+        msg = mock_acked_message(properties={'type': 'BATCH',
+                                             'reply_to': 'me'})
+        d.dispatch_batch({'messages': [
+            {'type': 'hello', 'correlation_id': '1', 'body': {'a': 1}},
+            {'type': 'unknown', 'body': {}},
+            {'type': 'hello', 'body': {'b': 2}},
+        ]}, msg)
+        self.assertEqual(1, on_hello.call_count)
+        body, batched_msg = on_hello.call_args[0]
+        self.assertEqual({'a': 1}, body)
+        self.assertEqual({'type': 'hello', 'reply_to': 'me',
+                          'correlation_id': '1'}, batched_msg.properties)
@@ -17,8 +17,12 @@
 import threading
 import time
 
+from oslo_serialization import msgpackutils
+
 from taskflow.engines.worker_based import executor
 from taskflow.engines.worker_based import protocol as pr
+from taskflow.engines.worker_based import proxy
+from taskflow import exceptions as exc
 from taskflow import task as task_atom
 from taskflow import test
 from taskflow.test import mock
@@ -54,6 +58,8 @@ class TestWorkerTaskExecutor(test.MockTestCase):
         self.request_inst_mock.uuid = self.task_uuid
         self.request_inst_mock.expired = False
         self.request_inst_mock.created_on = 0
+        self.request_inst_mock.deadline = self.timeout
+        self.request_inst_mock.task = self.task
         self.request_inst_mock.task_cls = self.task.name
         self.message_mock = mock.MagicMock(name='message')
         self.message_mock.properties = {'correlation_id': self.task_uuid,
@@ -143,6 +149,31 @@ class TestWorkerTaskExecutor(test.MockTestCase):
         ]
         self.assertEqual(expected_calls, self.request_inst_mock.mock_calls)
 
+    def test_on_message_response_state_success_offloaded(self):
+        store = mock.MagicMock()
+        store.get.return_value = msgpackutils.dumps(self.task_result)
+        response = pr.Response(pr.SUCCESS, result=None, blob='blob-key')
+        ex = self.executor(blob_store=store)
+        ex._ongoing_requests[self.task_uuid] = self.request_inst_mock
+        ex._process_response(response.to_dict(), self.message_mock)
+
+        expected_calls = [
+            mock.call.transition_and_log_error(pr.SUCCESS, logger=mock.ANY),
+            mock.call.set_result(result=self.task_result)
+        ]
+        self.assertEqual(expected_calls, self.request_inst_mock.mock_calls)
+        store.delete.assert_called_once_with('blob-key')
+
+    def test_on_message_response_state_success_no_blob_store(self):
+        response = pr.Response(pr.SUCCESS, result=None, blob='blob-key')
+        ex = self.executor()
+        ex._ongoing_requests[self.task_uuid] = self.request_inst_mock
+        ex._process_response(response.to_dict(), self.message_mock)
+
+        result = self.request_inst_mock.set_result.call_args[1]['result']
+        self.assertIsInstance(result, failure.Failure)
+        self.assertTrue(result.check(exc.NotFound))
+
     def test_on_message_response_unknown_state(self):
         response = pr.Response(state='<unknown>')
         ex = self.executor()
@@ -160,6 +191,18 @@ class TestWorkerTaskExecutor(test.MockTestCase):
 
         self.assertEqual([], self.request_inst_mock.mock_calls)
 
+    def test_on_message_response_unknown_task_offloaded(self):
+        store = mock.MagicMock()
+        self.message_mock.properties['correlation_id'] = '<unknown>'
+        response = pr.Response(pr.SUCCESS, result=None, blob='blob-key')
+        ex = self.executor(blob_store=store)
+        ex._ongoing_requests[self.task_uuid] = self.request_inst_mock
+        ex._process_response(response.to_dict(), self.message_mock)
+
+        # nothing will ever fetch it, so it gets deleted instead
+        self.assertEqual([], self.request_inst_mock.mock_calls)
+        store.delete.assert_called_once_with('blob-key')
+
     def test_on_message_response_no_correlation_id(self):
         self.message_mock.properties = {'type': pr.RESPONSE}
         response = pr.Response(pr.RUNNING)
@@ -171,7 +214,7 @@ class TestWorkerTaskExecutor(test.MockTestCase):
 
     def test_on_wait_task_not_expired(self):
         ex = self.executor()
-        ex._ongoing_requests[self.task_uuid] = self.request_inst_mock
+        ex._add_request(self.request_inst_mock)
 
         self.assertEqual(1, len(ex._ongoing_requests))
         ex._on_wait()
@@ -179,18 +222,57 @@ class TestWorkerTaskExecutor(test.MockTestCase):
 
     @mock.patch('oslo_utils.timeutils.now')
     def test_on_wait_task_expired(self, mock_now):
-        mock_now.side_effect = [0, 120]
+        mock_now.return_value = 120
 
         self.request_inst_mock.expired = True
         self.request_inst_mock.created_on = 0
 
         ex = self.executor()
-        ex._ongoing_requests[self.task_uuid] = self.request_inst_mock
+        ex._add_request(self.request_inst_mock)
         self.assertEqual(1, len(ex._ongoing_requests))
 
         ex._on_wait()
         self.assertEqual(0, len(ex._ongoing_requests))
 
+    @mock.patch('oslo_utils.timeutils.now')
+    def test_on_wait_only_due_requests_checked(self, mock_now):
+        mock_now.return_value = 30
+        due = mock.MagicMock(uuid='due', deadline=10, expired=True,
+                             created_on=0, task=self.task)
+        later = mock.MagicMock(uuid='later', deadline=60, created_on=0,
+                               task=self.task)
+        later_expired = mock.PropertyMock(return_value=False)
+        type(later).expired = later_expired
+
+        ex = self.executor()
+        ex._add_request(later)
+        ex._add_request(due)
+        ex._on_wait()
+        self.assertEqual({'later': later}, ex._ongoing_requests)
+        self.assertTrue(due.set_result.called)
+        self.assertFalse(later_expired.called)
+
+    def test_waiting_request_published_on_notify(self):
+        ex = self.executor()
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+        self.assertFalse(self.proxy_inst_mock.publish.called)
+
+        notify = pr.Notify(topic=self.executor_topic, tasks=[self.task.name])
+        ex._process_notify(notify.to_dict(), self.message_mock)
+        self.proxy_inst_mock.publish.assert_called_once_with(
+            self.request_inst_mock, self.executor_topic,
+            reply_to=self.executor_uuid, correlation_id=self.task_uuid)
+        self.assertEqual({}, dict(ex._waiting_requests))
+
+    def test_waiting_request_other_task_not_published(self):
+        ex = self.executor()
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+
+        notify = pr.Notify(topic=self.executor_topic, tasks=['other'])
+        ex._process_notify(notify.to_dict(), self.message_mock)
+        self.assertFalse(self.proxy_inst_mock.publish.called)
+        self.assertEqual(1, len(ex._waiting_requests))
+
     def test_execute_task(self):
         ex = self.executor()
         ex._finder._add(self.executor_topic, [self.task.name])
@@ -229,6 +311,39 @@ class TestWorkerTaskExecutor(test.MockTestCase):
         ]
         self.assertEqual(expected_calls, self.master_mock.mock_calls)
 
+    def test_execute_task_serializer(self):
+        ex = self.executor(serializer=proxy.MSGPACK)
+        worker, _new = ex._finder._add(self.executor_topic, [self.task.name])
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+        self.proxy_inst_mock.publish.assert_called_once_with(
+            self.request_inst_mock, self.executor_topic,
+            reply_to=self.executor_uuid, correlation_id=self.task_uuid)
+
+        # Only workers that say they accept it are sent requests using it.
+        self.proxy_inst_mock.publish.reset_mock()
+        worker.serializers = list(proxy.SERIALIZERS)
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+        self.proxy_inst_mock.publish.assert_called_once_with(
+            self.request_inst_mock, self.executor_topic,
+            reply_to=self.executor_uuid, correlation_id=self.task_uuid,
+            serializer=proxy.MSGPACK)
+
+    def test_execute_task_offloaded(self):
+        store = mock.MagicMock()
+        ex = self.executor(blob_store=store)
+        worker, _new = ex._finder._add(self.executor_topic, [self.task.name])
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+        self.assertFalse(self.request_inst_mock.offload.called)
+
+        # Only workers that say they have a blob store get offloaded ones.
+        worker.blobs = True
+        ex.execute_task(self.task, self.task_uuid, self.task_args)
+        self.request_inst_mock.offload.assert_called_once_with(mock.ANY)
+        self.assertEqual(2, self.proxy_inst_mock.publish.call_count)
+
+    def test_unknown_serializer(self):
+        self.assertRaises(ValueError, self.executor, serializer='yaml')
+
     def test_execute_task_topic_not_found(self):
         ex = self.executor()
         ex.execute_task(self.task, self.task_uuid, self.task_args)
@@ -17,6 +17,7 @@
 from oslo_utils import uuidutils
 
 from taskflow.engines.action_engine import executor
+from taskflow.engines.worker_based import blobs
 from taskflow.engines.worker_based import protocol as pr
 from taskflow import exceptions as excp
 from taskflow import test
@@ -25,6 +26,25 @@ from taskflow.tests import utils
 from taskflow.types import failure
 
 
+class _MemoryBlobStore(blobs.BlobStore):
+    def __init__(self):
+        self.blobs = {}
+
+    def put(self, data):
+        key = str(len(self.blobs))
+        self.blobs[key] = data
+        return key
+
+    def get(self, key):
+        try:
+            return self.blobs[key]
+        except KeyError:
+            raise excp.NotFound(key)
+
+    def delete(self, key):
+        self.blobs.pop(key, None)
+
+
 class TestProtocolValidation(test.TestCase):
     def test_send_notify(self):
         msg = pr.Notify()
@@ -41,6 +61,51 @@ class TestProtocolValidation(test.TestCase):
         msg = pr.Notify(topic="bob", tasks=['a', 'b', 'c'])
         pr.Notify.validate(msg.to_dict(), True)
 
+    def test_reply_notify_capacity(self):
+        msg = pr.Notify(topic="bob", tasks=['a'],
+                        capacity={'outstanding': 2, 'workers': 4,
+                                  'latency': 0.5})
+        pr.Notify.validate(msg.to_dict(), True)
+        self.assertEqual(2, msg.capacity['outstanding'])
+        msg = pr.Notify(topic="bob", tasks=['a'],
+                        capacity={'outstanding': -1})
+        self.assertRaises(excp.InvalidFormat,
+                          pr.Notify.validate, msg.to_dict(), True)
+
+    def test_reply_notify_serializers(self):
+        msg = pr.Notify(topic="bob", tasks=['a'],
+                        serializers=['json', 'taskflow-msgpack'])
+        pr.Notify.validate(msg.to_dict(), True)
+        self.assertEqual(['json', 'taskflow-msgpack'], msg.serializers)
+        msg = pr.Notify(topic="bob", tasks=['a'], serializers='json')
+        self.assertRaises(excp.InvalidFormat,
+                          pr.Notify.validate, msg.to_dict(), True)
+
+    def test_reply_notify_blobs(self):
+        msg = pr.Notify(topic="bob", tasks=['a'])
+        self.assertFalse(msg.blobs)
+        msg = pr.Notify(topic="bob", tasks=['a'], blobs=True)
+        pr.Notify.validate(msg.to_dict(), True)
+        self.assertTrue(msg.blobs)
+        msg = pr.Notify(topic="bob", tasks=['a'], blobs='yes')
+        self.assertRaises(excp.InvalidFormat,
+                          pr.Notify.validate, msg.to_dict(), True)
+
+    def test_batch(self):
+        batch = pr.Batch()
+        batch.add(pr.Response(pr.RUNNING), correlation_id='a')
+        batch.add(pr.Notify())
+        self.assertEqual(2, len(batch))
+        pr.Batch.validate(batch.to_dict())
+        self.assertEqual({'type': pr.NOTIFY, 'body': {}},
+                         batch.to_dict()['messages'][1])
+
+    def test_batch_invalid(self):
+        self.assertRaises(excp.InvalidFormat, pr.Batch.validate,
+                          pr.Batch().to_dict())
+        self.assertRaises(excp.InvalidFormat, pr.Batch.validate,
+                          {'messages': [{'body': {}}]})
+
     def test_reply_notify_invalid(self):
         msg = {
             'topic': {},
@@ -55,6 +120,14 @@ class TestProtocolValidation(test.TestCase):
                              pr.EXECUTE, {}, 1.0)
         pr.Request.validate(request.to_dict())
 
+    def test_request_offloaded(self):
+        request = pr.Request(utils.DummyTask("hi"),
+                             uuidutils.generate_uuid(),
+                             pr.REVERT, {'a': 'a' * 32, 'b': 'b'}, 1.0,
+                             result='c' * 32)
+        request.offload(blobs.Offloader(_MemoryBlobStore(), threshold=16))
+        pr.Request.validate(request.to_dict())
+
     def test_request_invalid(self):
         msg = {
             'task_name': 1,
@@ -80,6 +153,10 @@ class TestProtocolValidation(test.TestCase):
         msg = pr.Response(pr.SUCCESS, result=1)
         pr.Response.validate(msg.to_dict())
 
+    def test_response_offloaded(self):
+        msg = pr.Response(pr.SUCCESS, result=None, blob='blob-key')
+        pr.Response.validate(msg.to_dict())
+
     def test_response_mixed_invalid(self):
         msg = pr.Response(pr.EVENT,
                           details={'progress': 0.5},
@@ -165,6 +242,31 @@ class TestProtocol(test.TestCase):
             failures={self.task.name: a_failure.to_dict()})
         self.assertEqual(expected, request.to_dict())
 
+    def test_to_dict_offloaded(self):
+        store = _MemoryBlobStore()
+        offloader = blobs.Offloader(store, threshold=16)
+        request = self.request(action='revert', result='r' * 32,
+                               arguments={'a': 'a', 'b': 'b' * 32})
+        keys = request.offload(offloader)
+        self.assertEqual(2, len(keys))
+        to_dict = request.to_dict()
+        self.assertEqual({'a': 'a'}, to_dict['arguments'])
+        self.assertEqual(('success', None), to_dict['result'])
+        self.assertEqual(sorted(keys),
+                         sorted([to_dict['blobs']['arguments']['b'],
+                                 to_dict['blobs']['result']]))
+        work = pr.Request.from_dict(to_dict, offloader=offloader)
+        self.assertEqual({'a': 'a', 'b': 'b' * 32},
+                         work.arguments['arguments'])
+        self.assertEqual('r' * 32, work.arguments['result'])
+        self.assertRaises(ValueError, pr.Request.from_dict, to_dict)
+
+    def test_to_dict_not_offloaded(self):
+        request = self.request()
+        self.assertEqual([], request.offload(
+            blobs.Offloader(_MemoryBlobStore())))
+        self.assertEqual(self.request_to_dict(blobs={}), request.to_dict())
+
     def test_to_dict_with_invalid_json_failures(self):
         exc = RuntimeError(Exception("I am not valid JSON"))
         a_failure = failure.Failure.from_exception(exc)
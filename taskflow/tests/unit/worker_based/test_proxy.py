@@ -16,6 +16,9 @@
 
 import socket
 
+from kombu import serialization as kombu_serialization
+
+from taskflow.engines.worker_based import protocol as pr
 from taskflow.engines.worker_based import proxy
 from taskflow import test
 from taskflow.test import mock
@@ -175,6 +178,61 @@ class TestProxy(test.MockTestCase):
         ], routing_key)
         self.master_mock.assert_has_calls(master_mock_calls)
 
+    def test_publish_serializer(self):
+        msg_mock = mock.MagicMock()
+        msg_data = 'msg-data'
+        msg_mock.to_dict.return_value = msg_data
+        routing_key = 'routing-key'
+
+        p = self.proxy(reset_master_mock=True)
+        p.publish(msg_mock, routing_key, serializer=proxy.MSGPACK)
+
+        mock_producer = mock.call.connection.Producer()
+        master_mock_calls = self.proxy_publish_calls([
+            mock_producer.__enter__().publish(body=msg_data,
+                                              routing_key=routing_key,
+                                              exchange=self.exchange_inst_mock,
+                                              correlation_id=None,
+                                              declare=[self.queue_inst_mock],
+                                              type=msg_mock.TYPE,
+                                              reply_to=None,
+                                              serializer=proxy.MSGPACK)
+        ], routing_key)
+        self.master_mock.assert_has_calls(master_mock_calls)
+
+    def test_publish_headers(self):
+        msg_mock = mock.MagicMock()
+        msg_data = 'msg-data'
+        msg_mock.to_dict.return_value = msg_data
+        routing_key = 'routing-key'
+
+        p = self.proxy(reset_master_mock=True)
+        p.publish(msg_mock, routing_key, headers={'a': 'b'})
+
+        mock_producer = mock.call.connection.Producer()
+        master_mock_calls = self.proxy_publish_calls([
+            mock_producer.__enter__().publish(body=msg_data,
+                                              routing_key=routing_key,
+                                              exchange=self.exchange_inst_mock,
+                                              correlation_id=None,
+                                              declare=[self.queue_inst_mock],
+                                              type=msg_mock.TYPE,
+                                              reply_to=None,
+                                              headers={'a': 'b'})
+        ], routing_key)
+        self.master_mock.assert_has_calls(master_mock_calls)
+
+    def test_msgpack_serializer(self):
+        data = pr.Response(pr.SUCCESS, result=[1, 2]).to_dict()
+        content_type, encoding, raw_data = kombu_serialization.dumps(
+            data, serializer=proxy.MSGPACK)
+        self.assertEqual('binary', encoding)
+        self.assertEqual(proxy.MSGPACK,
+                         proxy.serializer_for(mock.Mock(
+                             content_type=content_type)))
+        self.assertEqual(data, kombu_serialization.loads(
+            raw_data, content_type, encoding))
+
     def test_start(self):
         try:
             # KeyboardInterrupt will be raised after two iterations
@@ -247,3 +305,71 @@ class TestProxy(test.MockTestCase):
         t.join()
 
         self.assertFalse(pr.is_running)
+
+
+class TestBatcher(test.TestCase):
+
+    def test_flush(self):
+        proxy_mock = mock.MagicMock()
+        b = proxy.Batcher(proxy_mock, 60)
+        self.addCleanup(b.stop, flush=False)
+        responses = [pr.Response(pr.RUNNING), pr.Response(pr.SUCCESS)]
+        b.publish(responses[0], 'a', correlation_id='1')
+        b.publish(responses[1], 'a', correlation_id='1')
+        b.publish(pr.Notify(), 'b', reply_to='me')
+        self.assertFalse(proxy_mock.publish.called)
+        b.flush()
+        self.assertEqual(2, proxy_mock.publish.call_count)
+        batch_call, notify_call = proxy_mock.publish.call_args_list
+        batch = batch_call[0][0]
+        self.assertIsInstance(batch, pr.Batch)
+        self.assertEqual([(responses[0], '1'), (responses[1], '1')],
+                         batch.messages)
+        pr.Batch.validate(batch.to_dict())
+        self.assertEqual(mock.call(mock.ANY, 'b', reply_to='me',
+                                   correlation_id=None, serializer=None),
+                         notify_call)
+
+    def test_flush_serializers(self):
+        proxy_mock = mock.MagicMock()
+        b = proxy.Batcher(proxy_mock, 60)
+        self.addCleanup(b.stop, flush=False)
+        b.publish(pr.Notify(), 'a')
+        b.publish(pr.Notify(), 'a', serializer=proxy.MSGPACK)
+        b.flush()
+        self.assertEqual(2, proxy_mock.publish.call_count)
+        serializers = [c[1]['serializer']
+                       for c in proxy_mock.publish.call_args_list]
+        self.assertEqual([None, proxy.MSGPACK], serializers)
+
+    def test_full_and_stop(self):
+        proxy_mock = mock.MagicMock()
+        b = proxy.Batcher(proxy_mock, 60, max_size=2)
+        self.addCleanup(b.stop)
+        b.publish(pr.Notify(), 'a')
+        b.publish(pr.Notify(), 'a')
+        self.assertEqual(1, proxy_mock.publish.call_count)
+        b.publish(pr.Notify(), 'a')
+        b.stop()
+        self.assertEqual(2, proxy_mock.publish.call_count)
+
+    def test_failure(self):
+        proxy_mock = mock.MagicMock()
+        proxy_mock.publish.side_effect = RuntimeError("Woot!")
+        failures = []
+
+        def on_failure(msg, routing_key, correlation_id, serializer,
+                       failure):
+            failures.append((routing_key, correlation_id, serializer,
+                             failure))
+
+        b = proxy.Batcher(proxy_mock, 60, on_failure=on_failure)
+        b.publish(pr.Notify(), 'a', correlation_id='1',
+                  serializer=proxy.MSGPACK)
+        b.publish(pr.Notify(), 'a', correlation_id='2',
+                  serializer=proxy.MSGPACK)
+        b.stop()
+        self.assertEqual([('a', '1', proxy.MSGPACK),
+                          ('a', '2', proxy.MSGPACK)],
+                         [f[0:3] for f in failures])
+        self.assertTrue(failures[0][3].check(RuntimeError))
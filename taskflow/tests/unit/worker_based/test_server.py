@@ -14,16 +14,40 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_serialization import msgpackutils
 import six
 
+from taskflow.engines.worker_based import blobs
+from taskflow.engines.worker_based import dispatcher
 from taskflow.engines.worker_based import endpoint as ep
 from taskflow.engines.worker_based import protocol as pr
+from taskflow.engines.worker_based import proxy
 from taskflow.engines.worker_based import server
 from taskflow import task as task_atom
 from taskflow import test
 from taskflow.test import mock
 from taskflow.tests import utils
 from taskflow.types import failure
+from taskflow.utils import schema_utils
+
+# The notify response schema engines (that send notify requests without
+# saying which optional fields they understand) validate responses with.
+_OLD_NOTIFY_RESPONSE_SCHEMA = {
+    "type": "object",
+    'properties': {
+        'topic': {
+            "type": "string",
+        },
+        'tasks': {
+            "type": "array",
+            "items": {
+                "type": "string",
+            },
+        }
+    },
+    "required": ["topic", 'tasks'],
+    "additionalProperties": False,
+}
 
 
 class TestServer(test.MockTestCase):
@@ -55,6 +79,7 @@ class TestServer(test.MockTestCase):
         self.message_mock.properties = {'correlation_id': self.task_uuid,
                                         'reply_to': self.reply_to,
                                         'type': pr.REQUEST}
+        self.message_mock.headers = {}
         self.master_mock.attach_mock(self.executor_mock, 'executor')
         self.master_mock.attach_mock(self.message_mock, 'message')
 
@@ -106,6 +131,76 @@ class TestServer(test.MockTestCase):
         self.master_mock.assert_has_calls(master_mock_calls)
         self.assertEqual(len(self.endpoints), len(s._endpoints))
 
+    def test_capacity(self):
+        s = self.server()
+        self.executor_mock.max_workers = 4
+        self.assertEqual({'outstanding': 0, 'workers': 4}, s.capacity)
+        on_receive = s._delayed_process(lambda content, message: None,
+                                        tracked=True)
+        on_receive({}, self.message_mock)
+        self.assertEqual(1, s.capacity['outstanding'])
+        on_run, watch, content, message = (
+            self.executor_mock.submit.call_args[0])
+        on_run(watch, content, message)
+        self.assertEqual(0, s.capacity['outstanding'])
+        self.assertIn('latency', s.capacity)
+        pr.Notify.validate(pr.Notify(topic=self.server_topic, tasks=[],
+                                     capacity=s.capacity).to_dict(), True)
+
+    def test_process_notify(self):
+        self.message_mock.headers = {pr.Notify.FIELDS_HEADER: ['blobs']}
+        s = self.server(reset_master_mock=True)
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        pr.Notify.validate(notify.to_dict(), True)
+        self.assertFalse(notify.blobs)
+
+        # Only workers that have a blob store say that they have one.
+        self.proxy_inst_mock.publish.reset_mock()
+        s = self.server(reset_master_mock=True, blob_store=mock.MagicMock())
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        pr.Notify.validate(notify.to_dict(), True)
+        self.assertTrue(notify.blobs)
+
+        # But not to senders that do not understand it.
+        self.proxy_inst_mock.publish.reset_mock()
+        self.message_mock.headers = {}
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        self.assertNotIn('blobs', notify.to_dict())
+
+    def test_process_notify_capacity(self):
+        s = self.server(reset_master_mock=True)
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        self.assertIsNone(notify.capacity)
+
+        # Only senders that say they understand it are sent it.
+        self.proxy_inst_mock.publish.reset_mock()
+        self.message_mock.headers = {pr.Notify.FIELDS_HEADER: ['capacity']}
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        pr.Notify.validate(notify.to_dict(), True)
+        self.assertEqual({'outstanding': 0}, notify.capacity)
+
+    def test_process_notify_serializers(self):
+        s = self.server(reset_master_mock=True)
+        self.message_mock.headers = {pr.Notify.FIELDS_HEADER: ['serializers']}
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        pr.Notify.validate(notify.to_dict(), True)
+        self.assertEqual(list(proxy.SERIALIZERS), notify.serializers)
+
+    def test_process_notify_old_sender(self):
+        s = self.server(reset_master_mock=True, blob_store=mock.MagicMock())
+        s._process_notify({}, self.message_mock)
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        # Engines that did not say which fields they understand must be
+        # able to accept the response...
+        schema_utils.schema_validate(notify.to_dict(),
+                                     _OLD_NOTIFY_RESPONSE_SCHEMA)
+
     def test_parse_request(self):
         request = self.make_request()
         bundle = pr.Request.from_dict(request)
@@ -213,6 +308,103 @@ class TestServer(test.MockTestCase):
         ]
         self.master_mock.assert_has_calls(master_mock_calls)
 
+    def test_process_request_offloaded(self):
+        store = mock.MagicMock()
+        store.put.return_value = 'blob-key'
+        store.get.return_value = msgpackutils.dumps(1)
+        request = pr.Request(self.task, self.task_uuid, self.task_action,
+                             self.task_args, timeout=60)
+        request.offload(blobs.Offloader(store, threshold=0))
+        request = request.to_dict()
+        self.assertEqual({}, request['arguments'])
+
+        # create server and process request
+        s = self.server(reset_master_mock=True, blob_store=store,
+                        blob_threshold=0)
+        s._process_request(request, self.message_mock)
+
+        # check calls (the argument is fetched and the result offloaded)
+        store.get.assert_called_once_with('blob-key')
+        master_mock_calls = [
+            mock.call.Response(pr.RUNNING),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid),
+            mock.call.Response(pr.SUCCESS, result=None, blob='blob-key'),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid)
+        ]
+        self.master_mock.assert_has_calls(master_mock_calls)
+
+    def test_process_request_msgpack(self):
+        self.message_mock.content_type = 'application/x-taskflow-msgpack'
+
+        # create server and process request
+        s = self.server(reset_master_mock=True)
+        s._process_request(self.make_request(), self.message_mock)
+
+        # check calls (replies use the same serializer as the request)
+        master_mock_calls = [
+            mock.call.Response(pr.RUNNING),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid,
+                                    serializer=proxy.MSGPACK),
+            mock.call.Response(pr.SUCCESS, result=1),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid,
+                                    serializer=proxy.MSGPACK)
+        ]
+        self.master_mock.assert_has_calls(master_mock_calls)
+
+    def test_process_request_batched(self):
+        message = dispatcher.BatchedMessage(self.message_mock, pr.REQUEST,
+                                            correlation_id=self.task_uuid)
+
+        # create server and process request
+        s = self.server(reset_master_mock=True, batch_delay=60)
+        self.addCleanup(s._batcher.stop, flush=False)
+        s._process_request(self.make_request(), message)
+
+        # check calls (the running reply is sent right away, while the
+        # result is only queued up until the batch is sent)
+        master_mock_calls = [
+            mock.call.Response(pr.RUNNING),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid),
+            mock.call.Response(pr.SUCCESS, result=1),
+        ]
+        self.master_mock.assert_has_calls(master_mock_calls)
+        self.assertEqual(1, self.proxy_inst_mock.publish.call_count)
+        s._batcher.flush()
+        self.assertEqual(2, self.proxy_inst_mock.publish.call_count)
+
+    def test_batch_failure_resends(self):
+        store = mock.MagicMock()
+        self.proxy_inst_mock.publish.side_effect = [RuntimeError('Woot!'),
+                                                    None, None]
+        s = self.server(reset_master_mock=True, blob_store=store)
+        s._batcher.publish(pr.Notify(), self.reply_to,
+                           correlation_id=self.task_uuid)
+        s._batcher.publish(pr.Notify(), self.reply_to,
+                           correlation_id=self.task_uuid)
+        s._batcher.stop()
+
+        # the batch failed, so each reply is sent by itself instead
+        self.assertEqual(3, self.proxy_inst_mock.publish.call_count)
+        self.assertFalse(store.delete.called)
+
+    def test_batch_failure_deletes_blob(self):
+        store = mock.MagicMock()
+        self.response_inst_mock.data = {'blob': 'blob-key'}
+        self.proxy_inst_mock.publish.side_effect = RuntimeError('Woot!')
+        s = self.server(reset_master_mock=True, blob_store=store)
+        s._batcher.publish(self.response_inst_mock, self.reply_to,
+                           correlation_id=self.task_uuid)
+        s._batcher.stop()
+
+        # nobody will ever fetch the result that was offloaded
+        self.assertEqual(2, self.proxy_inst_mock.publish.call_count)
+        store.delete.assert_called_once_with('blob-key')
+
     @mock.patch("taskflow.engines.worker_based.server.LOG.warn")
     def test_process_request_parse_message_failure(self, mocked_exception):
         self.message_mock.properties = {}
@@ -77,3 +77,63 @@ class TestProxyFinder(test.TestCase):
         self.assertEqual(added[-1][0].identity, w.identity)
         w = finder.get_worker_for_task(utils.DummyTask)
         self.assertIn(w.identity, [w_a[0].identity for w_a in added[0:2]])
+
+    def test_least_loaded_worker(self):
+        finder = worker_types.ProxyWorkerFinder('me', mock.MagicMock(), [])
+        w, _emit = finder._add('dummy-topic', [utils.DummyTask])
+        w2, _emit = finder._add('dummy-topic-2', [utils.DummyTask])
+        in_flight = {'dummy-topic': 3}
+        for _i in range(0, 10):
+            w3 = finder.get_worker_for_task(utils.DummyTask,
+                                            in_flight=in_flight)
+            self.assertEqual(w2.identity, w3.identity)
+        # The worker reported load (relative to its size) also matters...
+        w.capacity = {'outstanding': 0, 'workers': 8}
+        w2.capacity = {'outstanding': 2, 'workers': 1}
+        for _i in range(0, 10):
+            w3 = finder.get_worker_for_task(utils.DummyTask,
+                                            in_flight=in_flight)
+            self.assertEqual(w.identity, w3.identity)
+
+    def test_maybe_publish(self):
+        proxy = mock.MagicMock()
+        finder = worker_types.ProxyWorkerFinder('me', proxy, ['a'])
+        finder.maybe_publish()
+        proxy.publish.assert_called_once_with(
+            mock.ANY, ['a'], reply_to='me',
+            headers={'taskflow-notify-fields': ['capacity', 'serializers',
+                                                'blobs']})
+        # Not again until it is time to (again)...
+        finder.maybe_publish()
+        self.assertEqual(1, proxy.publish.call_count)
+
+    def test_capacity_updated(self):
+        finder = worker_types.ProxyWorkerFinder('me', mock.MagicMock(), [])
+        message = mock.MagicMock()
+        task_name = reflection.get_class_name(utils.DummyTask)
+        capacity = {'outstanding': 1, 'workers': 2}
+        finder.process_response({'topic': 'dummy-topic',
+                                 'tasks': [task_name],
+                                 'capacity': capacity}, message)
+        w = finder.get_worker_for_task(task_name)
+        self.assertEqual(capacity, w.capacity)
+        finder.process_response({'topic': 'dummy-topic',
+                                 'tasks': [task_name]}, message)
+        self.assertEqual(1, finder.total_workers)
+        self.assertEqual(2, finder.messages_processed)
+        w = finder.get_worker_for_task(task_name)
+        self.assertIsNone(w.capacity)
+
+    def test_blobs_updated(self):
+        finder = worker_types.ProxyWorkerFinder('me', mock.MagicMock(), [])
+        message = mock.MagicMock()
+        task_name = reflection.get_class_name(utils.DummyTask)
+        finder.process_response({'topic': 'dummy-topic',
+                                 'tasks': [task_name],
+                                 'blobs': True}, message)
+        w = finder.get_worker_for_task(task_name)
+        self.assertTrue(w.blobs)
+        finder.process_response({'topic': 'dummy-topic',
+                                 'tasks': [task_name]}, message)
+        w = finder.get_worker_for_task(task_name)
+        self.assertFalse(w.blobs)
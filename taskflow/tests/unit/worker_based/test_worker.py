@@ -61,7 +61,9 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             blob_store=None,
+                             blob_threshold=mock.ANY)
         ]
         self.assertEqual(master_mock_calls, self.master_mock.mock_calls)
 
@@ -83,7 +85,9 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             blob_store=None,
+                             blob_threshold=mock.ANY)
         ]
         self.assertEqual(master_mock_calls, self.master_mock.mock_calls)
 
@@ -96,7 +100,9 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             blob_store=None,
+                             blob_threshold=mock.ANY)
         ]
         self.assertEqual(master_mock_calls, self.master_mock.mock_calls)
 
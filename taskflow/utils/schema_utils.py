@@ -14,8 +14,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import jsonschema
+import collections
+import threading
+
 from jsonschema import exceptions as schema_exc
+from jsonschema import validators as schema_validators
 
 # Special jsonschema validation types/adjustments.
 _SCHEMA_TYPES = {
@@ -29,6 +32,47 @@ ValidationError = schema_exc.ValidationError
 SchemaError = schema_exc.SchemaError
 
 
+# How many validators (for the most recently used schemas) are retained.
+_MAX_VALIDATORS = 32
+
+# Validators (and the schema each was created from) for schemas that have
+# been recently validated against (keyed by the identity of the schema and
+# ordered from least to most recently used).
+_VALIDATORS = collections.OrderedDict()
+_VALIDATORS_LOCK = threading.Lock()
+
+
+def _fetch_validator(schema):
+    key = id(schema)
+    with _VALIDATORS_LOCK:
+        try:
+            cached_schema, validator = _VALIDATORS.pop(key)
+        except KeyError:
+            pass
+        else:
+            # The schema is retained (along with its validator) so that its
+            # identity can not be reused by some other schema object while
+            # it is cached.
+            if cached_schema is schema:
+                _VALIDATORS[key] = (schema, validator)
+                return validator
+    validator_cls = schema_validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    validator = validator_cls(schema, types=_SCHEMA_TYPES)
+    with _VALIDATORS_LOCK:
+        _VALIDATORS[key] = (schema, validator)
+        while len(_VALIDATORS) > _MAX_VALIDATORS:
+            _VALIDATORS.popitem(last=False)
+    return validator
+
+
 def schema_validate(data, schema):
-    """Validates given data using provided json schema."""
-    jsonschema.validate(data, schema, types=_SCHEMA_TYPES)
+    """Validates given data using provided json schema.
+
+    The schema itself is checked (and a validator for it is created) only
+    the first time it is used (while a validator for it stays in a small
+    cache of the most recently used ones); schemas are expected to be
+    long-lived (module or class level) objects that are **not** mutated
+    after that.
+    """
+    _fetch_validator(schema).validate(data)